@@ -0,0 +1,180 @@
+"""
+Agendador orientado a eventos para as execuções diárias da automação 455.
+Em vez de verificar os agendamentos a cada segundo, calcula o próximo horário
+de disparo e dorme até ele; só acorda antes se receber um sinal explícito
+(alteração dos agendamentos ou parada). Os agendamentos do arquivo JSON ficam
+em cache na memória e só são relidos quando a data de modificação do arquivo muda.
+"""
+
+from datetime import datetime, timedelta
+import json
+import os
+import threading
+
+# Arquivo com a lista de horários ("HH:MM") configurados no painel
+ARQUIVO_AGENDAMENTOS = "agendamentos.json"
+
+# Espera máxima (s) entre dois despertares, para ressincronizar com o relógio
+# do sistema após hibernação ou ajuste de horário
+ESPERA_MAXIMA = 900
+
+
+def proximo_horario(horario, agora):
+    """
+    Calcula o próximo momento, a partir de agora, de um horário diário
+
+    Args:
+        horario: Horário no formato "HH:MM" ou "HH:MM:SS"
+        agora: Data e hora de referência
+
+    Returns:
+        datetime: Hoje no horário informado, ou amanhã se ele já passou
+    """
+    formato = "%H:%M:%S" if horario.count(":") == 2 else "%H:%M"
+    hora = datetime.strptime(horario, formato).time()
+    disparo = datetime.combine(agora.date(), hora)
+    if disparo <= agora:
+        disparo += timedelta(days=1)
+    return disparo
+
+
+class CacheAgendamentos:
+    """
+    Cache em memória do arquivo de agendamentos, invalidado pela data de modificação
+
+    Args:
+        caminho: Arquivo JSON dos agendamentos
+    """
+
+    def __init__(self, caminho=ARQUIVO_AGENDAMENTOS):
+        self.caminho = caminho
+        self._assinatura = None
+        self._agendamentos = []
+        self._trava = threading.Lock()
+
+    def _assinatura_arquivo(self):
+        try:
+            estado = os.stat(self.caminho)
+        except FileNotFoundError:
+            return None
+        return (estado.st_mtime_ns, estado.st_size)
+
+    def carregar(self):
+        """
+        Retorna os agendamentos, relendo o arquivo apenas se ele mudou
+
+        Returns:
+            list: Cópia da lista de horários (vazia se o arquivo não existir)
+        """
+        with self._trava:
+            assinatura = self._assinatura_arquivo()
+            if assinatura != self._assinatura:
+                if assinatura is None:
+                    self._agendamentos = []
+                else:
+                    with open(self.caminho, "r", encoding="utf-8") as f:
+                        self._agendamentos = json.load(f)
+                self._assinatura = assinatura
+            return list(self._agendamentos)
+
+    def salvar(self, agendamentos):
+        """Grava os agendamentos no arquivo e atualiza o cache"""
+        with self._trava:
+            temporario = self.caminho + ".tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(agendamentos, f, indent=2, ensure_ascii=False)
+            os.replace(temporario, self.caminho)
+            self._agendamentos = list(agendamentos)
+            self._assinatura = self._assinatura_arquivo()
+
+
+class Agendador:
+    """
+    Dispara funções em horários diários, dormindo até o próximo disparo.
+    Um horário perdido (ex.: máquina hibernada) é disparado assim que a
+    thread acorda, e o seguinte passa a ser o do dia posterior.
+    """
+
+    def __init__(self):
+        self._tarefas = []
+        self._trava = threading.Lock()
+        self._sinal = threading.Event()
+        self._parada = threading.Event()
+        self.thread = None
+
+    def definir_tarefas(self, tarefas, agora=None):
+        """
+        Substitui as tarefas agendadas e acorda a thread para recalcular a espera
+
+        Args:
+            tarefas: Lista de (horário "HH:MM[:SS]", função sem argumentos)
+            agora: Data e hora de referência (padrão: agora)
+        """
+        agora = agora or datetime.now()
+        with self._trava:
+            self._tarefas = [
+                {"horario": horario, "funcao": funcao, "proximo": proximo_horario(horario, agora)}
+                for horario, funcao in tarefas
+            ]
+        self._sinal.set()
+
+    def limpar(self):
+        """Remove todas as tarefas"""
+        self.definir_tarefas([])
+
+    def proximo_disparo(self):
+        """Retorna o datetime do próximo disparo, ou None se não houver tarefas"""
+        with self._trava:
+            return min((tarefa["proximo"] for tarefa in self._tarefas), default=None)
+
+    def executar_pendentes(self, agora=None):
+        """
+        Dispara as tarefas cujo horário já chegou e agenda a próxima ocorrência de cada uma
+
+        Returns:
+            int: Quantidade de tarefas disparadas
+        """
+        agora = agora or datetime.now()
+        with self._trava:
+            devidas = [tarefa for tarefa in self._tarefas if tarefa["proximo"] <= agora]
+            for tarefa in devidas:
+                tarefa["proximo"] = proximo_horario(tarefa["horario"], agora)
+        for tarefa in sorted(devidas, key=lambda t: t["horario"]):
+            try:
+                tarefa["funcao"]()
+            except Exception as e:
+                print(f"Erro no agendador ao executar a tarefa das {tarefa['horario']}: {e}")
+        return len(devidas)
+
+    def iniciar(self):
+        """Inicia a thread do agendador (sem efeito se já estiver ativa)"""
+        if self.ativo:
+            return
+        self._parada = threading.Event()
+        self._sinal = threading.Event()
+        self.thread = threading.Thread(target=self._executar, args=(self._parada, self._sinal), daemon=True)
+        self.thread.start()
+
+    def parar(self):
+        """Sinaliza a parada e acorda a thread imediatamente"""
+        self._parada.set()
+        self._sinal.set()
+
+    @property
+    def ativo(self):
+        return self.thread is not None and not self._parada.is_set()
+
+    def _executar(self, parada, sinal):
+        # Cada thread usa os próprios eventos: um iniciar logo após parar não
+        # deixa a thread antiga viva nem consome o sinal destinado à nova
+        while not parada.is_set():
+            proximo = self.proximo_disparo()
+            espera = ESPERA_MAXIMA
+            if proximo is not None:
+                espera = min(max((proximo - datetime.now()).total_seconds(), 0), ESPERA_MAXIMA)
+            if sinal.wait(espera):
+                sinal.clear()
+                continue
+            if not parada.is_set():
+                self.executar_pendentes()
+        print("Thread do agendador finalizada.")
@@ -16,53 +16,312 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support import expected_conditions as EC
-from datetime import datetime
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    TimeoutException,
+    WebDriverException,
+)
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import calendar
-import pandas as pd
 import os
 from dotenv import load_dotenv
 import time
 import locale
+import queue
+import tempfile
+import threading
+from checkpoint import Checkpoints, repetir_etapa
+from consolidado import atualizar_particao
+from conversao import converter_para_parquet
+from dom import clicar, ler_tabela, preencher_campos, seq_do_periodo
+from downloads import aguardar_download, instantaneo_pasta
+from esperas import (
+    aguardar,
+    janela_com_elemento,
+    nova_janela,
+    pausa,
+    tabela_renderizada,
+    tempo_da_etapa,
+    valor_do_campo,
+)
+from fatiamento import DIAS_MAXIMOS, HistoricoFatias, fatiar, juntar_partes
+from manifesto import Manifesto, hash_arquivo, substituir_se_alterado
+from publicacao import Publicador
+from recursos import monitorar
+from metricas import finalizar_coleta, iniciar_coleta, medir, registrar, ultima_duracao
 
-# Configuração de localidade para datas em português
+# Configuração de localidade para datas em português. Servidores e contêineres
+# costumam não ter o pt_BR instalado: a automação segue com a localidade padrão
 try:
     locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
 except locale.Error:
-    locale.setlocale(locale.LC_TIME, 'Portuguese_Brazil.1252')
+    try:
+        locale.setlocale(locale.LC_TIME, 'Portuguese_Brazil.1252')
+    except locale.Error:
+        print("Aviso: localidade pt_BR indisponível neste sistema. Usando a localidade padrão.")
+
+# Abreviações dos meses nos nomes dos arquivos (MMMYYYY), independentes da localidade do sistema
+MESES_ABREVIADOS = ("JAN", "FEV", "MAR", "ABR", "MAI", "JUN", "JUL", "AGO", "SET", "OUT", "NOV", "DEZ")
 
 # Configuração do diretório de download e carregamento das credenciais
 download_folder = os.path.expanduser('I:\\.shortcut-targets-by-id\\1BbEijfOOPBwgJuz8LJhqn9OtOIAaEdeO\\Logdi\\Relatório e Dashboards\\DB_COMUM\\DB_455')
 load_dotenv("credenciais.env")
 
+# Prazo total (s) para um relatório ficar pronto e intervalos crescentes entre
+# as atualizações da tabela de requisições (o último intervalo se repete)
+PRAZO_RELATORIO = int(os.getenv("AUTO455_PRAZO_RELATORIO", "900"))
+INTERVALOS_ATUALIZACAO = (2, 3, 5, 5, 10, 10, 15, 20, 30)
+
+# Manifesto de extrações, ao lado da pasta de saída, e extração incremental
+# (meses fechados considerados finais no manifesto não são baixados de novo)
+CAMINHO_MANIFESTO = os.path.join(os.path.dirname(download_folder.rstrip("\\/")), "manifesto_455.json")
+EXTRACAO_INCREMENTAL = os.getenv("AUTO455_INCREMENTAL", "1") == "1"
+
+# Downloads, renomeações e conversões em uma pasta local de preparação; os
+# arquivos prontos são publicados na pasta compartilhada em segundo plano
+PREPARACAO_LOCAL = os.getenv("AUTO455_PREPARACAO_LOCAL", "1") == "1"
+PASTA_PREPARACAO = os.getenv("AUTO455_PASTA_PREPARACAO", os.path.join(tempfile.gettempdir(), "auto455"))
+
+# Checkpoints das etapas de cada período: uma execução interrompida retoma do ponto em que parou
+CAMINHO_CHECKPOINTS = os.path.join(os.path.dirname(download_folder.rstrip("\\/")), "checkpoints_455.json")
+
+# Gera um Parquet tipado ao lado de cada relatório baixado
+CONVERTER_PARQUET = os.getenv("AUTO455_PARQUET", "1") == "1"
+
+# Base consolidada particionada por mês, atualizada a partir de cada Parquet mensal
+PASTA_CONSOLIDADO = os.path.join(download_folder, "consolidado")
+CONSOLIDAR = os.getenv("AUTO455_CONSOLIDAR", "1") == "1"
+
+# Quantidade de meses extraídos por execução (mês atual + anteriores)
+MESES_RETROATIVOS = 3
+
+# Fatiamento adaptativo: períodos grandes são divididos em fatias de dias cujo
+# tamanho se ajusta ao tempo de geração e ao tamanho de arquivo observados.
+# Uma fatia que falha é repetida uma vez, dividida ao meio
+FATIAMENTO = os.getenv("AUTO455_FATIAMENTO", "1") == "1"
+ALVO_GERACAO_FATIA = int(os.getenv("AUTO455_ALVO_GERACAO_FATIA", "300"))
+ALVO_TAMANHO_FATIA = int(os.getenv("AUTO455_ALVO_TAMANHO_FATIA", str(50 * 1024 * 1024)))
+CAMINHO_HISTORICO_FATIAS = os.path.join(os.path.dirname(download_folder.rstrip("\\/")), "historico_fatias_455.json")
+
+# Modo paralelo: cada mês vira um job independente em um pool de navegadores
+MODO_PARALELO = os.getenv("AUTO455_PARALELO", "0") == "1"
+MAX_NAVEGADORES = int(os.getenv("AUTO455_MAX_NAVEGADORES", "3"))
+
+# Modo pipeline: envia o formulário de todos os meses e acompanha as requisições juntas
+MODO_PIPELINE = os.getenv("AUTO455_PIPELINE", "0") == "1"
+
+# Mantém um navegador e um login por execução, reabrindo apenas a opção 455 a cada mês
+REUTILIZAR_SESSAO = os.getenv("AUTO455_REUTILIZAR_SESSAO", "1") == "1"
+
+# Perfis (contas/filiais) extraídos ao mesmo tempo por executar_perfis e teto de
+# navegadores abertos somando todos os perfis
+MAX_PERFIS_SIMULTANEOS = int(os.getenv("AUTO455_MAX_PERFIS", "2"))
+MAX_NAVEGADORES_TOTAL = int(os.getenv("AUTO455_MAX_NAVEGADORES_TOTAL", "4"))
+
+# Executa o Edge sem janela (usado pelo benchmark e por execuções sem usuário logado)
+NAVEGADOR_OCULTO = os.getenv("AUTO455_HEADLESS", "0") == "1"
+
+# Modo enxuto: Edge sem janela, sem imagens, extensões e serviços em segundo plano,
+# com caches reduzidos e uma pasta de perfil reaproveitada entre execuções
+NAVEGADOR_ENXUTO = os.getenv("AUTO455_NAVEGADOR_ENXUTO", "0") == "1"
+PASTA_PERFIS_NAVEGADOR = os.getenv("AUTO455_PASTA_PERFIS_NAVEGADOR",
+                                   os.path.join(tempfile.gettempdir(), "auto455_edge"))
+
+# Argumentos do Edge no modo enxuto
+ARGUMENTOS_ENXUTOS = (
+    "--headless=new",
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,msEdgeShopping",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+    "--disk-cache-size=16777216",
+    "--media-cache-size=1048576",
+)
+
+def criar_opcoes_edge(pasta_download, pasta_perfil=None):
+    """
+    Cria as opções do navegador Edge apontando os downloads para a pasta informada
+
+    Args:
+        pasta_download: Pasta onde o Edge deve salvar os arquivos baixados
+        pasta_perfil: Pasta de perfil (user-data-dir) reaproveitada no modo enxuto (opcional)
+
+    Returns:
+        Options: Opções configuradas para o webdriver.Edge
+    """
+    opcoes = Options()
+    preferencias = {
+        "download.default_directory": pasta_download,
+        "download.prompt_for_download": False,
+        "download.directory_upgrade": True,
+        "safeBrowse.enabled": True
+    }
+    if NAVEGADOR_ENXUTO:
+        # 2 = bloquear: o SSW só precisa do HTML dos formulários e da tabela
+        preferencias.update({
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+            "profile.default_content_setting_values.geolocation": 2,
+        })
+        for argumento in ARGUMENTOS_ENXUTOS:
+            opcoes.add_argument(argumento)
+        if pasta_perfil:
+            opcoes.add_argument(f"--user-data-dir={pasta_perfil}")
+    elif NAVEGADOR_OCULTO:
+        opcoes.add_argument("--headless=new")
+    opcoes.add_experimental_option('prefs', preferencias)
+    return opcoes
+
+# Endereço do SSW (pode apontar para o servidor simulado do ssw_mock)
+URL_SSW = os.getenv("SSW_URL", "https://sistema.ssw.inf.br").rstrip("/")
+
+# Backend de extração: "selenium" (navegador Edge) ou "http" (ssw_http, sem navegador;
+# experimental, validado apenas contra o ssw_mock)
+BACKEND = os.getenv("AUTO455_BACKEND", "selenium")
+
 # Configuração das opções do navegador Edge
-edge_options = Options()
-edge_options.add_experimental_option('prefs', {
-    "download.default_directory": download_folder,
-    "download.prompt_for_download": False,
-    "download.directory_upgrade": True,
-    "safeBrowse.enabled": True
-})
+edge_options = criar_opcoes_edge(download_folder)
 
-def realizar_login(driver, stop_event):
+# Serializa o envio do formulário 455 entre os navegadores de uma mesma conta
+# (contas diferentes têm tabelas de requisições separadas e não disputam a trava)
+_travas_envio = {}
+_trava_travas_envio = threading.Lock()
+
+# Navegadores abertos por abrir_navegador: monitor de recursos e pasta de perfil reservada
+_navegadores_abertos = {}
+# Pastas de perfil reservadas por este processo e o arquivo de trava aberto de cada uma
+_perfis_navegador_em_uso = {}
+_trava_navegadores = threading.Lock()
+
+
+def _trava_envio(credenciais):
+    """Trava de envio do formulário 455 da conta (empresa, CNPJ e usuário) informada"""
+    conta = tuple((credenciais or credenciais_do_ambiente()).get(campo) for campo in ("f1", "f2", "f3"))
+    with _trava_travas_envio:
+        return _travas_envio.setdefault(conta, threading.Lock())
+
+def credenciais_do_ambiente():
+    """Credenciais do credenciais.env nos campos f1 a f4 da tela de login"""
+    return {
+        "f1": os.getenv("SSW_EMPRESA"),
+        "f2": os.getenv("SSW_CNPJ"),
+        "f3": os.getenv("SSW_USUARIO"),
+        "f4": os.getenv("SSW_SENHA"),
+    }
+
+
+def perfil_padrao():
+    """
+    Perfil único configurado pelo credenciais.env e pelas constantes deste módulo
+
+    Returns:
+        dict: Perfil no formato de perfis.criar_perfil
+    """
+    return {
+        "nome": None,
+        "credenciais": credenciais_do_ambiente(),
+        "pasta": download_folder,
+        "meses": MESES_RETROATIVOS,
+        "manifesto": CAMINHO_MANIFESTO,
+        "checkpoints": CAMINHO_CHECKPOINTS,
+        "historico_fatias": CAMINHO_HISTORICO_FATIAS,
+        "consolidado": PASTA_CONSOLIDADO,
+    }
+
+
+def _perfil_de_trabalho(perfil):
+    """
+    Cópia do perfil cuja pasta é a pasta local de preparação, onde acontecem os
+    downloads e renomeações. Sem preparação local, retorna o próprio perfil.
     """
-    Realiza o login no sistema SSW usando as credenciais do arquivo .env
+    if not PREPARACAO_LOCAL:
+        return perfil
+    pasta = os.path.join(PASTA_PREPARACAO, perfil["nome"] or "padrao")
+    os.makedirs(pasta, exist_ok=True)
+    return dict(perfil, pasta=pasta)
+
+
+def realizar_login(driver, stop_event, credenciais=None):
+    """
+    Realiza o login no sistema SSW
     
     Args:
         driver: Instância do WebDriver
         stop_event: Evento para controle de parada da automação
+        credenciais: Campos f1 a f4 da tela de login (padrão: arquivo credenciais.env)
     """
     if stop_event and stop_event.is_set(): return
-    driver.get("https://sistema.ssw.inf.br/bin/ssw0422")
-    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "f1")))
-    driver.find_element(By.NAME, "f1").send_keys(os.getenv("SSW_EMPRESA"))
-    driver.find_element(By.NAME, "f2").send_keys(os.getenv("SSW_CNPJ"))
-    driver.find_element(By.NAME, "f3").send_keys(os.getenv("SSW_USUARIO"))
-    driver.find_element(By.NAME, "f4").send_keys(os.getenv("SSW_SENHA"))
+    credenciais = credenciais or credenciais_do_ambiente()
+    driver.get(f"{URL_SSW}/bin/ssw0422")
+    aguardar(driver, EC.presence_of_element_located((By.NAME, "f1")), "login", stop_event)
+    _preencher_grupo(driver, [((By.NAME, campo), credenciais[campo]) for campo in ("f1", "f2", "f3", "f4")],
+                     stop_event)
     login_button = driver.find_element(By.ID, "5")
     driver.execute_script("arguments[0].click();", login_button)
-    time.sleep(5)
+    # A página de login é substituída pelo menu quando a autenticação termina
+    aguardar(driver, EC.staleness_of(login_button), "login", stop_event)
+
+def _preencher_campo(driver, localizador, valor, stop_event, limpar="clear"):
+    """
+    Escreve um valor em um campo e aguarda o valor ser aplicado
+
+    Args:
+        driver: Instância do WebDriver
+        localizador: Tupla (By, valor) do campo
+        valor: Texto a digitar
+        stop_event: Evento para controle de parada da automação
+        limpar: "clear" (WebElement.clear), "script" (value = '') ou None
+    """
+    campo = driver.find_element(*localizador)
+    if limpar == "clear":
+        campo.clear()
+    elif limpar == "script":
+        driver.execute_script("arguments[0].value = '';", campo)
+    campo.send_keys(valor)
+    aguardar(driver, valor_do_campo(localizador, valor), "campo", stop_event)
+
+def _preencher_grupo(driver, campos, stop_event):
+    """
+    Preenche um grupo de campos com uma única chamada ao navegador. Os campos que
+    não ficarem com o valor pedido (ex.: máscara que só reage à digitação) são
+    digitados um a um.
 
-def preencher_formulario(driver, data_inicio, data_fim, stop_event):
+    Args:
+        driver: Instância do WebDriver
+        campos: Lista de (localizador, valor)
+        stop_event: Evento para controle de parada da automação
+
+    Raises:
+        NoSuchElementException: Se algum campo não existir na página
+        ValueError: Se um campo recusar o valor também quando digitado
+    """
+    rejeitados = preencher_campos(driver, campos)
+    for localizador, valor in campos:
+        if localizador in rejeitados:
+            print(f"Campo {localizador[1]} não aceitou o valor por script. Digitando o valor.")
+            try:
+                _preencher_campo(driver, localizador, valor, stop_event, limpar="script")
+            except TimeoutException:
+                # O campo existe mas não aceita o valor: o formulário mudou, não é lentidão do SSW
+                raise ValueError(f"Campo {localizador[1]} recusou o valor '{valor}'. "
+                                 f"O formulário do SSW pode ter sido alterado.")
+
+def abrir_opcao_455(driver, stop_event):
+    """Digita 455 no campo f3 do menu e posiciona o driver na janela aberta pela opção"""
+    aguardar(driver, EC.presence_of_element_located((By.NAME, "f2")), "menu", stop_event)
+    janelas_antes = driver.window_handles
+    driver.find_element(By.NAME, "f3").send_keys("455")
+    driver.switch_to.window(aguardar(driver, nova_janela(janelas_antes), "nova_janela", stop_event))
+
+
+def preencher_formulario(driver, data_inicio, data_fim, stop_event, ao_enviar=None):
     """
     Preenche o formulário de pesquisa do relatório 455
     
@@ -71,71 +330,58 @@ def preencher_formulario(driver, data_inicio, data_fim, stop_event):
         data_inicio: Data inicial no formato DDMMYY
         data_fim: Data final no formato DDMMYY
         stop_event: Evento para controle de parada da automação
+        ao_enviar: Função chamada logo antes do clique no botão de envio (a partir
+            dele o SSW pode ter aceitado a requisição)
+
+    Raises:
+        NoSuchElementException: Se um campo ou o botão de envio não existir no formulário
+        ValueError: Se um campo recusar o valor pedido
     """
     if stop_event and stop_event.is_set(): return
-    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "f2")))
-    driver.find_element(By.NAME, "f3").send_keys("455")
-    time.sleep(1)
-    abas = driver.window_handles
-    driver.switch_to.window(abas[-1])
-    WebDriverWait(driver, 25).until(EC.presence_of_element_located((By.ID, "11")))
-    time.sleep(1)
-    driver.find_element(By.ID, "11").clear()
-    time.sleep(0.3)
-    driver.find_element(By.ID, "11").send_keys(data_inicio)
-    time.sleep(3)
-    WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.ID, "12")))
-    campo_data_fim = driver.find_element(By.ID, "12")
-    driver.execute_script("arguments[0].value = '';", campo_data_fim)
-    time.sleep(0.3)
-    campo_data_fim.send_keys(data_fim)
-    # ... (o resto da função continua igual)
-    time.sleep(1)
-    driver.find_element(By.NAME, "f21").clear()
-    time.sleep(0.3)
-    driver.find_element(By.NAME, "f21").send_keys("t")
-    time.sleep(0.3)
-    driver.find_element(By.NAME, "f35").clear()
-    time.sleep(0.3)
-    driver.find_element(By.NAME, "f35").send_keys("e")
-    time.sleep(0.3)
-    input_element = driver.find_element(By.NAME, "f37")
-    driver.execute_script("arguments[0].value = '';", input_element)
-    driver.find_element(By.NAME, "f37").send_keys("b")
-    time.sleep(0.3)
-    driver.find_element(By.NAME, "f38").send_keys("g")
-    time.sleep(0.3)
-    driver.find_element(By.NAME, "f39").send_keys("h")
-    login_button = driver.find_element(By.ID, "40")
-    driver.execute_script("arguments[0].click();", login_button)
-    time.sleep(0.8)
+    abrir_opcao_455(driver, stop_event)
+    aguardar(driver, EC.presence_of_element_located((By.ID, "11")), "formulario", stop_event)
+    # O SSW só libera a data final depois que a inicial é preenchida
+    _preencher_grupo(driver, [((By.ID, "11"), data_inicio)], stop_event)
+    aguardar(driver, EC.element_to_be_clickable((By.ID, "12")), "campo", stop_event)
+    _preencher_grupo(driver, [
+        ((By.ID, "12"), data_fim),
+        ((By.NAME, "f21"), "t"),
+        ((By.NAME, "f35"), "e"),
+        ((By.NAME, "f37"), "b"),
+        ((By.NAME, "f38"), "g"),
+        ((By.NAME, "f39"), "h"),
+    ], stop_event)
+    if ao_enviar:
+        ao_enviar()
+    if not clicar(driver, (By.ID, "40")):
+        raise NoSuchElementException("Botão 40 de envio não encontrado no formulário da opção 455.")
+    # O SSW não expõe um elemento para a confirmação: resta uma pausa curta do perfil
+    pausa(tempo_da_etapa("pausa_confirmacao"), stop_event)
     actions = ActionChains(driver)
     actions.send_keys("1").perform()
-    time.sleep(5)
-    abas = driver.window_handles
-    driver.switch_to.window(abas[-1])
-    time.sleep(2)
+    aguardar(driver, janela_com_elemento((By.ID, "tblsr")), "tabela", stop_event)
 
 
-def capturar_seq(driver, stop_event):
+def capturar_seq(driver, stop_event, data_inicio=None, data_fim=None):
     """
     Captura o número de sequência da requisição gerada
     
     Args:
         driver: Instância do WebDriver
         stop_event: Evento para controle de parada da automação
+        data_inicio: Data inicial enviada (DDMMYY); com data_fim, escolhe a linha do período
+        data_fim: Data final enviada (DDMMYY)
     
     Returns:
         str: Número da sequência ou None se não encontrado
     """
     if stop_event and stop_event.is_set(): return None
     try:
-        tabela = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "tblsr"))
-        )
-        linhas = tabela.find_elements(By.TAG_NAME, "tr")
-        if len(linhas) > 1:
-            seq_da_requisicao = linhas[1].find_element(By.TAG_NAME, "td").text
+        aguardar(driver, tabela_renderizada(), "tabela", stop_event)
+        linhas = ler_tabela(driver)
+        seq_da_requisicao = (seq_do_periodo(linhas, data_inicio, data_fim) if data_inicio and data_fim
+                             else (linhas[0]["celulas"][0] if linhas and linhas[0]["celulas"] else None))
+        if seq_da_requisicao:
             print(f"Seq da requisição: {seq_da_requisicao}")
             return seq_da_requisicao
         else:
@@ -145,142 +391,1279 @@ def capturar_seq(driver, stop_event):
         print(f"Erro ao capturar o seq: {e}")
         return None
 
-def atualizar_relatorio(driver, seq_da_requisicao, stop_event):
+def _links_prontos(driver):
+    """
+    Lê a tabela tblsr de uma vez e devolve os links <u> de download já disponíveis
+
+    Returns:
+        dict: Link de download por seq (apenas dos relatórios prontos)
+    """
+    return {
+        linha["celulas"][0]: linha["link"]
+        for linha in ler_tabela(driver) or []
+        if linha["celulas"] and linha["link"]
+    }
+
+def _clicar_atualizar(driver, stop_event):
+    """Clica no botão de atualização (ID "2") e aguarda a tabela tblsr ser renderizada novamente"""
+    tabelas = driver.find_elements(By.ID, "tblsr")
+    update_button = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.ID, "2"))
+    )
+    driver.execute_script("arguments[0].click();", update_button)
+    if tabelas:
+        try:
+            WebDriverWait(driver, tempo_da_etapa("campo")).until(EC.staleness_of(tabelas[0]))
+        except TimeoutException:
+            pass  # A tabela foi atualizada no lugar, sem recarregar a página
+    aguardar(driver, tabela_renderizada(), "tabela", stop_event)
+
+def aguardar_relatorios(driver, seqs, ao_ficar_pronto, stop_event, prazo=None):
+    """
+    Acompanha uma ou mais requisições na tabela tblsr até ficarem prontas.
+    A cada ciclo a tabela é atualizada uma única vez e todos os seqs pendentes
+    são verificados; os intervalos entre ciclos crescem até o prazo total.
+
+    Args:
+        driver: Instância do WebDriver, na janela da tabela tblsr
+        seqs: Números de sequência a acompanhar
+        ao_ficar_pronto: Função chamada com (seq, link) quando o link <u> do seq aparece
+        stop_event: Evento para controle de parada da automação
+        prazo: Tempo máximo em segundos (padrão: PRAZO_RELATORIO)
+
+    Returns:
+        list: Seqs que não ficaram prontos dentro do prazo
+
+    Raises:
+        InterruptedError: Se o sinal de parada for recebido durante a espera
     """
-    Atualiza o relatório e inicia o download quando disponível
+    prazo = PRAZO_RELATORIO if prazo is None else prazo
+    pendentes = list(seqs)
+    inicio = time.monotonic()
+    tentativa = 0
+    while pendentes:
+        links = _links_prontos(driver)
+        for seq in list(pendentes):
+            link = links.get(seq)
+            if link:
+                print(f"Relatório do seq {seq} pronto após {time.monotonic() - inicio:.0f}s.")
+                pendentes.remove(seq)
+                ao_ficar_pronto(seq, link)
+                # O download pode recarregar a tabela: os links dos demais seqs são lidos de novo
+                links = _links_prontos(driver)
+
+        restante = prazo - (time.monotonic() - inicio)
+        if not pendentes or restante <= 0:
+            break
+        intervalo = INTERVALOS_ATUALIZACAO[min(tentativa, len(INTERVALOS_ATUALIZACAO) - 1)]
+        tentativa += 1
+        pausa(min(intervalo, restante), stop_event)
+        try:
+            _clicar_atualizar(driver, stop_event)
+        except InterruptedError:
+            raise
+        except Exception as e:
+            print(f"Botão de atualização não encontrado ou não clicável: {e}")
+
+    for seq in pendentes:
+        print(f"Relatório do seq {seq} não ficou pronto em {prazo}s.")
+    return pendentes
+
+def atualizar_relatorio(driver, seq_da_requisicao, stop_event, prazo=None):
+    """
+    Aguarda o relatório ficar pronto e inicia o download quando disponível
     
     Args:
         driver: Instância do WebDriver
         seq_da_requisicao: Número da sequência do relatório
         stop_event: Evento para controle de parada da automação
+        prazo: Tempo máximo em segundos para o relatório ficar pronto (padrão: PRAZO_RELATORIO)
     
     Returns:
         bool: True se o download foi iniciado com sucesso, False caso contrário
     """
     if stop_event and stop_event.is_set(): return False
-    try:
-        # Loop para esperar de forma cancelável
-        for _ in range(150):
-            if stop_event and stop_event.is_set(): return False
-            time.sleep(1)
-            
-        update_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.ID, "2"))
-        )
-        driver.execute_script("arguments[0].click();", update_button)
-        time.sleep(5)
-    except Exception as e:
-        print(f"Botão de atualização não encontrado ou não clicável: {e}")
-        return False
-    
-    # ... (o resto da função continua igual)
-    relatorios_atualizados = driver.find_elements(By.CSS_SELECTOR, "table#tblsr tr")
-    relatorio_encontrado = None
-    for relatorio in relatorios_atualizados[1:]:
-        seq_atual = relatorio.find_element(By.TAG_NAME, "td").text
-        if seq_atual == seq_da_requisicao:
-            relatorio_encontrado = relatorio
-            break
-    if relatorio_encontrado:
+    iniciado = []
+
+    def clicar_link(seq, link):
         try:
-            link = relatorio_encontrado.find_element(By.TAG_NAME, "u")
             driver.execute_script("arguments[0].click();", link)
             print("Clicou no link da requisição correspondente para fazer o download.")
-            return True
+            iniciado.append(seq)
         except Exception as e:
             print(f"Não foi possível encontrar ou clicar no link de download: {e}")
-            return False
-    else:
-        print("Nenhum relatório correspondente ao seq encontrado após a atualização.")
+
+    try:
+        aguardar_relatorios(driver, [seq_da_requisicao], clicar_link, stop_event, prazo)
+    except InterruptedError:
         return False
+    return bool(iniciado)
 
-def renomear_ultimo_arquivo_baixado(pasta_download, nome_base_novo):
+def renomear_arquivo_baixado(arquivo_baixado, nome_base_novo, pasta_destino):
     """
-    Renomeia o último arquivo baixado na pasta de download
+    Renomeia o arquivo baixado para o nome do mês, substituindo a versão anterior
     
     Args:
-        pasta_download: Caminho da pasta de download
+        arquivo_baixado: Caminho exato do arquivo retornado por aguardar_download
         nome_base_novo: Novo nome base para o arquivo (sem extensão)
+        pasta_destino: Pasta final do arquivo renomeado
+
+    Returns:
+        str: Caminho final do arquivo, ou None se a renomeação falhar
     """
     try:
-        arquivos = [
-            os.path.join(pasta_download, f)
-            for f in os.listdir(pasta_download)
-            if f.lower() != "desktop.ini"
-        ]
-        if not arquivos:
-            print("Nenhum arquivo encontrado na pasta de download.")
-            return
-        arquivo_mais_recente = max(arquivos, key=os.path.getmtime)
-        print(f"Arquivo mais recente encontrado: {os.path.basename(arquivo_mais_recente)}")
-        _, extensao = os.path.splitext(arquivo_mais_recente)
-        novo_nome_completo = os.path.join(pasta_download, nome_base_novo + extensao)
-        if os.path.exists(novo_nome_completo):
-            print(f"Arquivo '{os.path.basename(novo_nome_completo)}' já existe. Removendo o antigo.")
-            os.remove(novo_nome_completo)
-        print(f"Renomeando '{os.path.basename(arquivo_mais_recente)}' para '{os.path.basename(novo_nome_completo)}'")
-        os.rename(arquivo_mais_recente, novo_nome_completo)
-        print("Arquivo renomeado com sucesso.")
+        _, extensao = os.path.splitext(arquivo_baixado)
+        novo_nome_completo = os.path.join(pasta_destino, nome_base_novo + extensao)
+        print(f"Renomeando '{os.path.basename(arquivo_baixado)}' para '{os.path.basename(novo_nome_completo)}'")
+        if substituir_se_alterado(arquivo_baixado, novo_nome_completo):
+            print("Arquivo renomeado com sucesso.")
+        else:
+            print("Conteúdo idêntico ao arquivo já existente do mês. O download foi descartado.")
+        return novo_nome_completo
     except Exception as e:
         print(f"Ocorreu um erro ao gerenciar o arquivo: {e}")
+        return None
 
 
-def main(stop_event=None):
+def criar_periodo(inicio, fim, nome_arquivo=None):
     """
-    Função principal que coordena todo o processo de extração
-    Extrai relatórios dos últimos 3 meses
-    
+    Monta o dicionário de um período de extração
+
     Args:
-        stop_event: Evento opcional para controle de parada da automação
+        inicio: Primeiro dia do período (datetime)
+        fim: Último dia do período, inclusive (datetime)
+        nome_arquivo: Nome base do arquivo (padrão: mês e ano, com os dias se o mês não for completo)
+
+    Returns:
+        dict: Datas no formato do formulário 455, datas originais e nome do arquivo
     """
-    hoje = datetime.now()
-    for i in range(3):
-        if stop_event and stop_event.is_set():
-            print("Sinal de parada recebido. Interrompendo a extração.")
-            return
+    mes_completo = (inicio.day == 1 and (fim.year, fim.month) == (inicio.year, inicio.month)
+                    and fim.day == calendar.monthrange(fim.year, fim.month)[1])
+    if nome_arquivo is None:
+        nome_arquivo = MESES_ABREVIADOS[inicio.month - 1] + str(inicio.year)
+        if not mes_completo:
+            nome_arquivo += f"_{inicio.strftime('%d')}-{fim.strftime('%d')}"
+    return {
+        "mes": inicio.month,
+        "ano": inicio.year,
+        "data_inicio": inicio.strftime('%d%m%y'),
+        "data_fim": fim.strftime('%d%m%y'),
+        "nome_arquivo": nome_arquivo,
+        "inicio": inicio,
+        "fim": fim,
+        "mes_completo": mes_completo,
+    }
+
+
+def calcular_periodos(hoje, quantidade=MESES_RETROATIVOS):
+    """
+    Calcula os meses a extrair, do mês atual para trás
+
+    Args:
+        hoje: Data de referência da execução
+        quantidade: Quantidade de meses (incluindo o atual)
+
+    Returns:
+        list: Dicionários com as datas e o nome do arquivo de cada mês
+    """
+    periodos = []
+    primeiro_dia_mes_atual = hoje.replace(day=1)
+    for i in range(quantidade):
+        ano = primeiro_dia_mes_atual.year
+        mes = primeiro_dia_mes_atual.month - i
+        while mes < 1:
+            mes += 12
+            ano -= 1
+        primeiro_dia = datetime(ano, mes, 1)
+        ultimo_dia = datetime(ano, mes, calendar.monthrange(ano, mes)[1])
+        periodos.append(criar_periodo(primeiro_dia, ultimo_dia))
+    return periodos
+
+
+def periodos_do_intervalo(inicio, fim):
+    """
+    Divide um intervalo arbitrário de datas em um período por mês, do mais recente para o mais antigo
+
+    Args:
+        inicio: Primeiro dia do intervalo (datetime)
+        fim: Último dia do intervalo, inclusive (datetime)
+
+    Returns:
+        list: Dicionários no formato de calcular_periodos
+    """
+    periodos = []
+    atual = datetime(inicio.year, inicio.month, inicio.day)
+    while atual <= fim:
+        ultimo_dia_mes = datetime(atual.year, atual.month, calendar.monthrange(atual.year, atual.month)[1])
+        fim_periodo = min(ultimo_dia_mes, datetime(fim.year, fim.month, fim.day))
+        periodos.append(criar_periodo(atual, fim_periodo))
+        atual = ultimo_dia_mes + timedelta(days=1)
+    return list(reversed(periodos))
+
+
+def _fatiar_periodo(periodo, dias, pai=None):
+    """
+    Divide um período em fatias de até "dias" dias, ligadas ao período de origem
+
+    Returns:
+        list: O próprio período se ele couber em uma fatia, ou as fatias em ordem
+    """
+    fatias = fatiar(periodo["inicio"], periodo["fim"], dias)
+    if len(fatias) == 1 and pai is None:
+        return [periodo]
+    pai = pai or periodo
+    return [
+        dict(criar_periodo(inicio, fim, f"{pai['nome_arquivo']}_parte{inicio.strftime('%d')}"), periodo_pai=pai)
+        for inicio, fim in fatias
+    ]
+
+
+def _dias_do_periodo(periodo):
+    return (periodo["fim"] - periodo["inicio"]).days + 1
+
+
+def abrir_navegador(pasta_download, stop_event, credenciais=None, nome_perfil=None):
+    """
+    Abre um navegador Edge baixando na pasta informada e realiza o login
+
+    Args:
+        pasta_download: Pasta onde o navegador salva os downloads
+        stop_event: Evento para controle de parada da automação
+        credenciais: Campos f1 a f4 da tela de login (padrão: arquivo credenciais.env)
+        nome_perfil: Nome do perfil da conta (separa as pastas de perfil do Edge no modo enxuto)
+
+    Returns:
+        WebDriver: Navegador autenticado, posicionado no menu do SSW
+    """
+    pasta_perfil = _reservar_perfil_navegador(nome_perfil) if NAVEGADOR_ENXUTO else None
+    try:
+        with medir("navegador"):
+            driver = webdriver.Edge(options=criar_opcoes_edge(pasta_download, pasta_perfil))
+    except BaseException:
+        _liberar_perfil_navegador(pasta_perfil)
+        raise
+    with _trava_navegadores:
+        _navegadores_abertos[id(driver)] = (monitorar(driver), pasta_perfil)
+    try:
+        with medir("login"):
+            realizar_login(driver, stop_event, credenciais)
+    except BaseException:
+        fechar_navegador(driver)
+        raise
+    return driver
+
+
+def _travar_arquivo(caminho):
+    """
+    Abre o arquivo de trava e o bloqueia para este processo sem esperar.
+    O sistema libera o bloqueio se o processo terminar sem fechar o arquivo.
+
+    Returns:
+        Arquivo aberto e bloqueado, ou None se outro processo já detém a trava
+    """
+    arquivo = open(caminho, "a+b")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return arquivo
+    except OSError:
+        arquivo.close()
+        return None
+
+
+def _reservar_perfil_navegador(nome_perfil=None):
+    """
+    Reserva uma pasta de perfil do Edge livre da conta. Cada navegador aberto ao mesmo
+    tempo precisa de uma pasta própria, e as pastas são separadas por conta para que
+    um navegador não herde cookies e sessão do SSW de outra conta. A reserva vale
+    também entre processos (painel, CLI, serviço): cada pasta tem um arquivo .trava
+    bloqueado enquanto o navegador estiver aberto. Ao fechar o navegador a pasta volta
+    a ficar disponível e o próximo da mesma conta reaproveita o perfil já criado.
+    """
+    pasta_conta = os.path.join(PASTA_PERFIS_NAVEGADOR, nome_perfil or "padrao")
+    os.makedirs(pasta_conta, exist_ok=True)
+    with _trava_navegadores:
+        indice = 1
+        while True:
+            pasta_perfil = os.path.join(pasta_conta, f"perfil{indice}")
+            if pasta_perfil not in _perfis_navegador_em_uso:
+                trava = _travar_arquivo(pasta_perfil + ".trava")
+                if trava:
+                    _perfis_navegador_em_uso[pasta_perfil] = trava
+                    return pasta_perfil
+            indice += 1
+
+
+def _liberar_perfil_navegador(pasta_perfil):
+    with _trava_navegadores:
+        trava = _perfis_navegador_em_uso.pop(pasta_perfil, None)
+    if trava:
+        trava.close()  # Fechar o arquivo desfaz o bloqueio
+
+
+def fechar_navegador(driver):
+    """
+    Encerra o navegador, finaliza os processos que sobreviverem ao quit e
+    registra o pico de memória e CPU nas métricas
+
+    Raises:
+        WebDriverException: Se o driver não responder ao quit (os processos são finalizados mesmo assim)
+    """
+    with _trava_navegadores:
+        monitor, pasta_perfil = _navegadores_abertos.pop(id(driver), (None, None))
+    try:
+        if monitor:
+            monitor.encerrar(driver.quit)
+        else:
+            driver.quit()
+    finally:
+        _liberar_perfil_navegador(pasta_perfil)
+
+
+def _na_tela_de_login(driver):
+    """A página de login (ssw0422) é a única com campo de senha"""
+    return bool(driver.find_elements(By.CSS_SELECTOR, "input[type='password']"))
+
+
+def sessao_ativa(driver):
+    """
+    Verifica se o navegador ainda está autenticado no SSW.
+    A janela do menu só mostra a expiração quando navega, então as janelas
+    abertas pela opção 455 são conferidas primeiro: depois de uma expiração no
+    servidor é nelas que a tela de login aparece. Deixa o driver na janela do menu.
+
+    Returns:
+        bool: False se o navegador caiu ou se alguma janela voltou para a tela de login
+    """
+    try:
+        janelas = driver.window_handles
+        for janela in reversed(janelas[1:]):
+            driver.switch_to.window(janela)
+            if _na_tela_de_login(driver):
+                driver.switch_to.window(janelas[0])
+                return False
+        driver.switch_to.window(janelas[0])
+        no_menu = bool(driver.find_elements(By.NAME, "f3"))
+        na_tela_de_login = bool(driver.find_elements(By.NAME, "f4")) or _na_tela_de_login(driver)
+        return no_menu and not na_tela_de_login
+    except WebDriverException:
+        return False
+
+
+def garantir_sessao(driver, stop_event, credenciais=None):
+    """Refaz o login se a sessão do SSW expirou"""
+    if not sessao_ativa(driver):
+        print("Sessão do SSW expirada. Realizando novo login.")
+        with medir("login", motivo="sessao_expirada"):
+            realizar_login(driver, stop_event, credenciais)
 
-        driver = None
+
+def fechar_janelas_secundarias(driver):
+    """Fecha as janelas abertas pela opção 455 e volta para a janela do menu"""
+    principal = driver.window_handles[0]
+    for janela in driver.window_handles[1:]:
+        driver.switch_to.window(janela)
+        driver.close()
+    driver.switch_to.window(principal)
+
+
+def _solicitar_relatorio(driver, periodo, stop_event, marcacoes, credenciais=None, enviado=None):
+    """
+    Abre a opção 455 a partir do menu, envia o formulário do período e captura o seq.
+    Fecha as janelas da tentativa anterior e refaz o login se preciso. Para repeti-la
+    sem duplicar a requisição no SSW, use _etapa_de_solicitacao.
+
+    Args:
+        enviado: Lista que recebe um item quando o botão de envio é clicado
+
+    Returns:
+        str: Seq da requisição, ou None se não foi capturado
+    """
+    fechar_janelas_secundarias(driver)
+    garantir_sessao(driver, stop_event, credenciais)
+    # O seq é a linha mais recente da tblsr com o período enviado. No modo paralelo
+    # os envios da mesma conta também são serializados, para que um navegador não
+    # capture o seq do outro quando o SSW não mostra o período na tabela
+    with _trava_envio(credenciais):
+        with medir("formulario", **marcacoes):
+            preencher_formulario(driver, periodo["data_inicio"], periodo["data_fim"], stop_event,
+                                 ao_enviar=None if enviado is None else lambda: enviado.append(True))
+        if stop_event and stop_event.is_set(): raise InterruptedError
+
+        with medir("capturar_seq", **marcacoes) as medicao:
+            seq = capturar_seq(driver, stop_event, periodo["data_inicio"], periodo["data_fim"])
+            medicao["status"] = "ok" if seq else "falha"
+        if stop_event and stop_event.is_set(): raise InterruptedError
+    return seq
+
+
+def _etapa_de_solicitacao(driver, periodo, stop_event, marcacoes, credenciais=None):
+    """
+    Monta a função repetida por repetir_etapa na solicitação do relatório.
+    O formulário só é reenviado quando a tentativa anterior falhou antes do clique
+    em enviar. Depois do clique o SSW pode já ter aceitado a requisição (a falha
+    foi, por exemplo, na leitura do seq): a próxima tentativa procura na tblsr o
+    seq mais recente do período e só reenvia se o período não estiver lá, para não
+    enfileirar gerações duplicadas no SSW.
+
+    Returns:
+        Função sem argumentos que retorna o seq da requisição ou None
+    """
+    enviado = []
+
+    def solicitar():
+        if enviado:
+            linhas = _tabela_de_requisicoes(driver, stop_event, credenciais=credenciais)
+            seq = seq_do_periodo(linhas, periodo["data_inicio"], periodo["data_fim"], primeira_linha=False)
+            if seq:
+                print(f"O formulário já tinha sido enviado. Usando o seq {seq} do período na tabela.")
+                return seq
+            print("A requisição do período não aparece na tabela. Enviando o formulário novamente.")
+            enviado.clear()
+        return _solicitar_relatorio(driver, periodo, stop_event, marcacoes, credenciais, enviado)
+
+    return solicitar
+
+
+def _tabela_de_requisicoes(driver, stop_event, url_tabela=None, credenciais=None):
+    """
+    Lê a tabela tblsr de requisições: pela URL gravada em um checkpoint (em uma nova aba)
+    ou, sem URL, em uma janela já aberta. Se a tabela não for encontrada, a abre pelo
+    caminho do fluxo normal (menu, opção 455), já que nada garante que o SSW sirva a
+    tblsr para um GET direto da URL.
+
+    Returns:
+        list: Linhas no formato de dom.ler_tabela, ou None se a tabela não foi encontrada
+    """
+    try:
+        if url_tabela:
+            driver.switch_to.new_window("tab")
+            driver.get(url_tabela)
+            aguardar(driver, tabela_renderizada(), "tabela", stop_event)
+        else:
+            aguardar(driver, janela_com_elemento((By.ID, "tblsr")), "tabela", stop_event)
+        return ler_tabela(driver) or []
+    except TimeoutException:
+        print("Tabela de requisições não encontrada. Abrindo-a pelo menu (opção 455).")
+    fechar_janelas_secundarias(driver)
+    garantir_sessao(driver, stop_event, credenciais)
+    abrir_opcao_455(driver, stop_event)
+    try:
+        aguardar(driver, janela_com_elemento((By.ID, "tblsr")), "tabela", stop_event)
+    except TimeoutException:
+        print("A opção 455 não mostrou a tabela de requisições.")
+        return None
+    return ler_tabela(driver) or []
+
+
+def _abrir_tabela(driver, url_tabela, stop_event, credenciais=None):
+    """
+    Abre a tabela tblsr gravada em um checkpoint (ou, se ela não carregar pela URL, pelo menu)
+
+    Returns:
+        set: Seqs listados na tabela (vazio se ela não foi encontrada)
+    """
+    linhas = _tabela_de_requisicoes(driver, stop_event, url_tabela, credenciais)
+    return {linha["celulas"][0] for linha in linhas or [] if linha["celulas"]}
+
+
+def _baixar_relatorio(driver, seq, pasta_download, stop_event, marcacoes, avancar):
+    """
+    Aguarda o relatório do seq ficar pronto e baixa o arquivo, repetindo apenas a etapa que falhar
+
+    Returns:
+        str: Caminho do arquivo baixado (ainda com o nome do SSW), ou None
+    """
+    arquivos_antes = instantaneo_pasta(pasta_download)
+    with medir("geracao", **marcacoes) as medicao:
+        # Um estouro do prazo não é repetido: o seq continua no checkpoint para a próxima execução
+        pronto = repetir_etapa(lambda: atualizar_relatorio(driver, seq, stop_event), "geracao", stop_event,
+                               repetir_vazio=False)
+        medicao["status"] = "ok" if pronto else "falha"
+    if not pronto:
+        return None
+    avancar("pronto")
+
+    print("Aguardando a conclusão do download...")
+    tentativas = []
+
+    def baixar():
+        # A partir da segunda tentativa o link do relatório, que já está pronto, é clicado de novo
+        if tentativas and not atualizar_relatorio(driver, seq, stop_event):
+            return None
+        tentativas.append(1)
+        return aguardar_download(pasta_download, arquivos_antes, stop_event)
+
+    with medir("download", **marcacoes) as medicao:
+        arquivo_baixado = repetir_etapa(baixar, "download", stop_event)
+        medicao["status"] = "ok" if arquivo_baixado else "falha"
+    if arquivo_baixado:
+        avancar("baixado", arquivo=arquivo_baixado)
+    return arquivo_baixado
+
+
+def extrair_periodo(driver, periodo, pasta_download, stop_event, tentativa=1, checkpoints=None, perfil=None):
+    """
+    Executa a extração de um mês em um navegador já autenticado.
+    Com checkpoints, cada etapa concluída é gravada e uma extração interrompida
+    retoma do ponto em que parou (ex.: acompanha o seq já solicitado).
+
+    Args:
+        driver: Navegador retornado por abrir_navegador
+        periodo: Dicionário gerado por calcular_periodos
+        pasta_download: Pasta onde este navegador salva os downloads
+        stop_event: Evento para controle de parada da automação
+        tentativa: Número da tentativa deste mês (marcação das métricas)
+        checkpoints: Instância de checkpoint.Checkpoints (opcional)
+        perfil: Perfil com as credenciais e a pasta de saída (padrão: perfil_padrao())
+
+    Returns:
+        str: Caminho final do arquivo do mês, ou None se não houve download
+
+    Raises:
+        InterruptedError: Se o sinal de parada for recebido durante a extração
+    """
+    perfil = perfil or perfil_padrao()
+    marcacoes = {"periodo": periodo["nome_arquivo"], "tentativa": tentativa}
+    estado = checkpoints.obter(periodo) if checkpoints else None
+
+    def avancar(etapa, **dados):
+        if checkpoints:
+            checkpoints.avancar(periodo, etapa, **dados)
+
+    arquivo_final = None
+    arquivo_baixado = None
+    data_inicio_str = periodo["data_inicio"]
+    data_fim_str = periodo["data_fim"]
+    print(f"\n--- Iniciando extração para o período: {data_inicio_str} a {data_fim_str} ---")
+
+    if estado and estado["etapa"] == "baixado":
+        print("Retomando do checkpoint: o arquivo já foi baixado, falta renomeá-lo.")
+        arquivo_baixado = estado["arquivo"]
+    else:
+        seq = None
+        if estado and estado.get("seq"):
+            if estado["seq"] in _abrir_tabela(driver, estado["url_tabela"], stop_event, perfil["credenciais"]):
+                seq = estado["seq"]
+                print(f"Retomando do checkpoint: acompanhando o seq {seq} já solicitado.")
+            else:
+                print(f"Seq {estado['seq']} do checkpoint não encontrado. Solicitando o relatório novamente.")
+        if seq is None:
+            seq = repetir_etapa(
+                _etapa_de_solicitacao(driver, periodo, stop_event, marcacoes, perfil["credenciais"]),
+                "solicitacao", stop_event)
+            if seq:
+                avancar("solicitado", seq=seq, url_tabela=driver.current_url)
+        if seq:
+            arquivo_baixado = _baixar_relatorio(driver, seq, pasta_download, stop_event, marcacoes, avancar)
+
+    if arquivo_baixado:
+        with medir("renomear", **marcacoes) as medicao:
+            arquivo_final = repetir_etapa(
+                lambda: renomear_arquivo_baixado(arquivo_baixado, periodo["nome_arquivo"], perfil["pasta"]),
+                "renomear", stop_event)
+            medicao["status"] = "ok" if arquivo_final else "falha"
+        if arquivo_final:
+            avancar("renomeado", arquivo=arquivo_final)
+    print(f"--- Finalizada extração para o período: {data_inicio_str} a {data_fim_str} ---")
+    return arquivo_final
+
+
+def _extrair_no_navegador(navegador, periodo, stop_event, reutilizar_sessao, checkpoints=None):
+    """
+    Extrai um mês usando a vaga de navegador informada.
+    Com reutilizar_sessao, o navegador e o login são mantidos entre os meses e
+    apenas as janelas da opção 455 são fechadas ao final de cada mês.
+
+    Args:
+        navegador: Vaga do pool criada por _criar_vagas
+        periodo: Dicionário gerado por calcular_periodos
+        stop_event: Evento para controle de parada da automação
+        reutilizar_sessao: Mantém o navegador aberto para o próximo mês
+        checkpoints: Instância de checkpoint.Checkpoints (opcional)
+
+    Returns:
+        str: Caminho final do arquivo do mês, ou None se não houve download
+    """
+    perfil = navegador["perfil"]
+    try:
+        if navegador["driver"] is None:
+            _abrir_vaga(navegador, stop_event)
+        else:
+            garantir_sessao(navegador["driver"], stop_event, perfil["credenciais"])
+        if stop_event and stop_event.is_set(): raise InterruptedError
         try:
-            primeiro_dia_mes_atual = hoje.replace(day=1)
-            ano = primeiro_dia_mes_atual.year
-            mes = primeiro_dia_mes_atual.month - i
-            if mes < 1:
-                mes = 12 + mes
-                ano -= 1
-            primeiro_dia = datetime(ano, mes, 1)
-            ultimo_dia_numero = calendar.monthrange(ano, mes)[1]
-            ultimo_dia = datetime(ano, mes, ultimo_dia_numero)
-            data_inicio_str = primeiro_dia.strftime('%d%m%y')
-            data_fim_str = ultimo_dia.strftime('%d%m%y')
-            nome_arquivo_mes = primeiro_dia.strftime('%b').upper() + str(ano)
-            print(f"\n--- Iniciando extração para o período: {data_inicio_str} a {data_fim_str} ---")
-            
-            driver = webdriver.Edge(options=edge_options)
-            realizar_login(driver, stop_event)
-            if stop_event and stop_event.is_set(): raise InterruptedError
-            
-            preencher_formulario(driver, data_inicio_str, data_fim_str, stop_event)
+            return extrair_periodo(navegador["driver"], periodo, navegador["pasta"], stop_event,
+                                   checkpoints=checkpoints, perfil=perfil)
+        except TimeoutException:
+            # A sessão pode ter expirado no meio do mês: refaz o login e tenta o mês mais uma vez
+            if sessao_ativa(navegador["driver"]):
+                raise
+            fechar_janelas_secundarias(navegador["driver"])
+            garantir_sessao(navegador["driver"], stop_event, perfil["credenciais"])
+            return extrair_periodo(navegador["driver"], periodo, navegador["pasta"], stop_event, tentativa=2,
+                                   checkpoints=checkpoints, perfil=perfil)
+    finally:
+        driver = navegador["driver"]
+        if driver and reutilizar_sessao:
+            try:
+                fechar_janelas_secundarias(driver)
+            except WebDriverException:
+                print("Navegador não responde. Um novo será aberto para o próximo período.")
+                _encerrar_navegador(navegador)
+        elif driver:
+            _encerrar_navegador(navegador)
+
+
+def _abrir_vaga(navegador, stop_event):
+    """
+    Abre e autentica o navegador de uma vaga. Com um teto global de navegadores
+    (executar_perfis), aguarda uma vaga livre no teto antes de abrir.
+    """
+    limite = navegador.get("limite")
+    if limite:
+        while not limite.acquire(timeout=1):
             if stop_event and stop_event.is_set(): raise InterruptedError
+    try:
+        navegador["driver"] = abrir_navegador(navegador["pasta"], stop_event, navegador["perfil"]["credenciais"],
+                                              navegador["perfil"]["nome"])
+    except BaseException:
+        if limite:
+            limite.release()
+        raise
+
+
+def _encerrar_navegador(navegador):
+    if navegador["driver"]:
+        print("Encerrando a sessão do navegador.")
+        try:
+            fechar_navegador(navegador["driver"])
+        except WebDriverException:
+            pass
+        navegador["driver"] = None
+        if navegador.get("limite"):
+            navegador["limite"].release()
+
+
+def _criar_vagas(usa_pool, max_navegadores, perfil=None, limite=None):
+    """
+    Cria as vagas de navegador de uma execução, ainda sem driver.
+    No modo paralelo cada vaga baixa em uma subpasta própria; nos demais modos
+    há uma única vaga baixando direto na pasta de saída do perfil.
+
+    Args:
+        usa_pool: Cria uma vaga por navegador do modo paralelo
+        max_navegadores: Tamanho do pool
+        perfil: Perfil dono das vagas (padrão: perfil_padrao())
+        limite: Semáforo do teto global de navegadores abertos (opcional)
+
+    Returns:
+        list: Vagas {"pasta", "driver", "perfil", "limite"}
+    """
+    perfil = perfil or perfil_padrao()
+    if not usa_pool:
+        return [{"pasta": perfil["pasta"], "driver": None, "perfil": perfil, "limite": limite}]
+    vagas = []
+    for indice in range(max(1, min(max_navegadores, perfil["meses"] or MESES_RETROATIVOS))):
+        pasta = os.path.join(perfil["pasta"], f"_navegador{indice + 1}")
+        os.makedirs(pasta, exist_ok=True)
+        vagas.append({"pasta": pasta, "driver": None, "perfil": perfil, "limite": limite})
+    return vagas
+
+
+def _usa_pool(backend, paralelo, pipeline):
+    return backend != "http" and paralelo and not pipeline
+
+
+def preaquecer_navegadores(stop_event=None, paralelo=None, max_navegadores=None, backend=None, pipeline=None):
+    """
+    Abre e autentica antecipadamente os navegadores que a próxima execução vai usar.
+    O resultado deve ser repassado para main(navegadores=...), que passa a ser
+    responsável por encerrá-los.
+
+    Returns:
+        list: Vagas {"pasta", "driver"} já logadas (vazia no backend HTTP)
+    """
+    backend = backend or BACKEND
+    if backend == "http":
+        return []
+    paralelo = MODO_PARALELO if paralelo is None else paralelo
+    pipeline = MODO_PIPELINE if pipeline is None else pipeline
+    navegadores = _criar_vagas(_usa_pool(backend, paralelo, pipeline), max_navegadores or MAX_NAVEGADORES,
+                               _perfil_de_trabalho(perfil_padrao()))
+    for navegador in navegadores:
+        if stop_event and stop_event.is_set():
+            break
+        try:
+            _abrir_vaga(navegador, stop_event)
+        except Exception as e:
+            # A vaga fica sem driver e main abre um novo quando precisar
+            print(f"Não foi possível pré-aquecer um navegador: {e}")
+    print(f"{sum(1 for n in navegadores if n['driver'])} navegador(es) pré-aquecido(s) e autenticado(s).")
+    return navegadores
 
-            seq = capturar_seq(driver, stop_event)
+
+def manter_navegadores(navegadores, stop_event=None):
+    """
+    Mantém vivas as sessões pré-aquecidas: faz uma requisição leve à página do
+    menu e refaz o login se o SSW tiver derrubado a sessão
+    """
+    for navegador in navegadores:
+        driver = navegador["driver"]
+        if not driver:
+            continue
+        try:
+            driver.switch_to.window(driver.window_handles[0])
+            driver.execute_script("fetch(location.href, {credentials: 'include'}).catch(function () {});")
+            garantir_sessao(driver, stop_event, navegador["perfil"]["credenciais"])
+        except WebDriverException:
+            print("Navegador pré-aquecido não responde e foi descartado.")
+            _encerrar_navegador(navegador)
+
+
+def encerrar_navegadores(navegadores):
+    """Encerra os navegadores de uma lista de vagas"""
+    for navegador in navegadores:
+        _encerrar_navegador(navegador)
+
+
+def _executar_em_pipeline(periodos, navegador, stop_event, ao_concluir, checkpoints=None):
+    """
+    Solicita o relatório de todos os meses em uma única sessão e só então
+    acompanha as requisições juntas, baixando cada uma assim que fica pronta.
+    A geração no SSW se sobrepõe e o tempo total se aproxima do relatório mais lento.
+    Seqs gravados nos checkpoints por uma execução interrompida são acompanhados
+    junto com os novos em vez de solicitados de novo.
+
+    Args:
+        periodos: Lista gerada por calcular_periodos
+        navegador: Vaga de navegador (pré-aquecida ou ainda sem driver)
+        stop_event: Evento para controle de parada da automação
+        ao_concluir: Função chamada com (periodo, arquivo) após cada download
+        checkpoints: Instância de checkpoint.Checkpoints (opcional)
+    """
+    pendentes = {}
+    enviados_em = {}
+    retomados = set()
+    perfil = navegador["perfil"]
+
+    def avancar(periodo, etapa, **dados):
+        if checkpoints:
+            checkpoints.avancar(periodo, etapa, **dados)
+
+    def renomear(periodo, arquivo_baixado):
+        with medir("renomear", periodo=periodo["nome_arquivo"]):
+            arquivo = repetir_etapa(
+                lambda: renomear_arquivo_baixado(arquivo_baixado, periodo["nome_arquivo"], perfil["pasta"]),
+                "renomear", stop_event)
+        if arquivo:
+            avancar(periodo, "renomeado", arquivo=arquivo)
+            ao_concluir(periodo, arquivo)
+
+    try:
+        if navegador["driver"] is None:
+            _abrir_vaga(navegador, stop_event)
+        driver = navegador["driver"]
+
+        # Retomada: arquivos já baixados só são renomeados e seqs ainda na tabela voltam a ser acompanhados
+        a_solicitar = []
+        seqs_na_tabela = None
+        for periodo in periodos:
+            estado = checkpoints.obter(periodo) if checkpoints else None
+            if estado and estado["etapa"] == "baixado":
+                print(f"Retomando do checkpoint: o arquivo de {periodo['nome_arquivo']} já foi baixado.")
+                renomear(periodo, estado["arquivo"])
+                continue
+            if estado and estado.get("seq"):
+                # A tabela lista todas as requisições da conta: basta abri-la uma vez
+                if seqs_na_tabela is None:
+                    seqs_na_tabela = _abrir_tabela(driver, estado["url_tabela"], stop_event, perfil["credenciais"])
+                if estado["seq"] in seqs_na_tabela:
+                    print(f"Retomando do checkpoint: acompanhando o seq {estado['seq']} de {periodo['nome_arquivo']}.")
+                    pendentes[estado["seq"]] = periodo
+                    retomados.add(estado["seq"])
+                    continue
+            a_solicitar.append(periodo)
+
+        for periodo in a_solicitar:
             if stop_event and stop_event.is_set(): raise InterruptedError
+            print(f"\n--- Solicitando relatório do período: {periodo['data_inicio']} a {periodo['data_fim']} ---")
+            try:
+                marcacoes = {"periodo": periodo["nome_arquivo"]}
+                seq = repetir_etapa(
+                    _etapa_de_solicitacao(driver, periodo, stop_event, marcacoes, perfil["credenciais"]),
+                    "solicitacao", stop_event)
+                if seq:
+                    avancar(periodo, "solicitado", seq=seq, url_tabela=driver.current_url)
+                    pendentes[seq] = periodo
+                    enviados_em[seq] = time.perf_counter()
+            except InterruptedError:
+                raise
+            except Exception as e:
+                print(f"Ocorreu um erro ao solicitar o relatório do mês {periodo['mes']}/{periodo['ano']}: {e}")
 
-            if seq:
-                if atualizar_relatorio(driver, seq, stop_event):
-                    print("Aguardando 20 segundos para a conclusão do download...")
-                    time.sleep(20) 
-                    renomear_ultimo_arquivo_baixado(download_folder, nome_arquivo_mes)
-            print(f"--- Finalizada extração para o período: {data_inicio_str} a {data_fim_str} ---")
-        
+        if not pendentes:
+            return
+        print(f"{len(pendentes)} relatório(s) solicitado(s). Aguardando a geração no SSW...")
+        aguardar(driver, janela_com_elemento((By.ID, "tblsr")), "tabela", stop_event)
+
+        def baixar(seq, link):
+            periodo = pendentes[seq]
+            # O tempo de geração de um seq retomado é desconhecido e não entra nas métricas
+            if seq not in retomados:
+                registrar("geracao", time.perf_counter() - enviados_em[seq], periodo=periodo["nome_arquivo"])
+            avancar(periodo, "pronto")
+            try:
+                arquivos_antes = instantaneo_pasta(navegador["pasta"])
+                with medir("download", periodo=periodo["nome_arquivo"]) as medicao:
+                    driver.execute_script("arguments[0].click();", link)
+                    arquivo_baixado = aguardar_download(navegador["pasta"], arquivos_antes, stop_event)
+                    medicao["status"] = "ok" if arquivo_baixado else "falha"
+                if arquivo_baixado:
+                    avancar(periodo, "baixado", arquivo=arquivo_baixado)
+                    renomear(periodo, arquivo_baixado)
+                print(f"--- Finalizada extração para o período: {periodo['data_inicio']} a {periodo['data_fim']} ---")
+            except InterruptedError:
+                raise
+            except Exception as e:
+                print(f"Ocorreu um erro ao baixar o relatório do mês {periodo['mes']}/{periodo['ano']}: {e}")
+
+        for seq in aguardar_relatorios(driver, list(pendentes), baixar, stop_event):
+            if seq not in retomados:
+                registrar("geracao", time.perf_counter() - enviados_em[seq], "falha",
+                          periodo=pendentes[seq]["nome_arquivo"])
+    finally:
+        _encerrar_navegador(navegador)
+
+
+def _executar_em_paralelo(periodos, navegadores, stop_event, reutilizar_sessao, ao_concluir, checkpoints=None):
+    """
+    Executa os meses como jobs independentes em um pool limitado de navegadores.
+    Cada navegador do pool tem sua própria subpasta de download, de modo que
+    a renomeação de um job nunca enxerga o arquivo de outro.
+
+    Args:
+        periodos: Lista gerada por calcular_periodos
+        navegadores: Vagas do pool (uma por navegador simultâneo)
+        stop_event: Evento para controle de parada da automação
+        reutilizar_sessao: Mantém cada navegador do pool logado entre os jobs
+        ao_concluir: Função chamada com (periodo, arquivo) após cada download
+        checkpoints: Instância de checkpoint.Checkpoints (opcional)
+    """
+    max_navegadores = max(1, min(len(navegadores), len(periodos)))
+    livres = queue.Queue()
+    # Vagas já autenticadas são entregues primeiro
+    for navegador in sorted(navegadores, key=lambda n: n["driver"] is None):
+        livres.put(navegador)
+
+    def job(periodo):
+        if stop_event and stop_event.is_set():
+            return
+        navegador = livres.get()
+        try:
+            arquivo = _extrair_no_navegador(navegador, periodo, stop_event, reutilizar_sessao, checkpoints)
+        finally:
+            livres.put(navegador)
+        if arquivo:
+            ao_concluir(periodo, arquivo)
+
+    print(f"Modo paralelo: {len(periodos)} período(s) em até {max_navegadores} navegador(es).")
+    try:
+        with ThreadPoolExecutor(max_workers=max_navegadores, thread_name_prefix="navegador") as executor:
+            futuros = {executor.submit(job, periodo): periodo for periodo in periodos}
+            for futuro in as_completed(futuros):
+                periodo = futuros[futuro]
+                try:
+                    futuro.result()
+                except InterruptedError:
+                    print(f"Extração de {periodo['mes']}/{periodo['ano']} interrompida pelo usuário.")
+                except Exception as e:
+                    print(f"Ocorreu um erro geral na automação para o mês {periodo['mes']}/{periodo['ano']}: {e}")
+    finally:
+        encerrar_navegadores(navegadores)
+
+
+def _executar_http(periodos, stop_event, paralelo, max_paralelo, ao_concluir, checkpoints=None, perfil=None):
+    """
+    Executa a extração pelo backend HTTP, com uma única sessão autenticada
+
+    Args:
+        periodos: Lista gerada por calcular_periodos
+        stop_event: Evento para controle de parada da automação
+        paralelo: Extrai os meses simultaneamente
+        max_paralelo: Quantidade máxima de meses simultâneos
+        ao_concluir: Função chamada com (periodo, arquivo) após cada download
+        checkpoints: Instância de checkpoint.Checkpoints (opcional)
+        perfil: Perfil com as credenciais e a pasta de saída (padrão: perfil_padrao())
+    """
+    perfil = perfil or perfil_padrao()
+    # Importado aqui para que o backend Selenium não dependa do requests
+    from ssw_http import SessaoSSW, extrair_periodo_http
+
+    print("Backend HTTP experimental: endereços da opção 455 modelados no ssw_mock (ver ssw_http).")
+    sessao = SessaoSSW(URL_SSW, credenciais=perfil["credenciais"], tamanho_pool=max_paralelo)
+
+    def job(periodo):
+        if stop_event and stop_event.is_set():
+            return
+        arquivo = extrair_periodo_http(sessao, periodo, perfil["pasta"], stop_event,
+                                       PRAZO_RELATORIO, INTERVALOS_ATUALIZACAO, checkpoints)
+        if arquivo:
+            ao_concluir(periodo, arquivo)
+
+    try:
+        with medir("login"):
+            sessao.login()
+        with ThreadPoolExecutor(max_workers=max_paralelo if paralelo else 1,
+                                thread_name_prefix="http") as executor:
+            futuros = {executor.submit(job, periodo): periodo for periodo in periodos}
+            for futuro in as_completed(futuros):
+                periodo = futuros[futuro]
+                try:
+                    futuro.result()
+                except InterruptedError:
+                    print(f"Extração de {periodo['mes']}/{periodo['ano']} interrompida pelo usuário.")
+                except Exception as e:
+                    print(f"Ocorreu um erro geral na automação para o mês {periodo['mes']}/{periodo['ano']}: {e}")
+    finally:
+        sessao.fechar()
+
+
+def _despachar_periodos(periodos, vagas, stop_event, backend, paralelo, pipeline, reutilizar_sessao,
+                        max_navegadores, ao_concluir, checkpoints=None):
+    """
+    Extrai os períodos no modo de execução escolhido (http, pipeline, paralelo ou sequencial)
+
+    Returns:
+        bool: False se a execução foi interrompida pelo usuário
+    """
+    if backend == "http":
+        encerrar_navegadores(vagas)
+        _executar_http(periodos, stop_event, paralelo, max_navegadores, ao_concluir, checkpoints, vagas[0]["perfil"])
+        if stop_event and stop_event.is_set():
+            print("Sinal de parada recebido. Interrompendo a extração.")
+            return False
+        return True
+
+    if pipeline:
+        try:
+            _executar_em_pipeline(periodos, vagas[0], stop_event, ao_concluir, checkpoints)
         except InterruptedError:
             print("Execução interrompida pelo usuário.")
-            break # Sai do loop for
-        except Exception as e:
-            print(f"Ocorreu um erro geral na automação para o mês {mes}/{ano}: {e}")
-        finally:
-            if driver:
-                print("Encerrando a sessão do navegador para esta iteração.")
-                driver.quit()
+            return False
+        return True
+
+    if paralelo:
+        _executar_em_paralelo(periodos, vagas, stop_event, reutilizar_sessao, ao_concluir, checkpoints)
+        if stop_event and stop_event.is_set():
+            print("Sinal de parada recebido. Interrompendo a extração.")
+            return False
+        return True
+
+    navegador = vagas[0]
+    try:
+        for periodo in periodos:
+            if stop_event and stop_event.is_set():
+                print("Sinal de parada recebido. Interrompendo a extração.")
+                return False
+
+            try:
+                arquivo = _extrair_no_navegador(navegador, periodo, stop_event, reutilizar_sessao, checkpoints)
+                if arquivo:
+                    ao_concluir(periodo, arquivo)
+            except InterruptedError:
+                print("Execução interrompida pelo usuário.")
+                return False
+            except Exception as e:
+                print(f"Ocorreu um erro geral na automação para o mês {periodo['mes']}/{periodo['ano']}: {e}")
+    finally:
+        _encerrar_navegador(navegador)
+    return True
+
+
+def _publicado_sem_alteracao(manifesto, periodo, arquivo, sha256, pasta_publicacao):
+    """
+    Indica se a pasta compartilhada já tem exatamente este conteúdo para o período:
+    o hash coincide com o último registrado no manifesto e os arquivos publicados existem
+    """
+    if not manifesto.conteudo_inalterado(periodo, arquivo, sha256):
+        return False
+    publicado = os.path.join(pasta_publicacao, os.path.basename(arquivo))
+    esperados = [publicado] + ([os.path.splitext(publicado)[0] + ".parquet"] if CONVERTER_PARQUET else [])
+    return all(os.path.exists(caminho) for caminho in esperados)
+
+
+def _executar_extracao(stop_event, paralelo, max_navegadores, reutilizar_sessao, backend,
+                       incremental, pipeline, navegadores, meses, mes_referencia, intervalo, resultado,
+                       perfil=None, limite=None):
+    """Corpo de main: resolve a configuração e despacha para o modo de execução escolhido"""
+    perfil = perfil or perfil_padrao()
+    paralelo = MODO_PARALELO if paralelo is None else paralelo
+    max_navegadores = max_navegadores or MAX_NAVEGADORES
+    reutilizar_sessao = REUTILIZAR_SESSAO if reutilizar_sessao is None else reutilizar_sessao
+    backend = backend or BACKEND
+    incremental = EXTRACAO_INCREMENTAL if incremental is None else incremental
+    pipeline = MODO_PIPELINE if pipeline is None else pipeline
+    hoje = datetime.now()
+    if intervalo:
+        periodos = periodos_do_intervalo(*intervalo)
+    else:
+        periodos = calcular_periodos(mes_referencia or hoje, meses or perfil["meses"] or MESES_RETROATIVOS)
+
+    # O perfil de trabalho baixa na pasta local; os arquivos prontos vão para a pasta do perfil
+    pasta_publicacao = perfil["pasta"]
+    perfil = _perfil_de_trabalho(perfil)
+    usa_pool = _usa_pool(backend, paralelo, pipeline)
+    vagas = _criar_vagas(usa_pool, max_navegadores, perfil, limite)
+    if navegadores:
+        if [n["pasta"] for n in navegadores] == [v["pasta"] for v in vagas]:
+            print("Usando navegadores pré-aquecidos.")
+            vagas = navegadores
+        else:
+            print("Navegadores pré-aquecidos não correspondem à configuração atual e serão descartados.")
+            encerrar_navegadores(navegadores)
+
+    manifesto = Manifesto(perfil["manifesto"])
+    if incremental:
+        pulados = [p["nome_arquivo"] for p in periodos if not manifesto.deve_extrair(p, hoje)]
+        if pulados:
+            print(f"Períodos fechados e já finais no manifesto, não serão extraídos: {', '.join(pulados)}")
+        periodos = [p for p in periodos if p["nome_arquivo"] not in pulados]
+        if not periodos:
+            print("Nenhum período pendente de extração.")
+            encerrar_navegadores(vagas)
+            return
+    resultado["periodos"] = [p["nome_arquivo"] for p in periodos]
+
+    def ao_concluir(periodo, arquivo, partes=None):
+        sha256 = hash_arquivo(arquivo)
+        if _publicado_sem_alteracao(manifesto, periodo, arquivo, sha256, pasta_publicacao):
+            # Republicar um arquivo idêntico faria o Drive reenviá-lo e os painéis recarregarem os dados.
+            # Sem a preparação local o arquivo já está na pasta compartilhada, e a renomeação
+            # manteve o anterior intocado: só a conversão e a consolidação são puladas
+            print(f"Período {periodo['nome_arquivo']} sem alteração desde a última publicação.")
+            registrar("sem_alteracao", 0.0, periodo=periodo["nome_arquivo"])
+            manifesto.registrar(periodo, arquivo, hoje, sha256)
+            if publicador:
+                os.remove(arquivo)
+            resultado["inalterados"].append(periodo["nome_arquivo"])
+            resultado["concluidos"].append(periodo["nome_arquivo"])
+            for parte in partes or [periodo]:
+                checkpoints.concluir(parte)
+            return
+
+        with medir("pos_processamento", periodo=periodo["nome_arquivo"]):
+            arquivo_parquet = converter_para_parquet(arquivo) if CONVERTER_PARQUET else None
+
+        def ao_publicar(publicados):
+            # Com a preparação local, roda na thread do publicador depois que os
+            # arquivos chegaram à pasta compartilhada e antes de as cópias locais sumirem
+            manifesto.registrar(periodo, arquivo, hoje, sha256)
+            if arquivo_parquet and CONSOLIDAR:
+                # A partição guarda o mês inteiro: um intervalo parcial não pode substituí-la
+                if periodo["mes_completo"]:
+                    atualizar_particao(perfil["consolidado"], periodo, arquivo_parquet)
+                else:
+                    print(f"Período parcial {periodo['nome_arquivo']} não atualiza a base consolidada.")
+            resultado["concluidos"].append(periodo["nome_arquivo"])
+            for parte in partes or [periodo]:
+                checkpoints.concluir(parte)
+
+        arquivos = [arquivo] + ([arquivo_parquet] if arquivo_parquet else [])
+        if publicador:
+            publicador.publicar(arquivos, ao_publicar, periodo["nome_arquivo"])
+        else:
+            ao_publicar(arquivos)
+
+    # Fatias de um mesmo período: as pendentes e os arquivos já baixados, pelo
+    # nome do período. Quando a última fatia chega, as partes são juntadas
+    historico = HistoricoFatias(perfil["historico_fatias"]) if FATIAMENTO else None
+    checkpoints = Checkpoints(perfil["checkpoints"])
+    montagens = {}
+    concluidas = set()
+    trava_montagem = threading.Lock()
+
+    def planejar(fatias):
+        for fatia in fatias:
+            pai = fatia.get("periodo_pai")
+            if pai:
+                montagem = montagens.setdefault(pai["nome_arquivo"], {"pendentes": set(), "arquivos": {}, "fatias": []})
+                montagem["pendentes"].add(fatia["nome_arquivo"])
+                montagem["fatias"].append(fatia)
+        return fatias
+
+    def ao_concluir_fatia(fatia, arquivo):
+        concluidas.add(fatia["nome_arquivo"])
+        if historico:
+            historico.registrar(_dias_do_periodo(fatia), ultima_duracao("geracao", periodo=fatia["nome_arquivo"]),
+                                os.path.getsize(arquivo))
+        pai = fatia.get("periodo_pai")
+        if pai is None:
+            ao_concluir(fatia, arquivo)
+            return
+        with trava_montagem:
+            montagem = montagens[pai["nome_arquivo"]]
+            montagem["arquivos"][fatia["inicio"]] = arquivo
+            montagem["pendentes"].discard(fatia["nome_arquivo"])
+            completa = not montagem["pendentes"]
+        if completa:
+            partes = [montagem["arquivos"][inicio] for inicio in sorted(montagem["arquivos"])]
+            # juntar_partes devolve o caminho gravado (um destino .xls vira .xlsx)
+            destino = os.path.join(perfil["pasta"], pai["nome_arquivo"] + os.path.splitext(partes[0])[1])
+            print(f"Juntando {len(partes)} fatia(s) do período {pai['nome_arquivo']}.")
+            with medir("juntar_fatias", periodo=pai["nome_arquivo"]):
+                arquivo_final = juntar_partes(partes, destino)
+            # Os checkpoints das fatias só são removidos depois da junção e da publicação
+            ao_concluir(pai, arquivo_final, montagem["fatias"])
+
+    dias = historico.dias_por_fatia(ALVO_GERACAO_FATIA, ALVO_TAMANHO_FATIA) if historico else DIAS_MAXIMOS
+    fatias = planejar([f for periodo in periodos for f in _fatiar_periodo(periodo, dias)])
+    if len(fatias) > len(periodos):
+        print(f"Fatiamento adaptativo: {len(periodos)} período(s) em {len(fatias)} requisição(ões) de até {dias} dia(s).")
+
+    publicador = Publicador(pasta_publicacao, stop_event) if perfil["pasta"] != pasta_publicacao else None
+    try:
+        # Fatias que uma execução interrompida já baixou e renomeou vão direto para o pós-processamento
+        a_extrair = []
+        for fatia in fatias:
+            arquivo = checkpoints.arquivo_final(fatia)
+            if arquivo:
+                print(f"Retomando do checkpoint: {fatia['nome_arquivo']} já foi extraído.")
+                ao_concluir_fatia(fatia, arquivo)
+            else:
+                a_extrair.append(fatia)
+
+        if a_extrair:
+            concluiu = _despachar_periodos(a_extrair, vagas, stop_event, backend, paralelo, pipeline,
+                                           reutilizar_sessao, max_navegadores, ao_concluir_fatia, checkpoints)
+        else:
+            encerrar_navegadores(vagas)
+            concluiu = True
+
+        falhas = [f for f in fatias if f["nome_arquivo"] not in concluidas]
+        if not (FATIAMENTO and concluiu and falhas):
+            return
+        # Uma nova tentativa para as fatias que falharam, divididas ao meio
+        repeticao = []
+        for fatia in falhas:
+            pai = fatia.get("periodo_pai")
+            if pai:
+                montagens[pai["nome_arquivo"]]["pendentes"].discard(fatia["nome_arquivo"])
+            metade = max(1, (_dias_do_periodo(fatia) + 1) // 2)
+            repeticao += _fatiar_periodo(fatia, metade, pai=pai or fatia)
+        print(f"Repetindo {len(falhas)} requisição(ões) com falha em {len(repeticao)} fatia(s) menores.")
+        _despachar_periodos(planejar(repeticao), _criar_vagas(usa_pool, max_navegadores, perfil, limite),
+                            stop_event, backend, paralelo, pipeline, reutilizar_sessao, max_navegadores,
+                            ao_concluir_fatia, checkpoints)
+    finally:
+        if publicador:
+            # A execução só termina quando tudo o que foi extraído chegou à pasta compartilhada
+            publicador.encerrar()
+
+
+def main(stop_event=None, paralelo=None, max_navegadores=None, reutilizar_sessao=None, backend=None,
+         incremental=None, pipeline=None, navegadores=None, meses=None, mes_referencia=None,
+         data_inicio=None, data_fim=None, perfil=None):
+    """
+    Função principal que coordena todo o processo de extração
+    Extrai relatórios dos últimos 3 meses e exibe o resumo de tempos por etapa
+    
+    Args:
+        stop_event: Evento opcional para controle de parada da automação
+        paralelo: Executa os meses em paralelo (padrão: AUTO455_PARALELO)
+        max_navegadores: Tamanho do pool no modo paralelo (padrão: AUTO455_MAX_NAVEGADORES)
+        reutilizar_sessao: Um navegador e um login por execução (padrão: AUTO455_REUTILIZAR_SESSAO)
+        backend: "selenium" ou "http" (padrão: AUTO455_BACKEND)
+        incremental: Pula meses fechados já finais no manifesto (padrão: AUTO455_INCREMENTAL)
+        pipeline: Solicita todos os meses antes de aguardá-los (padrão: AUTO455_PIPELINE)
+        navegadores: Vagas pré-aquecidas por preaquecer_navegadores (main as encerra ao final)
+        meses: Quantidade de meses extraídos, incluindo o de referência (padrão: MESES_RETROATIVOS)
+        mes_referencia: Data do mês mais recente a extrair (padrão: o mês atual)
+        data_inicio: Início de um intervalo arbitrário (datetime); substitui meses e mes_referencia
+        data_fim: Fim do intervalo arbitrário, inclusive (padrão: hoje)
+        perfil: Conta extraída, criada por perfis.criar_perfil (padrão: perfil_padrao())
+
+    Returns:
+        dict: Períodos a extrair ("periodos"), os baixados ("concluidos"), os baixados sem
+        alteração e não republicados ("inalterados") e se houve parada ("interrompido")
+    """
+    resultado = {"periodos": [], "concluidos": [], "inalterados": [], "interrompido": False}
+    iniciar_coleta()
+    try:
+        _executar_extracao(stop_event, paralelo, max_navegadores, reutilizar_sessao, backend,
+                           incremental, pipeline, navegadores, meses, mes_referencia,
+                           (data_inicio, data_fim or datetime.now()) if data_inicio else None, resultado, perfil)
+    finally:
+        resumo = finalizar_coleta()
+        if resumo:
+            print(resumo)
+    resultado["interrompido"] = bool(stop_event and stop_event.is_set())
+    return resultado
+
+
+def executar_perfis(perfis, stop_event=None, max_perfis=None, max_navegadores_total=None, paralelo=None,
+                    max_navegadores=None, reutilizar_sessao=None, backend=None, incremental=None, pipeline=None,
+                    meses=None, mes_referencia=None, data_inicio=None, data_fim=None):
+    """
+    Extrai vários perfis (contas, CNPJs ou filiais) em um único executor com
+    concorrência limitada. Os navegadores de todos os perfis disputam o mesmo
+    teto, de modo que a frota inteira é atualizada em uma janela de execução
+    sem abrir mais navegadores do que a máquina comporta.
+
+    Args:
+        perfis: Lista de perfis carregada por perfis.carregar_perfis
+        stop_event: Evento opcional para controle de parada da automação
+        max_perfis: Perfis extraídos ao mesmo tempo (padrão: AUTO455_MAX_PERFIS)
+        max_navegadores_total: Navegadores abertos somando todos os perfis (padrão: AUTO455_MAX_NAVEGADORES_TOTAL)
+        meses: Meses extraídos por perfil; substitui o "meses" de cada perfil
+        Demais argumentos: os mesmos de main, aplicados a todos os perfis
+
+    Returns:
+        dict: Resultado de cada perfil no formato de main, pelo nome do perfil.
+        Um perfil que falhou traz a mensagem do erro em "erro".
+    """
+    max_navegadores_total = max(1, max_navegadores_total or MAX_NAVEGADORES_TOTAL)
+    limite = threading.BoundedSemaphore(max_navegadores_total)
+    intervalo = (data_inicio, data_fim or datetime.now()) if data_inicio else None
+    resultados = {perfil["nome"]: {"periodos": [], "concluidos": [], "inalterados": [], "interrompido": False}
+                  for perfil in perfis}
+
+    def job(perfil):
+        if stop_event and stop_event.is_set():
+            return
+        print(f"=== Perfil {perfil['nome']}: iniciando a extração ===")
+        _executar_extracao(stop_event, paralelo, max_navegadores, reutilizar_sessao, backend, incremental,
+                           pipeline, None, meses, mes_referencia, intervalo, resultados[perfil["nome"]],
+                           perfil, limite)
+        print(f"=== Perfil {perfil['nome']}: extração finalizada ===")
+
+    simultaneos = max(1, min(max_perfis or MAX_PERFIS_SIMULTANEOS, len(perfis)))
+    print(f"{len(perfis)} perfil(is), até {simultaneos} ao mesmo tempo e {max_navegadores_total} navegador(es) no total.")
+    iniciar_coleta()
+    try:
+        with ThreadPoolExecutor(max_workers=simultaneos, thread_name_prefix="perfil") as executor:
+            futuros = {executor.submit(job, perfil): perfil for perfil in perfis}
+            for futuro in as_completed(futuros):
+                perfil = futuros[futuro]
+                try:
+                    futuro.result()
+                except InterruptedError:
+                    print(f"Extração do perfil {perfil['nome']} interrompida pelo usuário.")
+                except Exception as e:
+                    print(f"Ocorreu um erro geral na automação para o perfil {perfil['nome']}: {e}")
+                    resultados[perfil["nome"]]["erro"] = str(e) or e.__class__.__name__
+    finally:
+        resumo = finalizar_coleta()
+        if resumo:
+            print(resumo)
+    for resultado in resultados.values():
+        resultado["interrompido"] = bool(stop_event and stop_event.is_set())
+    return resultados
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""
+Benchmark de ponta a ponta da extração 455 contra o SSW simulado (ssw_mock).
+Sobe o servidor local, executa auto_455.main repetidas vezes sem janela, com
+pastas temporárias e sem extração incremental, e reporta a latência de cada
+etapa e do total entre as execuções. Serve como linha de base de desempenho
+para comparar alterações antes de irem para produção.
+
+A etapa "geracao" só é medida quando a tabela é atualizada, então sua resolução é
+o intervalo de atualização em vigor (auto_455.INTERVALOS_ATUALIZACAO, ou --intervalos).
+O relatório mostra os intervalos usados ao lado do resultado.
+
+Uso:
+    python benchmark.py --rodadas 5 --backend http --atraso 2 --variacao 1
+    python benchmark.py --rodadas 1 --atraso 0.5 --intervalos 0.1
+    python benchmark.py --backend selenium --pipeline --saida resultado.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+
+import ssw_mock
+
+# Credenciais fictícias: o SSW simulado aceita qualquer valor não vazio
+CREDENCIAIS_FICTICIAS = {
+    "SSW_EMPRESA": "BENCH",
+    "SSW_CNPJ": "00000000000000",
+    "SSW_USUARIO": "benchmark",
+    "SSW_SENHA": "benchmark",
+}
+
+
+def _percentil(valores, fracao):
+    """Percentil por interpolação linear sobre os valores ordenados"""
+    ordenados = sorted(valores)
+    posicao = (len(ordenados) - 1) * fracao
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+def estatisticas(valores):
+    """Resumo estatístico de uma lista de durações em segundos"""
+    return {
+        "n": len(valores),
+        "media": statistics.fmean(valores),
+        "mediana": statistics.median(valores),
+        "p95": _percentil(valores, 0.95),
+        "min": min(valores),
+        "max": max(valores),
+    }
+
+
+def executar_rodada(auto_455, metricas, pasta, **opcoes):
+    """
+    Executa auto_455.main uma vez com as saídas redirecionadas para a pasta informada
+
+    Args:
+        auto_455: Módulo auto_455 já importado
+        metricas: Módulo metricas já importado
+        pasta: Pasta temporária exclusiva desta rodada
+        **opcoes: Parâmetros repassados para auto_455.main
+
+    Returns:
+        ColetorMetricas: Medições da rodada
+    """
+    auto_455.download_folder = pasta
+    auto_455.CAMINHO_MANIFESTO = os.path.join(pasta, "manifesto_455.json")
+    auto_455.PASTA_CONSOLIDADO = os.path.join(pasta, "consolidado")
+    auto_455.CAMINHO_CHECKPOINTS = os.path.join(pasta, "checkpoints_455.json")
+    auto_455.CAMINHO_HISTORICO_FATIAS = os.path.join(pasta, "historico_fatias_455.json")
+    auto_455.PASTA_PREPARACAO = os.path.join(pasta, "preparacao")
+    metricas.PASTA_METRICAS = os.path.join(pasta, "metricas")
+    auto_455.main(incremental=False, **opcoes)
+    return metricas.ultima_coleta()
+
+
+def executar_benchmark(execucoes=3, backend="http", paralelo=False, pipeline=False, max_navegadores=None,
+                       atraso=2.0, variacao=0.0, linhas_por_dia=20, semente=455, intervalos=None):
+    """
+    Sobe o SSW simulado e mede as execuções de auto_455.main
+
+    Args:
+        execucoes: Quantidade de rodadas medidas
+        backend: "selenium" ou "http"
+        paralelo: Executa os meses em paralelo
+        pipeline: Solicita todos os meses antes de aguardá-los
+        max_navegadores: Tamanho do pool no modo paralelo
+        atraso: Segundos até cada relatório ficar pronto no SSW simulado
+        variacao: Variação máxima (±s) do atraso de cada relatório
+        linhas_por_dia: Linhas geradas por dia do período no arquivo simulado
+        semente: Semente da variação do atraso
+        intervalos: Intervalos entre as atualizações da tabela (padrão: auto_455.INTERVALOS_ATUALIZACAO)
+
+    Returns:
+        dict: Configuração, estatísticas por etapa e do total, e as durações de cada rodada
+    """
+    servidor, url = ssw_mock.iniciar_servidor(atraso_relatorio=atraso, variacao_atraso=variacao,
+                                              linhas_por_dia=linhas_por_dia, semente=semente)
+    for variavel, valor in CREDENCIAIS_FICTICIAS.items():
+        os.environ.setdefault(variavel, valor)
+    os.environ["SSW_URL"] = url
+    os.environ["AUTO455_HEADLESS"] = "1"
+
+    import auto_455
+    import metricas
+
+    auto_455.URL_SSW = url
+    auto_455.NAVEGADOR_OCULTO = True
+    if intervalos:
+        auto_455.INTERVALOS_ATUALIZACAO = tuple(intervalos)
+    intervalos = list(auto_455.INTERVALOS_ATUALIZACAO)
+    totais = []
+    por_etapa = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench455_") as raiz:
+            for rodada in range(1, execucoes + 1):
+                print(f"\n===== Rodada {rodada}/{execucoes} =====")
+                pasta = os.path.join(raiz, f"rodada{rodada}")
+                os.makedirs(pasta)
+                coleta = executar_rodada(auto_455, metricas, pasta, backend=backend, paralelo=paralelo,
+                                         pipeline=pipeline, max_navegadores=max_navegadores)
+                totais.append(coleta.duracao_total())
+                for etapa, medicoes in coleta.por_etapa().items():
+                    por_etapa.setdefault(etapa, []).extend(m["duracao_s"] for m in medicoes)
+    finally:
+        servidor.shutdown()
+
+    return {
+        "configuracao": {
+            "execucoes": execucoes, "backend": backend, "paralelo": paralelo, "pipeline": pipeline,
+            "max_navegadores": max_navegadores, "atraso": atraso, "variacao": variacao,
+            "linhas_por_dia": linhas_por_dia, "intervalos": intervalos,
+        },
+        "total": estatisticas(totais),
+        "etapas": {etapa: estatisticas(duracoes) for etapa, duracoes in por_etapa.items()},
+        "rodadas": totais,
+    }
+
+
+def formatar_relatorio(resultado):
+    """Tabela de texto com as estatísticas por etapa e do total"""
+    configuracao = resultado["configuracao"]
+    linhas = [
+        f"Benchmark 455 — backend {configuracao['backend']}, {configuracao['execucoes']} rodada(s), "
+        f"atraso {configuracao['atraso']}s ±{configuracao['variacao']}s",
+        f"  atualização da tabela a cada {', '.join(f'{i:g}' for i in configuracao['intervalos'])}s "
+        f"(resolução da etapa geracao: primeiro intervalo de {configuracao['intervalos'][0]:g}s)",
+        f"  {'etapa':<18} {'n':>3} {'média':>8} {'mediana':>8} {'p95':>8} {'mín':>8} {'máx':>8}",
+    ]
+    for nome, valores in list(resultado["etapas"].items()) + [("TOTAL", resultado["total"])]:
+        linhas.append(
+            f"  {nome:<18} {valores['n']:>3} {valores['media']:>8.3f} {valores['mediana']:>8.3f} "
+            f"{valores['p95']:>8.3f} {valores['min']:>8.3f} {valores['max']:>8.3f}"
+        )
+    return "\n".join(linhas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da extração 455 contra o SSW simulado")
+    parser.add_argument("--rodadas", "--execucoes", dest="execucoes", type=int, default=3,
+                        help="quantidade de rodadas medidas")
+    parser.add_argument("--backend", choices=("http", "selenium"), default="http")
+    parser.add_argument("--paralelo", action="store_true", help="extrai os meses em paralelo")
+    parser.add_argument("--pipeline", action="store_true", help="solicita todos os meses antes de aguardá-los")
+    parser.add_argument("--max-navegadores", type=int, default=None, help="tamanho do pool no modo paralelo")
+    parser.add_argument("--atraso", type=float, default=2.0, help="segundos até o relatório ficar pronto")
+    parser.add_argument("--variacao", type=float, default=0.0, help="variação máxima (±s) do atraso")
+    parser.add_argument("--linhas-por-dia", type=int, default=20, help="linhas do arquivo por dia do período")
+    parser.add_argument("--semente", type=int, default=455, help="semente da variação do atraso")
+    parser.add_argument("--intervalos", type=lambda texto: [float(i) for i in texto.split(",")], default=None,
+                        help="intervalos (s) entre as atualizações da tabela, separados por vírgula "
+                             "(padrão: os da automação)")
+    parser.add_argument("--saida", help="grava o resultado completo em JSON neste arquivo")
+    args = parser.parse_args()
+
+    resultado = executar_benchmark(
+        execucoes=args.execucoes, backend=args.backend, paralelo=args.paralelo, pipeline=args.pipeline,
+        max_navegadores=args.max_navegadores, atraso=args.atraso, variacao=args.variacao,
+        linhas_por_dia=args.linhas_por_dia, semente=args.semente, intervalos=args.intervalos,
+    )
+    print("\n" + formatar_relatorio(resultado))
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"Resultado gravado em '{args.saida}'.")
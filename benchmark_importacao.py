@@ -0,0 +1,108 @@
+"""
+Benchmark do tempo de importação dos pontos de entrada da automação 455.
+Executa "python -X importtime -c 'import <módulo>'" em processos novos,
+agrega a mediana do tempo acumulado de cada módulo importado e compara o
+total com o orçamento de abertura. Sai com código 1 se algum orçamento for
+excedido, para ser usado como verificação antes de gerar o executável.
+
+Uso:
+    python benchmark_importacao.py
+    python benchmark_importacao.py --modulos main cli_455 --execucoes 7 --saida importacao.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Orçamento (ms) do tempo de importação de cada ponto de entrada
+ORCAMENTOS_MS = {
+    "main": 500,
+    "cli_455": 150,
+}
+
+PASTA_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+
+def medir_importacao(modulo):
+    """
+    Importa o módulo em um processo novo com -X importtime
+
+    Returns:
+        dict: Tempo acumulado em ms de cada módulo importado, pelo nome
+    """
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=PASTA_PROJETO, capture_output=True, text=True,
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao importar '{modulo}':\n{processo.stderr.strip().splitlines()[-1]}")
+    tempos = {}
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha[len("import time:"):].split("|")
+        tempos[nome.strip()] = int(acumulado) / 1000
+    return tempos
+
+
+def executar_benchmark(modulos, execucoes=5):
+    """
+    Mede a importação de cada módulo várias vezes e resume pela mediana
+
+    Returns:
+        dict: Para cada módulo, o total ("total_ms") e os módulos mais lentos ("mais_lentos"),
+        ou "erro" se a importação falhou
+    """
+    resultado = {}
+    for modulo in modulos:
+        try:
+            rodadas = [medir_importacao(modulo) for _ in range(execucoes)]
+        except RuntimeError as e:
+            resultado[modulo] = {"erro": str(e), "orcamento_ms": ORCAMENTOS_MS.get(modulo)}
+            continue
+        nomes = set().union(*rodadas)
+        medianas = {nome: statistics.median(r.get(nome, 0.0) for r in rodadas) for nome in nomes}
+        mais_lentos = sorted(medianas.items(), key=lambda item: item[1], reverse=True)
+        resultado[modulo] = {
+            "total_ms": medianas.get(modulo, 0.0),
+            "orcamento_ms": ORCAMENTOS_MS.get(modulo),
+            "mais_lentos": [{"modulo": nome, "acumulado_ms": tempo} for nome, tempo in mais_lentos[:15]],
+        }
+    return resultado
+
+
+def formatar_relatorio(resultado):
+    """Texto com o total de cada ponto de entrada e os módulos mais lentos"""
+    linhas = []
+    for modulo, dados in resultado.items():
+        if "erro" in dados:
+            linhas.append(f"import {modulo}: {dados['erro']}")
+            continue
+        orcamento = dados["orcamento_ms"]
+        situacao = "" if orcamento is None else (
+            f" (orçamento {orcamento} ms: {'OK' if dados['total_ms'] <= orcamento else 'EXCEDIDO'})")
+        linhas.append(f"import {modulo}: {dados['total_ms']:.1f} ms{situacao}")
+        for item in dados["mais_lentos"]:
+            linhas.append(f"    {item['acumulado_ms']:8.1f} ms  {item['modulo']}")
+    return "\n".join(linhas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempo de importação dos pontos de entrada da automação 455")
+    parser.add_argument("--modulos", nargs="+", default=list(ORCAMENTOS_MS), help="módulos medidos")
+    parser.add_argument("--execucoes", type=int, default=5, help="processos medidos por módulo")
+    parser.add_argument("--saida", help="grava o resultado completo em JSON neste arquivo")
+    args = parser.parse_args()
+
+    resultado = executar_benchmark(args.modulos, args.execucoes)
+    print(formatar_relatorio(resultado))
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"Resultado gravado em '{args.saida}'.")
+    excedidos = [m for m, d in resultado.items()
+                 if "erro" in d or (d["orcamento_ms"] is not None and d["total_ms"] > d["orcamento_ms"])]
+    sys.exit(1 if excedidos else 0)
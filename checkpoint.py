@@ -0,0 +1,156 @@
+"""
+Checkpoints das extrações em andamento do relatório 455.
+Cada período avança por uma máquina de estados persistida em JSON:
+
+    solicitado (seq e tabela) -> pronto -> baixado (arquivo temporário) -> renomeado (arquivo final)
+
+Uma execução interrompida ou que caiu retoma do último estado gravado: um seq
+já solicitado volta a ser acompanhado em vez de gerar o relatório de novo, e
+um arquivo já baixado só é renomeado. O checkpoint é removido quando o período
+termina o pós-processamento. Cada etapa com falha é repetida com espera crescente.
+"""
+
+from datetime import datetime
+import json
+import os
+import threading
+
+from esperas import pausa
+
+ETAPAS = ("solicitado", "pronto", "baixado", "renomeado")
+
+# Idade máxima (s) de um checkpoint: depois disso o seq pode não existir mais no SSW
+PRAZO_CHECKPOINT = int(os.getenv("AUTO455_PRAZO_CHECKPOINT", str(12 * 3600)))
+
+# Tentativas de cada etapa e espera (s) antes da segunda tentativa (dobra a cada nova falha)
+TENTATIVAS_ETAPA = int(os.getenv("AUTO455_TENTATIVAS_ETAPA", "3"))
+ESPERA_INICIAL_ETAPA = 5
+
+
+def repetir_etapa(funcao, etapa, stop_event, tentativas=None, espera_inicial=ESPERA_INICIAL_ETAPA,
+                  repetir_vazio=True):
+    """
+    Executa uma etapa repetindo-a com espera crescente em caso de falha
+
+    Args:
+        funcao: Função sem argumentos que executa a etapa
+        etapa: Nome da etapa (para o log)
+        stop_event: Evento para controle de parada da automação
+        tentativas: Quantidade máxima de tentativas (padrão: TENTATIVAS_ETAPA)
+        espera_inicial: Espera antes da segunda tentativa, em segundos
+        repetir_vazio: Também repete quando a etapa retorna um valor vazio (None/False)
+
+    Returns:
+        Resultado da primeira tentativa bem-sucedida, ou o resultado vazio da última
+
+    Raises:
+        InterruptedError: Se o sinal de parada for recebido
+        Exception: A exceção da última tentativa, se todas falharam com exceção
+    """
+    tentativas = tentativas or TENTATIVAS_ETAPA
+    espera = espera_inicial
+    for tentativa in range(1, tentativas + 1):
+        try:
+            resultado = funcao()
+            if resultado or not repetir_vazio:
+                return resultado
+            motivo = "sem resultado"
+        except InterruptedError:
+            raise
+        except Exception as e:
+            if tentativa == tentativas:
+                raise
+            motivo = str(e) or e.__class__.__name__
+        if tentativa == tentativas:
+            return resultado
+        print(f"Etapa '{etapa}' falhou ({motivo}), tentativa {tentativa}/{tentativas}. "
+              f"Nova tentativa em {espera}s.")
+        pausa(espera, stop_event)
+        espera *= 2
+
+
+class Checkpoints:
+    """
+    Estado persistido das extrações em andamento, por nome de arquivo do período.
+    Seguro para uso pelos jobs do modo paralelo.
+
+    Args:
+        caminho: Arquivo JSON dos checkpoints
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._trava = threading.Lock()
+        self.periodos = {}
+        try:
+            if os.path.exists(caminho):
+                with open(caminho, "r", encoding="utf-8") as f:
+                    self.periodos = json.load(f)
+        except Exception as e:
+            print(f"Erro ao carregar os checkpoints, iniciando do zero: {e}")
+
+    def obter(self, periodo):
+        """
+        Retorna o checkpoint válido do período
+
+        Returns:
+            dict: Estado gravado ("etapa", "seq", "url_tabela", "arquivo"...), ou None se
+            não houver, se as datas mudaram ou se o checkpoint expirou
+        """
+        with self._trava:
+            registro = self.periodos.get(periodo["nome_arquivo"])
+        if not registro:
+            return None
+        if (registro.get("data_inicio"), registro.get("data_fim")) != (periodo["data_inicio"], periodo["data_fim"]):
+            return None
+        idade = (datetime.now() - datetime.fromisoformat(registro["solicitado_em"])).total_seconds()
+        if idade > PRAZO_CHECKPOINT:
+            return None
+        if registro["etapa"] in ("baixado", "renomeado") and not os.path.exists(registro.get("arquivo") or ""):
+            return None
+        return dict(registro)
+
+    def arquivo_final(self, periodo):
+        """Retorna o arquivo final do período se ele já chegou à etapa "renomeado" (ou None)"""
+        registro = self.obter(periodo)
+        return registro["arquivo"] if registro and registro["etapa"] == "renomeado" else None
+
+    def avancar(self, periodo, etapa, **dados):
+        """
+        Grava a etapa alcançada pelo período
+
+        Args:
+            periodo: Dicionário do período (ou fatia)
+            etapa: Uma das ETAPAS
+            **dados: Informações da etapa (ex.: seq, url_tabela, arquivo)
+
+        Raises:
+            ValueError: Se a etapa não for uma das ETAPAS
+        """
+        if etapa not in ETAPAS:
+            raise ValueError(f"Etapa de checkpoint desconhecida: {etapa}")
+        agora = datetime.now().isoformat(timespec="seconds")
+        with self._trava:
+            registro = self.periodos.get(periodo["nome_arquivo"], {}) if etapa != "solicitado" else {}
+            registro.update(dados)
+            registro.update({
+                "etapa": etapa,
+                "data_inicio": periodo["data_inicio"],
+                "data_fim": periodo["data_fim"],
+                "atualizado_em": agora,
+            })
+            registro.setdefault("solicitado_em", agora)
+            self.periodos[periodo["nome_arquivo"]] = registro
+            self._salvar()
+
+    def concluir(self, periodo):
+        """Remove o checkpoint de um período que terminou"""
+        with self._trava:
+            if self.periodos.pop(periodo["nome_arquivo"], None) is not None:
+                self._salvar()
+
+    def _salvar(self):
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.periodos, f, indent=2, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
@@ -0,0 +1,306 @@
+"""
+Ponto de entrada sem interface gráfica para a automação 455.
+Executa uma extração avulsa ou roda como serviço seguindo os horários de
+agendamentos.json, sem carregar customtkinter nem pystray. Usa o mesmo
+auto_455.main e a mesma semântica de parada (Ctrl+C ou SIGTERM sinalizam o
+stop_event e a extração termina o passo atual).
+
+Uso:
+    python cli_455.py                               # extração avulsa dos últimos meses
+    python cli_455.py --period 2026-08 --lookback 1 # apenas agosto/2026
+    python cli_455.py --inicio 15/07/2026 --fim 20/08/2026
+    python cli_455.py --servico --log automacao_455.log
+    python cli_455.py --perfis perfis.json          # todas as contas de perfis.json
+    python cli_455.py --perfil matriz --perfil filial_sp
+
+Códigos de saída:
+    0  todos os períodos foram extraídos (ou não havia período pendente)
+    1  algum período não foi extraído ou a execução falhou
+    2  argumentos inválidos
+    130 execução interrompida por sinal
+"""
+
+from datetime import datetime
+import argparse
+import signal
+import sys
+import threading
+import traceback
+
+from agendador import ARQUIVO_AGENDAMENTOS, Agendador, CacheAgendamentos
+from fila_execucoes import FilaExecucoes
+from perfis import ARQUIVO_PERFIS, carregar_perfis
+
+SAIDA_OK = 0
+SAIDA_FALHA = 1
+SAIDA_INTERROMPIDA = 130
+
+# Intervalo (s) entre as verificações de alteração do arquivo de agendamentos no modo serviço
+INTERVALO_RECARGA = 60
+
+
+class SaidaComHorario:
+    """
+    Substitui o sys.stdout prefixando cada linha com data e hora.
+    Segura para as threads do modo paralelo.
+
+    Args:
+        destino: Arquivo ou stream de destino
+    """
+
+    def __init__(self, destino):
+        self.destino = destino
+        self.pendente = ""
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        with self.lock:
+            self.pendente += text
+            *linhas, self.pendente = self.pendente.split("\n")
+            for linha in linhas:
+                self.destino.write(f"{datetime.now():%Y-%m-%d %H:%M:%S} - {linha}\n")
+            if linhas:
+                self.destino.flush()
+
+    def flush(self):
+        with self.lock:
+            if self.pendente:
+                self.destino.write(f"{datetime.now():%Y-%m-%d %H:%M:%S} - {self.pendente}\n")
+                self.pendente = ""
+            self.destino.flush()
+
+
+def ler_mes(texto):
+    """Converte "AAAA-MM" ou "MM/AAAA" no primeiro dia do mês (para o argparse)"""
+    for formato in ("%Y-%m", "%m/%Y"):
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"mês inválido '{texto}'. Use AAAA-MM ou MM/AAAA")
+
+
+def ler_data(texto):
+    """Converte "DD/MM/AAAA" ou "AAAA-MM-DD" em datetime (para o argparse)"""
+    for formato in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"data inválida '{texto}'. Use DD/MM/AAAA ou AAAA-MM-DD")
+
+
+def codigo_de_saida(resultado):
+    """Traduz o resultado de auto_455.main em código de saída do processo"""
+    if resultado["interrompido"]:
+        return SAIDA_INTERROMPIDA
+    if resultado.get("erro") or set(resultado["periodos"]) - set(resultado["concluidos"]):
+        return SAIDA_FALHA
+    return SAIDA_OK
+
+
+def _informar_faltantes(resultado, perfil=None):
+    faltantes = sorted(set(resultado["periodos"]) - set(resultado["concluidos"]))
+    if faltantes:
+        origem = f"Perfil {perfil}: " if perfil else ""
+        print(f"{origem}Períodos não extraídos: {', '.join(faltantes)}")
+
+
+def executar(stop_event, opcoes):
+    """
+    Executa uma extração com as opções da linha de comando
+
+    Returns:
+        int: Código de saída da execução
+    """
+    from auto_455 import executar_perfis, main as automacao_main
+
+    if opcoes.lista_perfis:
+        try:
+            resultados = executar_perfis(
+                opcoes.lista_perfis,
+                stop_event,
+                max_perfis=opcoes.max_perfis,
+                paralelo=opcoes.paralelo,
+                backend=opcoes.backend,
+                incremental=opcoes.incremental,
+                pipeline=opcoes.pipeline,
+                meses=opcoes.lookback,
+                mes_referencia=opcoes.period,
+                data_inicio=opcoes.inicio,
+                data_fim=opcoes.fim,
+            )
+        except Exception:
+            print(f"ERRO CRÍTICO NA AUTOMAÇÃO:\n{traceback.format_exc()}")
+            return SAIDA_FALHA
+        for nome, resultado in resultados.items():
+            _informar_faltantes(resultado, nome)
+        # A interrupção prevalece sobre a falha, que prevalece sobre o sucesso
+        return max(codigo_de_saida(resultado) for resultado in resultados.values())
+
+    try:
+        resultado = automacao_main(
+            stop_event,
+            paralelo=opcoes.paralelo,
+            backend=opcoes.backend,
+            incremental=opcoes.incremental,
+            pipeline=opcoes.pipeline,
+            meses=opcoes.lookback,
+            mes_referencia=opcoes.period,
+            data_inicio=opcoes.inicio,
+            data_fim=opcoes.fim,
+        )
+    except Exception:
+        print(f"ERRO CRÍTICO NA AUTOMAÇÃO:\n{traceback.format_exc()}")
+        return SAIDA_FALHA
+    _informar_faltantes(resultado)
+    return codigo_de_saida(resultado)
+
+
+def executar_servico(stop_event, opcoes):
+    """
+    Roda como serviço: dispara as extrações nos horários de agendamentos.json
+    até receber o sinal de parada. Gatilhos que chegam durante uma execução
+    são combinados em uma única execução seguinte.
+
+    Returns:
+        int: Código de saída do serviço
+    """
+    cache = CacheAgendamentos(opcoes.agendamentos)
+    fila = FilaExecucoes()
+    ha_trabalho = threading.Event()
+    agendador = Agendador()
+
+    def disparar():
+        fila.enfileirar("agendado")
+        ha_trabalho.set()
+
+    def carregar_agendamentos(atuais):
+        try:
+            horarios = cache.carregar()
+        except Exception as e:
+            print(f"Erro ao carregar agendamentos: {e}")
+            return atuais
+        if horarios != atuais:
+            agendador.definir_tarefas([(horario, disparar) for horario in horarios])
+            print(f"Agendamentos carregados: {', '.join(horarios) if horarios else 'nenhum'}")
+        return horarios
+
+    # Acorda o laço principal assim que a parada for sinalizada
+    threading.Thread(target=lambda: (stop_event.wait(), ha_trabalho.set()), daemon=True).start()
+
+    horarios = carregar_agendamentos(None)
+    agendador.iniciar()
+    codigo = SAIDA_OK
+    try:
+        while not stop_event.is_set():
+            ha_trabalho.wait(INTERVALO_RECARGA)
+            ha_trabalho.clear()
+            horarios = carregar_agendamentos(horarios)
+            while not stop_event.is_set():
+                execucao = fila.retirar()
+                if execucao is None:
+                    break
+                print("=" * 50)
+                print(f"Iniciando a execução agendada ({execucao['gatilhos']} gatilho(s), "
+                      f"{execucao['espera_s']:.0f}s na fila)...")
+                codigo = executar(stop_event, opcoes)
+                print(f"Execução finalizada com código {codigo}.")
+        return SAIDA_INTERROMPIDA if codigo == SAIDA_INTERROMPIDA else SAIDA_OK
+    finally:
+        agendador.parar()
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Automação 455 sem interface gráfica")
+    parser.add_argument("--period", "--periodo", type=ler_mes, default=None,
+                        help="mês mais recente a extrair (AAAA-MM ou MM/AAAA; padrão: mês atual)")
+    parser.add_argument("--lookback", "--meses", type=int, default=None,
+                        help="quantidade de meses extraídos, incluindo o de --period (padrão: 3)")
+    parser.add_argument("--inicio", type=ler_data, default=None,
+                        help="início de um intervalo arbitrário (DD/MM/AAAA); substitui --period e --lookback")
+    parser.add_argument("--fim", type=ler_data, default=None,
+                        help="fim do intervalo arbitrário, inclusive (padrão: hoje)")
+    parser.add_argument("--backend", choices=("selenium", "http"), default=None,
+                        help="backend de extração; http é experimental (padrão: AUTO455_BACKEND)")
+    parser.add_argument("--paralelo", action="store_true", default=None, help="extrai os meses em paralelo")
+    parser.add_argument("--pipeline", action="store_true", default=None,
+                        help="solicita todos os meses antes de aguardá-los")
+    parser.add_argument("--completo", dest="incremental", action="store_false", default=None,
+                        help="ignora o manifesto e extrai também os meses já finais")
+    parser.add_argument("--oculto", action="store_true", help="executa o Edge sem janela")
+    parser.add_argument("--enxuto", action="store_true",
+                        help="executa o Edge sem janela, sem imagens e extensões, reaproveitando o perfil")
+    parser.add_argument("--servico", action="store_true",
+                        help="roda continuamente seguindo os horários do arquivo de agendamentos")
+    parser.add_argument("--agendamentos", default=ARQUIVO_AGENDAMENTOS,
+                        help=f"arquivo de agendamentos do modo serviço (padrão: {ARQUIVO_AGENDAMENTOS})")
+    parser.add_argument("--log", default=None, help="grava o log neste arquivo em vez da saída padrão")
+    parser.add_argument("--perfis", nargs="?", const=ARQUIVO_PERFIS, default=None,
+                        help=f"extrai todas as contas do arquivo de perfis (padrão: {ARQUIVO_PERFIS})")
+    parser.add_argument("--perfil", action="append", default=None,
+                        help="extrai apenas este perfil do arquivo de perfis (pode ser repetido)")
+    parser.add_argument("--max-perfis", type=int, default=None,
+                        help="perfis extraídos ao mesmo tempo (padrão: AUTO455_MAX_PERFIS)")
+    return parser
+
+
+def principal(argumentos=None):
+    """
+    Interpreta a linha de comando e executa a extração ou o serviço
+
+    Returns:
+        int: Código de saída do processo
+    """
+    parser = criar_parser()
+    opcoes = parser.parse_args(argumentos)
+    if opcoes.lookback is not None and opcoes.lookback < 1:
+        parser.error("--lookback deve ser pelo menos 1")
+    if opcoes.fim and not opcoes.inicio:
+        parser.error("--fim exige --inicio")
+    if opcoes.inicio and opcoes.fim and opcoes.fim < opcoes.inicio:
+        parser.error("--fim deve ser posterior a --inicio")
+    if opcoes.max_perfis is not None and opcoes.max_perfis < 1:
+        parser.error("--max-perfis deve ser pelo menos 1")
+    opcoes.lista_perfis = None
+    if opcoes.perfis or opcoes.perfil:
+        try:
+            opcoes.lista_perfis = carregar_perfis(opcoes.perfis or ARQUIVO_PERFIS, opcoes.perfil)
+        except ValueError as e:
+            parser.error(str(e))
+
+    saida_original = sys.stdout
+    arquivo_log = open(opcoes.log, "a", encoding="utf-8") if opcoes.log else None
+    sys.stdout = SaidaComHorario(arquivo_log or saida_original)
+
+    stop_event = threading.Event()
+
+    def ao_receber_sinal(numero, quadro):
+        if stop_event.is_set():
+            raise KeyboardInterrupt  # Segundo sinal: encerra sem aguardar
+        print("Sinal de parada recebido. Aguardando finalização da tarefa atual...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, ao_receber_sinal)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, ao_receber_sinal)
+
+    try:
+        if opcoes.oculto or opcoes.enxuto:
+            import auto_455
+            if opcoes.oculto:
+                auto_455.NAVEGADOR_OCULTO = True
+            if opcoes.enxuto:
+                auto_455.NAVEGADOR_ENXUTO = True
+        if opcoes.servico:
+            return executar_servico(stop_event, opcoes)
+        return executar(stop_event, opcoes)
+    finally:
+        sys.stdout.flush()
+        sys.stdout = saida_original
+        if arquivo_log:
+            arquivo_log.close()
+
+
+if __name__ == "__main__":
+    sys.exit(principal())
@@ -0,0 +1,168 @@
+"""
+Base consolidada de entregas, particionada por mês.
+Cada mês baixado substitui apenas a sua própria partição, com as linhas
+deduplicadas pela chave do documento. Um índice JSON guarda as estatísticas
+de cada partição (linhas, datas mínima e máxima) para que a leitura de um
+intervalo abra somente as partições necessárias.
+
+Estrutura:
+    consolidado/
+        _indice.json
+        periodo=2026-08/dados.parquet
+        periodo=2026-09/dados.parquet
+
+Requer:
+- pandas
+- pyarrow
+"""
+
+from datetime import datetime
+import json
+import os
+import threading
+
+from conversao import normalizar_coluna, tipo_da_coluna
+
+# Colunas que identificam um documento, em ordem de preferência (nomes normalizados)
+CHAVES_DOCUMENTO = (("chave_cte",), ("serie_ctrc", "ctrc"), ("ctrc",))
+
+# Colunas de data usadas nas estatísticas das partições, em ordem de preferência
+COLUNAS_DATA_PREFERIDAS = ("emissao", "data_emissao")
+
+ARQUIVO_INDICE = "_indice.json"
+
+_trava_indice = threading.Lock()
+
+
+def chave_da_particao(periodo):
+    """Retorna a chave da partição de um período, no formato AAAA-MM"""
+    return f"{periodo['ano']}-{periodo['mes']:02d}"
+
+
+def _colunas_por_nome(colunas):
+    return {normalizar_coluna(coluna): coluna for coluna in colunas}
+
+
+def _chave_documento(colunas):
+    """Retorna as colunas reais que formam a chave do documento, ou None se não houver"""
+    por_nome = _colunas_por_nome(colunas)
+    for chave in CHAVES_DOCUMENTO:
+        if all(nome in por_nome for nome in chave):
+            return [por_nome[nome] for nome in chave]
+    return None
+
+
+def _coluna_de_data(colunas):
+    por_nome = _colunas_por_nome(colunas)
+    for nome in COLUNAS_DATA_PREFERIDAS:
+        if nome in por_nome:
+            return por_nome[nome]
+    return next((coluna for coluna in colunas if tipo_da_coluna(coluna) == "data"), None)
+
+
+def carregar_indice(pasta_consolidado):
+    """Lê o índice de partições (dicionário vazio se ainda não existir)"""
+    caminho = os.path.join(pasta_consolidado, ARQUIVO_INDICE)
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _salvar_indice(pasta_consolidado, indice):
+    caminho = os.path.join(pasta_consolidado, ARQUIVO_INDICE)
+    with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(indice, f, indent=2, ensure_ascii=False)
+    os.replace(caminho + ".tmp", caminho)
+
+
+def atualizar_particao(pasta_consolidado, periodo, arquivo_parquet):
+    """
+    Substitui a partição do período pelo Parquet recém-gerado, sem duplicatas
+
+    Args:
+        pasta_consolidado: Pasta raiz da base consolidada
+        periodo: Dicionário gerado por auto_455.calcular_periodos
+        arquivo_parquet: Parquet do mês gerado por conversao.converter_para_parquet
+
+    Returns:
+        str: Caminho da partição gravada, ou None em caso de erro
+    """
+    import pandas as pd
+
+    chave = chave_da_particao(periodo)
+    pasta_particao = os.path.join(pasta_consolidado, f"periodo={chave}")
+    destino = os.path.join(pasta_particao, "dados.parquet")
+    try:
+        dados = pd.read_parquet(arquivo_parquet)
+        total = len(dados)
+        colunas_chave = _chave_documento(dados.columns)
+        if colunas_chave:
+            dados = dados.drop_duplicates(subset=colunas_chave, keep="last")
+        else:
+            print(f"Coluna de chave do documento não encontrada em {chave}. Partição gravada sem deduplicação.")
+
+        os.makedirs(pasta_particao, exist_ok=True)
+        dados.to_parquet(destino + ".tmp", index=False, compression="zstd")
+        os.replace(destino + ".tmp", destino)
+
+        coluna_data = _coluna_de_data(dados.columns)
+        datas = dados[coluna_data].dropna() if coluna_data else None
+        estatisticas = {
+            "arquivo": os.path.relpath(destino, pasta_consolidado),
+            "linhas": len(dados),
+            "duplicadas_removidas": total - len(dados),
+            "coluna_data": coluna_data,
+            "data_min": datas.min().isoformat() if datas is not None and len(datas) else None,
+            "data_max": datas.max().isoformat() if datas is not None and len(datas) else None,
+            "atualizado_em": datetime.now().isoformat(timespec="seconds"),
+        }
+        with _trava_indice:
+            indice = carregar_indice(pasta_consolidado)
+            indice[chave] = estatisticas
+            _salvar_indice(pasta_consolidado, dict(sorted(indice.items())))
+        print(f"Partição {chave} da base consolidada atualizada ({len(dados)} linhas, "
+              f"{total - len(dados)} duplicadas removidas).")
+        return destino
+    except Exception as e:
+        print(f"Erro ao atualizar a partição {chave} da base consolidada: {e}")
+        return None
+
+
+def ler_consolidado(pasta_consolidado, inicio=None, fim=None, colunas=None):
+    """
+    Lê as entregas de um intervalo abrindo apenas as partições que o cobrem
+
+    Args:
+        pasta_consolidado: Pasta raiz da base consolidada
+        inicio: Data inicial (datetime) ou None para sem limite
+        fim: Data final (datetime) ou None para sem limite
+        colunas: Colunas a carregar (None carrega todas)
+
+    Returns:
+        DataFrame: Linhas das partições selecionadas, filtradas pelo intervalo
+    """
+    import pandas as pd
+
+    partes = []
+    for estatisticas in carregar_indice(pasta_consolidado).values():
+        data_min = estatisticas.get("data_min")
+        data_max = estatisticas.get("data_max")
+        if inicio and data_max and datetime.fromisoformat(data_max) < inicio:
+            continue
+        if fim and data_min and datetime.fromisoformat(data_min) > fim:
+            continue
+        coluna_data = estatisticas.get("coluna_data")
+        leitura = None
+        if colunas is not None:
+            leitura = list(colunas) + ([coluna_data] if coluna_data and coluna_data not in colunas else [])
+        parte = pd.read_parquet(os.path.join(pasta_consolidado, estatisticas["arquivo"]), columns=leitura)
+        if coluna_data and (inicio or fim):
+            if inicio:
+                parte = parte[parte[coluna_data] >= inicio]
+            if fim:
+                parte = parte[parte[coluna_data] <= fim]
+        partes.append(parte[list(colunas)] if colunas is not None else parte)
+    if not partes:
+        return pd.DataFrame(columns=list(colunas or []))
+    return pd.concat(partes, ignore_index=True)
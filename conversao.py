@@ -0,0 +1,270 @@
+"""
+Conversão dos relatórios 455 baixados para Parquet tipado.
+Lê o arquivo exportado pelo SSW em blocos, aplica um esquema explícito de
+tipos (datas, categorias para unidade/situação, números para frete e peso) e
+grava um Parquet comprimido ao lado do original. A memória usada depende do
+tamanho do bloco, não do tamanho do relatório. A exceção é o formato antigo
+do Excel (.xls): o xlrd carrega a planilha inteira, e só a conversão dela
+para DataFrames é feita em blocos.
+
+Requer:
+- pandas
+- pyarrow
+- openpyxl (relatórios .xlsx) e xlrd (relatórios .xls)
+"""
+
+import os
+import re
+import unicodedata
+
+# Linhas lidas por bloco
+LINHAS_POR_BLOCO = int(os.getenv("AUTO455_LINHAS_POR_BLOCO", "50000"))
+
+# Compressão do Parquet gerado
+COMPRESSAO_PARQUET = "zstd"
+
+# Número com ponto de milhar e sem vírgula decimal ("1.234", "12.345.678"): no
+# formato brasileiro do SSW o ponto separa milhares, não decimais
+MILHAR_SEM_DECIMAIS = re.compile(r"^-?\d{1,3}(\.\d{3})+$")
+
+# Planilhas: as células numéricas chegam como texto do float ("1.234" é um decimal)
+EXTENSOES_PLANILHA = (".xlsx", ".xls")
+
+# Formatos de data aceitos, na ordem em que são tentados
+FORMATOS_DATA = ("%d/%m/%Y", "%d/%m/%y", "%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+# Esquema explícito: tipo de cada coluna pelo nome normalizado (sem acentos,
+# minúsculo, com "_" no lugar de espaços e pontuação)
+ESQUEMA_455 = {
+    "ctrc": "texto",
+    "serie_ctrc": "texto",
+    "chave_cte": "texto",
+    "nota_fiscal": "texto",
+    "emissao": "data",
+    "data_emissao": "data",
+    "data_entrega": "data",
+    "previsao_entrega": "data",
+    "data_previsao": "data",
+    "unidade": "categoria",
+    "unidade_origem": "categoria",
+    "unidade_destino": "categoria",
+    "situacao": "categoria",
+    "status": "categoria",
+    "ocorrencia": "categoria",
+    "frete": "numero",
+    "valor_frete": "numero",
+    "frete_total": "numero",
+    "valor_mercadoria": "numero",
+    "peso": "numero",
+    "peso_real": "numero",
+    "peso_calculado": "numero",
+    "volumes": "numero",
+}
+
+# Regras para colunas fora do esquema explícito, pelo início do nome normalizado
+PREFIXOS_455 = (
+    ("data_", "data"),
+    ("unidade", "categoria"),
+    ("situacao", "categoria"),
+    ("frete", "numero"),
+    ("valor_", "numero"),
+    ("peso", "numero"),
+)
+
+
+def normalizar_coluna(nome):
+    """Normaliza o nome de uma coluna: sem acentos, minúsculo e com "_" como separador"""
+    sem_acentos = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode("ascii")
+    partes = "".join(c if c.isalnum() else " " for c in sem_acentos.lower()).split()
+    return "_".join(partes)
+
+
+def tipo_da_coluna(nome):
+    """Retorna o tipo ("data", "categoria", "numero" ou "texto") de uma coluna do relatório"""
+    normalizado = normalizar_coluna(nome)
+    if normalizado in ESQUEMA_455:
+        return ESQUEMA_455[normalizado]
+    for prefixo, tipo in PREFIXOS_455:
+        if normalizado.startswith(prefixo):
+            return tipo
+    return "texto"
+
+
+def _detectar_formato_texto(caminho):
+    """Detecta a codificação e o separador de um relatório em texto pelo início do arquivo"""
+    with open(caminho, "rb") as arquivo:
+        amostra = arquivo.read(64 * 1024)
+    try:
+        texto = amostra.decode("utf-8")
+        codificacao = "utf-8"
+    except UnicodeDecodeError:
+        texto = amostra.decode("latin-1")
+        codificacao = "latin-1"
+    cabecalho = texto.splitlines()[0] if texto else ""
+    separador = max(";,\t|", key=cabecalho.count)
+    return codificacao, separador
+
+
+def _valor_xls(celula, modo_data):
+    """Converte uma célula do xlrd em texto, como o pandas faria ao ler o .xls"""
+    import xlrd
+
+    if celula.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+        return ""
+    if celula.ctype == xlrd.XL_CELL_DATE:
+        return str(xlrd.xldate_as_datetime(celula.value, modo_data))
+    if celula.ctype == xlrd.XL_CELL_NUMBER and float(celula.value).is_integer():
+        return str(int(celula.value))
+    return str(celula.value)
+
+
+def _ler_blocos(caminho):
+    """Gera DataFrames com no máximo LINHAS_POR_BLOCO linhas, todas as colunas como texto"""
+    import pandas as pd
+
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == ".xlsx":
+        from openpyxl import load_workbook
+        livro = load_workbook(caminho, read_only=True, data_only=True)
+        try:
+            linhas = livro.active.iter_rows(values_only=True)
+            colunas = [str(c) if c is not None else "" for c in next(linhas, ())]
+            bloco = []
+            for linha in linhas:
+                bloco.append(["" if v is None else str(v) for v in linha])
+                if len(bloco) >= LINHAS_POR_BLOCO:
+                    yield pd.DataFrame(bloco, columns=colunas)
+                    bloco = []
+            if bloco:
+                yield pd.DataFrame(bloco, columns=colunas)
+        finally:
+            livro.close()
+    elif extensao == ".xls":
+        import xlrd
+        # O formato antigo do Excel não permite leitura em fluxo: o xlrd carrega a
+        # planilha, mas os DataFrames são montados por faixas de linhas
+        print(f"'{os.path.basename(caminho)}' está no formato .xls e é carregado inteiro pelo xlrd.")
+        livro = xlrd.open_workbook(caminho, on_demand=True)
+        try:
+            planilha = livro.sheet_by_index(0)
+            if planilha.nrows == 0:
+                return
+            colunas = [_valor_xls(celula, livro.datemode) for celula in planilha.row(0)]
+            for inicio in range(1, planilha.nrows, LINHAS_POR_BLOCO):
+                fim = min(inicio + LINHAS_POR_BLOCO, planilha.nrows)
+                yield pd.DataFrame([[_valor_xls(celula, livro.datemode) for celula in planilha.row(indice)]
+                                    for indice in range(inicio, fim)], columns=colunas)
+        finally:
+            livro.release_resources()
+    else:
+        codificacao, separador = _detectar_formato_texto(caminho)
+        yield from pd.read_csv(caminho, sep=separador, encoding=codificacao, dtype=str,
+                               keep_default_na=False, chunksize=LINHAS_POR_BLOCO)
+
+
+def _converter_datas(valores):
+    """Converte datas tentando os FORMATOS_DATA em sequência, sem cair na inferência lenta do pandas"""
+    import pandas as pd
+
+    datas = pd.Series(pd.NaT, index=valores.index, dtype="datetime64[ns]")
+    for formato in FORMATOS_DATA:
+        faltantes = datas.isna() & valores.notna()
+        if not faltantes.any():
+            break
+        datas[faltantes] = pd.to_datetime(valores[faltantes], format=formato, errors="coerce")
+    return datas
+
+
+def _converter_numeros(valores, ponto_milhar=True):
+    """
+    Converte números no formato brasileiro ("1.234,56", "1.234") ou já com ponto decimal ("1234.56")
+
+    Args:
+        valores: Series de textos
+        ponto_milhar: Lê "1.234" como 1234. Desligado para planilhas, cujas células
+            numéricas são convertidas em texto com ponto decimal
+    """
+    import pandas as pd
+
+    brasileiro = valores.str.contains(",", regex=False, na=False)
+    if ponto_milhar:
+        brasileiro |= valores.str.match(MILHAR_SEM_DECIMAIS, na=False)
+    ajustados = valores.where(~brasileiro, valores.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(ajustados, errors="coerce")
+
+
+def _aplicar_esquema(bloco, tipos, ponto_milhar=True):
+    import pandas as pd
+
+    convertido = pd.DataFrame(index=bloco.index)
+    for coluna, tipo in tipos.items():
+        valores = bloco[coluna].astype(str).str.strip()
+        valores = valores.where(valores != "")
+        if tipo == "data":
+            convertido[coluna] = _converter_datas(valores)
+        elif tipo == "numero":
+            convertido[coluna] = _converter_numeros(valores, ponto_milhar)
+        else:
+            convertido[coluna] = valores
+    return convertido
+
+
+def _esquema_arrow(tipos):
+    import pyarrow as pa
+
+    tipos_arrow = {
+        "data": pa.timestamp("ns"),
+        "numero": pa.float64(),
+        "categoria": pa.dictionary(pa.int32(), pa.string()),
+        "texto": pa.string(),
+    }
+    return pa.schema([(coluna, tipos_arrow[tipo]) for coluna, tipo in tipos.items()])
+
+
+def converter_para_parquet(caminho):
+    """
+    Converte um relatório 455 baixado em Parquet tipado, ao lado do original
+
+    Args:
+        caminho: Arquivo do relatório (csv/sswweb/txt, xlsx ou xls)
+
+    Returns:
+        str: Caminho do Parquet gerado, ou None se a conversão falhar
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow não está instalado. Conversão para Parquet ignorada.")
+        return None
+
+    destino = os.path.splitext(caminho)[0] + ".parquet"
+    temporario = destino + ".tmp"
+    escritor = None
+    linhas = 0
+    ponto_milhar = os.path.splitext(caminho)[1].lower() not in EXTENSOES_PLANILHA
+    try:
+        for bloco in _ler_blocos(caminho):
+            if escritor is None:
+                tipos = {coluna: tipo_da_coluna(coluna) for coluna in bloco.columns}
+                esquema = _esquema_arrow(tipos)
+                escritor = pq.ParquetWriter(temporario, esquema, compression=COMPRESSAO_PARQUET)
+            tabela = pa.Table.from_pandas(_aplicar_esquema(bloco, tipos, ponto_milhar), schema=esquema, preserve_index=False)
+            escritor.write_table(tabela)
+            linhas += len(bloco)
+        if escritor is None:
+            print(f"Relatório '{os.path.basename(caminho)}' vazio. Parquet não gerado.")
+            return None
+        escritor.close()
+        escritor = None
+        os.replace(temporario, destino)
+        print(f"Parquet gerado: '{os.path.basename(destino)}' ({linhas} linhas).")
+        return destino
+    except Exception as e:
+        print(f"Erro ao converter '{os.path.basename(caminho)}' para Parquet: {e}")
+        return None
+    finally:
+        if escritor is not None:
+            escritor.close()
+        if os.path.exists(temporario):
+            os.remove(temporario)
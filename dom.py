@@ -0,0 +1,157 @@
+"""
+Acesso em lote ao DOM das páginas do SSW.
+Cada função faz um único execute_script: lê uma tabela inteira como dados
+estruturados, preenche um grupo de campos devolvendo os valores aplicados
+para verificação ou clica em um elemento pelo localizador. Substitui as
+sequências de find_element, clear e send_keys, em que cada chamada é uma
+ida e volta HTTP ao WebDriver, por uma chamada por etapa, independente da
+quantidade de linhas da tabela ou de campos do formulário.
+"""
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from esperas import _normalizar
+
+# Lê as linhas da tabela pelo id: textos das células e o link <u> de download (se houver)
+_SCRIPT_LER_TABELA = """
+var tabela = document.getElementById(arguments[0]);
+if (!tabela) { return null; }
+var linhas = [];
+for (var i = 0; i < tabela.rows.length; i++) {
+    var linha = tabela.rows[i];
+    var celulas = [];
+    for (var j = 0; j < linha.cells.length; j++) {
+        var celula = linha.cells[j];
+        celulas.push((celula.innerText || celula.textContent || "").trim());
+    }
+    linhas.push({celulas: celulas, link: linha.getElementsByTagName("u")[0] || null});
+}
+return linhas;
+"""
+
+# Aplica os valores aos campos e devolve o valor de cada um depois da alteração
+# (null para campo não encontrado). Dispara os eventos que o SSW escuta ao digitar
+_SCRIPT_PREENCHER_CAMPOS = """
+function localizar(tipo, valor) {
+    if (tipo === "id") { return document.getElementById(valor); }
+    return document.getElementsByName(valor)[0] || null;
+}
+function disparar(campo, nome) {
+    campo.dispatchEvent(new Event(nome, {bubbles: true}));
+}
+var aplicados = [];
+var campos = arguments[0];
+for (var i = 0; i < campos.length; i++) {
+    var campo = localizar(campos[i][0], campos[i][1]);
+    if (!campo) { aplicados.push(null); continue; }
+    campo.focus();
+    campo.value = campos[i][2];
+    disparar(campo, "input");
+    disparar(campo, "change");
+    disparar(campo, "blur");
+    aplicados.push(campo.value);
+}
+return aplicados;
+"""
+
+_SCRIPT_CLICAR = """
+var elemento = arguments[0] === "id" ? document.getElementById(arguments[1])
+                                     : document.getElementsByName(arguments[1])[0];
+if (!elemento) { return false; }
+elemento.click();
+return true;
+"""
+
+# Tipos de localizador aceitos pelos scripts
+_TIPOS_LOCALIZADOR = {By.ID: "id", By.NAME: "name"}
+
+
+def _tipo(localizador):
+    try:
+        return _TIPOS_LOCALIZADOR[localizador[0]]
+    except KeyError:
+        raise ValueError(f"Localizador não suportado: {localizador}. Use By.ID ou By.NAME.")
+
+
+def ler_tabela(driver, id_tabela="tblsr"):
+    """
+    Lê todas as linhas de dados (sem o cabeçalho) de uma tabela em uma única chamada
+
+    Args:
+        driver: Instância do WebDriver, na janela da tabela
+        id_tabela: Id da tabela
+
+    Returns:
+        list: Linhas no formato {"celulas": [textos], "link": WebElement <u> ou None},
+        ou None se a tabela não existir na janela atual
+    """
+    linhas = driver.execute_script(_SCRIPT_LER_TABELA, id_tabela)
+    return None if linhas is None else linhas[1:]
+
+
+def seq_do_periodo(linhas, data_inicio, data_fim, primeira_linha=True):
+    """
+    Escolhe o seq da requisição de um período entre as linhas da tabela tblsr.
+    Fica com a linha mais recente (a primeira) cujas células citam as duas datas,
+    para que envios simultâneos da mesma conta não troquem os seqs entre si. Se
+    nenhuma linha mostrar o período, usa a primeira linha (com primeira_linha).
+
+    Args:
+        linhas: Linhas no formato de ler_tabela (ou de ssw_http.ler_tabela)
+        data_inicio: Data inicial enviada no formulário (DDMMYY)
+        data_fim: Data final enviada no formulário (DDMMYY)
+        primeira_linha: Sem linha do período, usa a primeira linha da tabela
+
+    Returns:
+        str: Seq da requisição, ou None se a tabela não tiver linhas (ou, sem
+        primeira_linha, nenhuma linha do período)
+    """
+    inicio, fim = _normalizar(data_inicio), _normalizar(data_fim)
+    linhas = [linha for linha in linhas or [] if linha["celulas"]]
+    for linha in linhas:
+        texto = _normalizar(" ".join(linha["celulas"][1:]))
+        if inicio in texto and fim in texto:
+            return linha["celulas"][0]
+    if not linhas or not primeira_linha:
+        return None
+    print(f"Período {data_inicio} a {data_fim} não aparece na tabela. Usando a primeira linha.")
+    return linhas[0]["celulas"][0]
+
+
+def preencher_campos(driver, campos):
+    """
+    Preenche um grupo de campos em uma única chamada e confere os valores aplicados
+
+    Args:
+        driver: Instância do WebDriver
+        campos: Lista de (localizador, valor), com localizador (By.ID, ...) ou (By.NAME, ...)
+
+    Returns:
+        list: Localizadores dos campos que não ficaram com o valor pedido (vazia se todos ficaram).
+        A comparação ignora a formatação aplicada pelo SSW, como em esperas.valor_do_campo
+
+    Raises:
+        NoSuchElementException: Se algum campo não existir na página (formulário alterado)
+    """
+    aplicados = driver.execute_script(
+        _SCRIPT_PREENCHER_CAMPOS,
+        [[_tipo(localizador), localizador[1], valor] for localizador, valor in campos],
+    )
+    ausentes = [localizador[1] for (localizador, _), aplicado in zip(campos, aplicados) if aplicado is None]
+    if ausentes:
+        raise NoSuchElementException(f"Campos não encontrados no formulário: {', '.join(ausentes)}")
+    return [
+        localizador for (localizador, valor), aplicado in zip(campos, aplicados)
+        if aplicado is None or not _normalizar(aplicado).endswith(_normalizar(valor))
+    ]
+
+
+def clicar(driver, localizador):
+    """
+    Clica no elemento pelo localizador em uma única chamada
+
+    Returns:
+        bool: False se o elemento não foi encontrado
+    """
+    return driver.execute_script(_SCRIPT_CLICAR, _tipo(localizador), localizador[1])
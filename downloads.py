@@ -0,0 +1,89 @@
+"""
+Acompanhamento de downloads do navegador.
+Identifica exatamente o arquivo gerado por um clique de download comparando o
+conteúdo da pasta antes e depois do clique, e só o entrega quando o navegador
+terminou de gravá-lo (sem sufixo temporário e com tamanho estável).
+"""
+
+from esperas import pausa
+import os
+import time
+
+# Sufixos usados pelos navegadores enquanto o arquivo ainda está sendo gravado
+SUFIXOS_TEMPORARIOS = (".crdownload", ".partial", ".part", ".tmp", ".download")
+
+# Arquivos que nunca são considerados downloads
+ARQUIVOS_IGNORADOS = {"desktop.ini"}
+
+# Tempo máximo (s) para um download aparecer e terminar
+PRAZO_DOWNLOAD = int(os.getenv("AUTO455_PRAZO_DOWNLOAD", "120"))
+
+
+def instantaneo_pasta(pasta):
+    """
+    Registra os nomes presentes na pasta antes de um download
+
+    Args:
+        pasta: Pasta de download do navegador
+
+    Returns:
+        set: Nomes dos arquivos existentes (sem consultar datas ou tamanhos)
+    """
+    return set(os.listdir(pasta))
+
+
+def _eh_temporario(nome):
+    return nome.lower().endswith(SUFIXOS_TEMPORARIOS)
+
+
+def aguardar_download(pasta, arquivos_antes, stop_event=None, prazo=None,
+                      intervalo=0.5, leituras_estaveis=2):
+    """
+    Aguarda o novo arquivo surgir na pasta e terminar de ser gravado
+
+    Args:
+        pasta: Pasta de download do navegador
+        arquivos_antes: Resultado de instantaneo_pasta antes do clique
+        stop_event: Evento para controle de parada da automação
+        prazo: Tempo máximo em segundos (padrão: PRAZO_DOWNLOAD)
+        intervalo: Intervalo entre as verificações
+        leituras_estaveis: Quantidade de leituras seguidas com o mesmo tamanho
+
+    Returns:
+        str: Caminho completo do arquivo baixado, ou None se o prazo esgotar
+
+    Raises:
+        InterruptedError: Se o sinal de parada for recebido durante a espera
+    """
+    prazo = PRAZO_DOWNLOAD if prazo is None else prazo
+    limite = time.monotonic() + prazo
+    candidato = None
+    tamanho_anterior = -1
+    estaveis = 0
+    while time.monotonic() < limite:
+        novos = [
+            nome for nome in os.listdir(pasta)
+            if nome not in arquivos_antes and nome.lower() not in ARQUIVOS_IGNORADOS
+        ]
+        concluidos = sorted(nome for nome in novos if not _eh_temporario(nome))
+        em_andamento = any(_eh_temporario(nome) for nome in novos)
+
+        if concluidos and not em_andamento:
+            if len(concluidos) > 1:
+                print(f"Mais de um arquivo novo na pasta de download: {', '.join(concluidos)}. Usando '{concluidos[0]}'.")
+            caminho = os.path.join(pasta, concluidos[0])
+            try:
+                tamanho = os.path.getsize(caminho)
+            except OSError:
+                tamanho = -1
+            if caminho == candidato and tamanho > 0 and tamanho == tamanho_anterior:
+                estaveis += 1
+                if estaveis >= leituras_estaveis:
+                    return caminho
+            else:
+                candidato, tamanho_anterior, estaveis = caminho, tamanho, 0
+
+        pausa(intervalo, stop_event)
+
+    print(f"Nenhum download concluído na pasta em {prazo}s.")
+    return None
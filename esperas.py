@@ -0,0 +1,173 @@
+"""
+Camada de esperas por condição para a automação do SSW.
+Substitui as pausas fixas (time.sleep) por esperas do WebDriverWait sobre
+condições concretas da página: nova janela aberta, valor aplicado em um campo,
+tabela de requisições renderizada.
+
+Cada etapa tem um tempo máximo próprio definido no perfil de espera. Se uma
+etapa estoura o tempo do perfil ativo, a espera é repetida uma vez com o
+perfil "conservador" antes de desistir.
+"""
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+import os
+import time
+
+# Tempos máximos (em segundos) por etapa de cada perfil de espera
+PERFIS_ESPERA = {
+    "padrao": {
+        "login": 15,
+        "menu": 10,
+        "nova_janela": 10,
+        "formulario": 25,
+        "campo": 5,
+        "tabela": 20,
+        "pausa_confirmacao": 0.8,
+        "intervalo": 0.2,
+    },
+    "conservador": {
+        "login": 45,
+        "menu": 30,
+        "nova_janela": 30,
+        "formulario": 60,
+        "campo": 15,
+        "tabela": 60,
+        "pausa_confirmacao": 2,
+        "intervalo": 0.5,
+    },
+}
+
+# Perfil ativo (pode ser trocado pela variável de ambiente AUTO455_PERFIL_ESPERA)
+PERFIL_ESPERA = os.getenv("AUTO455_PERFIL_ESPERA", "padrao")
+
+
+def tempo_da_etapa(etapa, perfil=None):
+    """
+    Retorna o tempo configurado para uma etapa no perfil informado
+
+    Args:
+        etapa: Nome da etapa (chave de PERFIS_ESPERA)
+        perfil: Nome do perfil (padrão: PERFIL_ESPERA)
+    """
+    return PERFIS_ESPERA.get(perfil or PERFIL_ESPERA, PERFIS_ESPERA["padrao"])[etapa]
+
+
+def pausa(segundos, stop_event=None):
+    """
+    Pausa cancelável: retorna antes do tempo se o sinal de parada for recebido
+
+    Args:
+        segundos: Duração máxima da pausa
+        stop_event: Evento para controle de parada da automação
+
+    Raises:
+        InterruptedError: Se o sinal de parada for recebido durante a pausa
+    """
+    if stop_event:
+        if stop_event.wait(segundos):
+            raise InterruptedError
+    else:
+        time.sleep(segundos)
+
+
+def aguardar(driver, condicao, etapa, stop_event=None, perfil=None):
+    """
+    Aguarda uma condição com o tempo máximo da etapa no perfil ativo.
+    Se o tempo esgotar, tenta mais uma vez com o perfil conservador.
+
+    Args:
+        driver: Instância do WebDriver
+        condicao: Callable no formato das expected_conditions do Selenium
+        etapa: Nome da etapa (define o tempo máximo)
+        stop_event: Evento para controle de parada da automação
+        perfil: Perfil de espera (padrão: PERFIL_ESPERA)
+
+    Returns:
+        O valor retornado pela condição quando satisfeita
+
+    Raises:
+        InterruptedError: Se o sinal de parada for recebido durante a espera
+        TimeoutException: Se a condição não for satisfeita nem no perfil conservador
+    """
+    perfil = perfil or PERFIL_ESPERA
+    try:
+        return _aguardar_com_perfil(driver, condicao, etapa, stop_event, perfil)
+    except TimeoutException:
+        if perfil == "conservador":
+            raise
+        print(f"Espera da etapa '{etapa}' excedeu o perfil '{perfil}'. Repetindo com o perfil conservador.")
+        return _aguardar_com_perfil(driver, condicao, etapa, stop_event, "conservador")
+
+
+def _aguardar_com_perfil(driver, condicao, etapa, stop_event, perfil):
+    def condicao_cancelavel(drv):
+        if stop_event and stop_event.is_set():
+            raise InterruptedError
+        return condicao(drv)
+
+    espera = WebDriverWait(
+        driver,
+        tempo_da_etapa(etapa, perfil),
+        poll_frequency=tempo_da_etapa("intervalo", perfil),
+        ignored_exceptions=(NoSuchElementException, StaleElementReferenceException),
+    )
+    return espera.until(condicao_cancelavel, f"Tempo esgotado na etapa '{etapa}'")
+
+
+# --- Condições ---
+
+def nova_janela(janelas_antes):
+    """Condição satisfeita quando surge uma janela que não existia em janelas_antes; retorna o handle dela"""
+    janelas_antes = set(janelas_antes)
+
+    def _condicao(driver):
+        novas = [janela for janela in driver.window_handles if janela not in janelas_antes]
+        return novas[-1] if novas else False
+    return _condicao
+
+
+def _normalizar(valor):
+    return "".join(c for c in (valor or "") if c.isalnum()).lower()
+
+
+def valor_do_campo(localizador, valor):
+    """
+    Condição satisfeita quando o campo contém o valor digitado.
+    A comparação ignora a formatação aplicada pelo SSW (barras, espaços, caixa).
+    """
+    esperado = _normalizar(valor)
+
+    def _condicao(driver):
+        atual = _normalizar(driver.find_element(*localizador).get_attribute("value"))
+        return atual.endswith(esperado)
+    return _condicao
+
+
+def janela_com_elemento(localizador):
+    """
+    Condição satisfeita quando alguma janela aberta contém o elemento.
+    Percorre as janelas da mais recente para a mais antiga e deixa o driver
+    posicionado na janela onde o elemento foi encontrado.
+    """
+    def _condicao(driver):
+        for janela in reversed(driver.window_handles):
+            driver.switch_to.window(janela)
+            elementos = driver.find_elements(*localizador)
+            if elementos:
+                return elementos[0]
+        return False
+    return _condicao
+
+
+def tabela_renderizada(localizador=(By.ID, "tblsr"), linhas_minimas=2):
+    """Condição satisfeita quando a tabela existe e tem ao menos linhas_minimas linhas (cabeçalho incluso)"""
+    def _condicao(driver):
+        tabela = driver.find_element(*localizador)
+        return tabela if len(tabela.find_elements(By.TAG_NAME, "tr")) >= linhas_minimas else False
+    return _condicao
@@ -0,0 +1,198 @@
+"""
+Fatiamento adaptativo dos períodos de extração do relatório 455.
+Divide um intervalo de datas em fatias cujo tamanho (em dias) se ajusta ao
+tempo de geração e ao tamanho de arquivo por dia observados nas execuções
+anteriores, e junta os arquivos das fatias em um único arquivo do período.
+Períodos grandes viram várias requisições rápidas e repetíveis em vez de
+uma única requisição lenta e sujeita a estouro de prazo.
+"""
+
+from datetime import timedelta
+import json
+import os
+import threading
+
+from manifesto import substituir_se_alterado
+
+# Limites do tamanho de uma fatia, em dias
+DIAS_MINIMOS = 1
+DIAS_MAXIMOS = 31
+
+# Peso de cada nova observação na média móvel exponencial do histórico
+PESO_OBSERVACAO = 0.3
+
+# Extensões cujas partes são juntadas como texto (cabeçalho apenas da primeira)
+EXTENSOES_TEXTO = (".csv", ".txt", ".sswweb")
+
+
+def fatiar(inicio, fim, dias):
+    """
+    Divide o intervalo [inicio, fim] em fatias consecutivas de até "dias" dias
+
+    Args:
+        inicio: Primeiro dia (datetime)
+        fim: Último dia, inclusive (datetime)
+        dias: Tamanho máximo de cada fatia
+
+    Returns:
+        list: Tuplas (inicio, fim) de cada fatia, em ordem
+    """
+    fatias = []
+    atual = inicio
+    while atual <= fim:
+        fim_fatia = min(atual + timedelta(days=dias - 1), fim)
+        fatias.append((atual, fim_fatia))
+        atual = fim_fatia + timedelta(days=1)
+    return fatias
+
+
+class HistoricoFatias:
+    """
+    Médias observadas de segundos de geração e bytes de arquivo por dia de
+    relatório, persistidas em JSON. Seguro para uso pelos jobs do modo paralelo.
+
+    Args:
+        caminho: Arquivo JSON do histórico
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._trava = threading.Lock()
+        self.dados = {}
+        try:
+            if os.path.exists(caminho):
+                with open(caminho, "r", encoding="utf-8") as f:
+                    self.dados = json.load(f)
+        except Exception as e:
+            print(f"Erro ao carregar o histórico de fatias, iniciando um novo: {e}")
+
+    def registrar(self, dias, segundos_geracao, tamanho_arquivo):
+        """
+        Acrescenta a observação de uma fatia às médias
+
+        Args:
+            dias: Quantidade de dias da fatia
+            segundos_geracao: Tempo que o SSW levou para gerar o relatório (None se desconhecido)
+            tamanho_arquivo: Tamanho em bytes do arquivo baixado
+        """
+        observacoes = {"bytes_por_dia": tamanho_arquivo / dias}
+        if segundos_geracao is not None:
+            observacoes["segundos_por_dia"] = segundos_geracao / dias
+        with self._trava:
+            for chave, valor in observacoes.items():
+                anterior = self.dados.get(chave)
+                self.dados[chave] = valor if anterior is None else (
+                    anterior + PESO_OBSERVACAO * (valor - anterior))
+            self.dados["observacoes"] = self.dados.get("observacoes", 0) + 1
+            temporario = self.caminho + ".tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(self.dados, f, indent=2)
+            os.replace(temporario, self.caminho)
+
+    def dias_por_fatia(self, alvo_segundos, alvo_bytes):
+        """
+        Tamanho de fatia que mantém a geração e o arquivo dentro dos alvos
+
+        Args:
+            alvo_segundos: Tempo de geração desejado por fatia
+            alvo_bytes: Tamanho de arquivo desejado por fatia
+
+        Returns:
+            int: Dias por fatia (DIAS_MAXIMOS enquanto não houver histórico)
+        """
+        with self._trava:
+            segundos_por_dia = self.dados.get("segundos_por_dia")
+            bytes_por_dia = self.dados.get("bytes_por_dia")
+        limites = [DIAS_MAXIMOS]
+        if segundos_por_dia:
+            limites.append(int(alvo_segundos / segundos_por_dia))
+        if bytes_por_dia:
+            limites.append(int(alvo_bytes / bytes_por_dia))
+        return max(DIAS_MINIMOS, min(limites))
+
+
+def _valor_xls(celula, modo_data):
+    """Valor de uma célula do xlrd com o tipo original (data, número ou texto)"""
+    import xlrd
+
+    if celula.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+        return None
+    if celula.ctype == xlrd.XL_CELL_DATE:
+        return xlrd.xldate_as_datetime(celula.value, modo_data)
+    if celula.ctype == xlrd.XL_CELL_NUMBER and float(celula.value).is_integer():
+        return int(celula.value)
+    if celula.ctype == xlrd.XL_CELL_BOOLEAN:
+        return bool(celula.value)
+    return celula.value
+
+
+def _linhas_planilha(caminho):
+    """Gera as linhas da primeira planilha de um .xlsx ou .xls, com os tipos das células"""
+    if caminho.lower().endswith(".xls"):
+        import xlrd
+        livro = xlrd.open_workbook(caminho, on_demand=True)
+        try:
+            planilha = livro.sheet_by_index(0)
+            for indice in range(planilha.nrows):
+                yield [_valor_xls(celula, livro.datemode) for celula in planilha.row(indice)]
+        finally:
+            livro.release_resources()
+    else:
+        from openpyxl import load_workbook
+        livro = load_workbook(caminho, read_only=True, data_only=True)
+        try:
+            yield from livro.active.iter_rows(values_only=True)
+        finally:
+            livro.close()
+
+
+def juntar_partes(partes, destino):
+    """
+    Junta os arquivos das fatias, na ordem informada, em um único arquivo.
+    Relatórios em texto são concatenados em blocos; planilhas são copiadas linha
+    a linha para uma planilha .xlsx gravada em fluxo, mantendo os tipos das células.
+
+    Args:
+        partes: Caminhos dos arquivos das fatias, em ordem cronológica
+        destino: Caminho do arquivo final (mesma extensão das partes; um destino
+            .xls é gravado como .xlsx, único formato que o openpyxl grava)
+
+    Returns:
+        str: Caminho do arquivo final
+    """
+    if destino.lower().endswith(".xls"):
+        destino = os.path.splitext(destino)[0] + ".xlsx"
+    temporario = destino + ".tmp"
+    if destino.lower().endswith(EXTENSOES_TEXTO):
+        with open(temporario, "wb") as saida:
+            ultimo = b"\n"
+            for indice, parte in enumerate(partes):
+                with open(parte, "rb") as entrada:
+                    cabecalho = entrada.readline()
+                    if indice == 0 and cabecalho:
+                        saida.write(cabecalho)
+                        ultimo = cabecalho
+                    for numero, bloco in enumerate(iter(lambda: entrada.read(1024 * 1024), b"")):
+                        # Garante a quebra de linha entre a última linha de uma parte e a primeira da seguinte
+                        if numero == 0 and not ultimo.endswith(b"\n"):
+                            saida.write(b"\r\n")
+                        saida.write(bloco)
+                        ultimo = bloco
+    else:
+        from openpyxl import Workbook
+        # No modo write_only as linhas vão direto para o disco: a memória não cresce com o período
+        livro = Workbook(write_only=True)
+        planilha = livro.create_sheet()
+        for indice, parte in enumerate(partes):
+            linhas = _linhas_planilha(parte)
+            cabecalho = next(linhas, None)
+            if indice == 0 and cabecalho is not None:
+                planilha.append(cabecalho)
+            for linha in linhas:
+                planilha.append(linha)
+        livro.save(temporario)
+    # Junção idêntica à versão anterior do mês mantém o arquivo existente intocado
+    substituir_se_alterado(temporario, destino)
+    for parte in partes:
+        os.remove(parte)
+    return destino
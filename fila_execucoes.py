@@ -0,0 +1,80 @@
+"""
+Fila de execuções da automação 455 entre o agendador e o worker.
+Gatilhos que chegam enquanto uma execução está em andamento não são
+descartados: todos são combinados em uma única execução pendente, que roda
+assim que a atual terminar. Um gatilho manual tem precedência sobre os
+agendados: a execução pendente passa a ser manual (e assim aparece no log),
+mesmo que tenha sido criada por um agendamento.
+"""
+
+from datetime import datetime
+import threading
+import time
+
+
+class FilaExecucoes:
+    """
+    No máximo uma execução pendente, que acumula os gatilhos recebidos.
+    Segura para uso pela thread do agendador e pela interface.
+    """
+
+    def __init__(self):
+        self._pendente = None
+        self._trava = threading.Lock()
+
+    def enfileirar(self, origem="agendado"):
+        """
+        Adiciona um gatilho, combinando-o com a execução pendente se houver uma
+
+        Args:
+            origem: "manual" ou "agendado"
+
+        Returns:
+            bool: True se criou a execução pendente, False se foi combinado com a existente
+        """
+        with self._trava:
+            if self._pendente:
+                self._pendente["gatilhos"] += 1
+                if origem == "manual":
+                    self._pendente["origem"] = "manual"
+                return False
+            self._pendente = {
+                "origem": origem,
+                "enfileirado_em": datetime.now(),
+                "inicio_espera": time.monotonic(),
+                "gatilhos": 1,
+            }
+            return True
+
+    def retirar(self):
+        """
+        Retira a execução pendente
+
+        Returns:
+            dict: Execução pendente com a espera em segundos em "espera_s", ou None se a fila estiver vazia
+        """
+        with self._trava:
+            proxima, self._pendente = self._pendente, None
+        if proxima is None:
+            return None
+        proxima["espera_s"] = time.monotonic() - proxima["inicio_espera"]
+        return proxima
+
+    def limpar(self):
+        """Descarta a execução pendente e retorna quantas eram (0 ou 1)"""
+        with self._trava:
+            quantidade = 1 if self._pendente else 0
+            self._pendente = None
+        return quantidade
+
+    def situacao(self):
+        """
+        Resumo da fila para exibição no painel
+
+        Returns:
+            tuple: (quantidade de execuções pendentes, espera em segundos da pendente ou None)
+        """
+        with self._trava:
+            if not self._pendente:
+                return 0, None
+            return 1, time.monotonic() - self._pendente["inicio_espera"]
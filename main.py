@@ -14,41 +14,134 @@ Principais funcionalidades:
 import customtkinter as ctk
 import threading
 import time
-import json
+import logging
 import os
-from datetime import datetime
-import schedule
+import queue
+from logging.handlers import RotatingFileHandler
+from datetime import datetime, timedelta
 import sys
-import pystray
-from pystray import MenuItem as item
-from PIL import Image
 
-# Classe para redirecionar a saída do console para o textbox da interface
+from agendador import ARQUIVO_AGENDAMENTOS, Agendador, CacheAgendamentos
+from fila_execucoes import FilaExecucoes
+
+# Classe para redirecionar a saída do console para o textbox da interface.
+# Acumula o texto até o fim da linha, para que o "\n" isolado enviado pelo
+# print não vire uma entrada separada no log.
 class TextboxRedirector:
     def __init__(self, textbox):
         self.textbox = textbox
+        self.pendente = ""
+        self.lock = threading.Lock()
 
     def write(self, text):
-        self.textbox.log(text, end="")
+        with self.lock:
+            self.pendente += text
+            *linhas, self.pendente = self.pendente.split("\n")
+        for linha in linhas:
+            self.textbox.log(linha)
 
     def flush(self):
-        pass
-
-# Tenta importar a função principal de automação. Se falhar, cria uma função mock para testes
-try:
-    from auto_455 import main as automacao_main
-except ImportError:
-    def automacao_main(stop_event=None):
+        with self.lock:
+            linha, self.pendente = self.pendente, ""
+        if linha:
+            self.textbox.log(linha)
+
+# Funções substitutas usadas quando 'auto_455.py' não pode ser importado (testes)
+class AutomacaoIndisponivel:
+    @staticmethod
+    def main(stop_event=None, **kwargs):
         print("ERRO: O arquivo 'auto_455.py' não foi encontrado.")
         time.sleep(5)
 
+    @staticmethod
+    def preaquecer_navegadores(stop_event=None, **kwargs):
+        return []
+
+    @staticmethod
+    def manter_navegadores(navegadores, stop_event=None):
+        pass
+
+    @staticmethod
+    def encerrar_navegadores(navegadores):
+        pass
+
+
+# A automação (selenium, pandas, locale) só é importada no primeiro uso, fora
+# do caminho de abertura do painel
+_automacao = None
+_automacao_lock = threading.Lock()
+
+
+def carregar_automacao():
+    """Importa auto_455 na primeira chamada. Se falhar, usa as funções substitutas"""
+    global _automacao
+    with _automacao_lock:
+        if _automacao is None:
+            try:
+                import auto_455 as _automacao
+            except ImportError:
+                _automacao = AutomacaoIndisponivel
+    return _automacao
+
+
+def automacao_main(stop_event=None, **kwargs):
+    return carregar_automacao().main(stop_event, **kwargs)
+
+
+def preaquecer_navegadores(stop_event=None, **kwargs):
+    return carregar_automacao().preaquecer_navegadores(stop_event, **kwargs)
+
+
+def manter_navegadores(navegadores, stop_event=None):
+    carregar_automacao().manter_navegadores(navegadores, stop_event)
+
+
+def encerrar_navegadores(navegadores):
+    carregar_automacao().encerrar_navegadores(navegadores)
+
+# Segundos de antecedência para abrir e autenticar os navegadores antes de cada
+# agendamento (0 desativa) e intervalo entre as verificações da sessão aberta
+ANTECEDENCIA_PREAQUECIMENTO = int(os.getenv("AUTO455_PREAQUECIMENTO", "120"))
+INTERVALO_MANUTENCAO = 60
+# Tempo máximo (s) que a execução aguarda um pré-aquecimento ou uma manutenção em andamento
+ESPERA_PREAQUECIMENTO = int(os.getenv("AUTO455_ESPERA_PREAQUECIMENTO", "180"))
+
+# Milissegundos após a abertura do painel para importar a automação em segundo
+# plano, para que a primeira execução não espere pelo selenium e pelo pandas
+ATRASO_PRECARGA_MS = 3000
+
+# Log do painel: as mensagens entram em uma fila e a thread da interface as
+# insere em lotes a cada INTERVALO_LOG_MS. O textbox guarda no máximo
+# MAX_LINHAS_LOG linhas; o histórico completo vai para ARQUIVO_LOG, rotacionado
+# ao atingir TAMANHO_ARQUIVO_LOG bytes
+INTERVALO_LOG_MS = 200
+MAX_LINHAS_LOG = int(os.getenv("AUTO455_MAX_LINHAS_LOG", "2000"))
+ARQUIVO_LOG = os.getenv("AUTO455_ARQUIVO_LOG", "automacao_455.log")
+TAMANHO_ARQUIVO_LOG = 5 * 1024 * 1024
+BACKUPS_ARQUIVO_LOG = 5
+
+
+def criar_logger_arquivo():
+    """Cria o logger que grava o histórico completo do painel em arquivos rotacionados"""
+    logger = logging.getLogger("automacao_455.painel")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not logger.handlers:
+        try:
+            handler = RotatingFileHandler(ARQUIVO_LOG, maxBytes=TAMANHO_ARQUIVO_LOG,
+                                          backupCount=BACKUPS_ARQUIVO_LOG, encoding="utf-8")
+        except OSError:
+            handler = logging.NullHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+        logger.addHandler(handler)
+    return logger
+
 # Janela de configuração dos agendamentos
 class ScheduleWindow(ctk.CTkToplevel):
     def __init__(self, parent):
         super().__init__(parent)
         
         self.parent = parent
-        self.schedule_file = "agendamentos.json"
         
         self.title("Configurações de Agendamento")
         self.geometry("500x400")
@@ -108,19 +201,14 @@ class ScheduleWindow(ctk.CTkToplevel):
     
     def load_schedules(self):
         try:
-            if os.path.exists(self.schedule_file):
-                with open(self.schedule_file, 'r', encoding='utf-8') as f:
-                    self.schedules = json.load(f)
-            else:
-                self.schedules = []
+            self.schedules = self.parent.cache_agendamentos.carregar()
         except Exception as e:
             self.schedules = []
             self.parent.log(f"Erro ao carregar agendamentos: {e}")
     
     def save_schedules(self):
         try:
-            with open(self.schedule_file, 'w', encoding='utf-8') as f:
-                json.dump(self.schedules, f, indent=2, ensure_ascii=False)
+            self.parent.cache_agendamentos.salvar(self.schedules)
             self.parent.log(f"Agendamentos salvos: {len(self.schedules)} horários ativos")
         except Exception as e:
             self.parent.log(f"Erro ao salvar agendamentos: {e}")
@@ -212,10 +300,23 @@ class App(ctk.CTk):
 
         # Variáveis de controle da automação e agendamento
         self.automation_thread = None  # Thread que executa a automação
+        self.em_execucao = False       # Há uma execução em andamento (inclui o fim do worker)
+        self.fila_execucoes = FilaExecucoes()  # Gatilhos pendentes, combinados em uma execução
+        self.despacho_lock = threading.Lock()
         self.stop_event = None        # Evento para controle de parada da automação
-        self.scheduler_thread = None   # Thread que gerencia os agendamentos
+        self.agendador = Agendador()   # Dorme até o próximo horário agendado
+        self.cache_agendamentos = CacheAgendamentos(ARQUIVO_AGENDAMENTOS)  # Relido só quando o arquivo muda
         self.is_schedule_running = False  # Estado do agendador
         self.schedule_window = None    # Referência para janela de agendamentos
+        self.navegadores_preaquecidos = None  # Navegadores logados aguardando o próximo agendamento
+        self.navegadores_em_manutencao = None  # Navegadores pré-aquecidos retirados durante a manutenção
+        self.preaquecimento_lock = threading.Lock()
+        # Liberado quando não há pré-aquecimento nem manutenção em andamento: a execução
+        # espera por ele em vez de abrir um segundo navegador para a mesma conta
+        self.preaquecimento_livre = threading.Event()
+        self.preaquecimento_livre.set()
+        self.fila_log = queue.SimpleQueue()  # Mensagens aguardando a thread da interface
+        self.logger_arquivo = criar_logger_arquivo()
 
         # Configuração da janela principal
         self.title("Automação 455")
@@ -244,6 +345,9 @@ class App(ctk.CTk):
                                        command=self.stop_automation, state="disabled")
         self.stop_button.grid(row=0, column=1, padx=5)
 
+        self.fila_status_label = ctk.CTkLabel(action_frame, text="Fila vazia", text_color="gray")
+        self.fila_status_label.grid(row=1, column=0, columnspan=2, pady=(5, 0))
+
         schedule_frame = ctk.CTkFrame(main_frame)
         schedule_frame.grid(row=2, column=0, padx=20, pady=10, sticky="ew")
         schedule_frame.grid_columnconfigure(0, weight=1)
@@ -272,23 +376,55 @@ class App(ctk.CTk):
         self.status_textbox.grid(row=3, column=0, padx=20, pady=20, sticky="nsew")
 
         sys.stdout = TextboxRedirector(self)
+        self.after(INTERVALO_LOG_MS, self._drenar_log)
 
         self.log("Painel de controle iniciado. Pronto para receber comandos.")
         
         self.update_schedules()
+        self.after(ATRASO_PRECARGA_MS, lambda: threading.Thread(target=carregar_automacao, daemon=True).start())
     
     def log(self, message, end="\n"):
-        """Adiciona uma mensagem ao log com timestamp"""
+        """
+        Adiciona uma mensagem ao log com timestamp.
+        Pode ser chamado de qualquer thread: a mensagem é gravada no arquivo de
+        log e enfileirada para a thread da interface, sem tocar no Tk.
+        """
         timestamp = datetime.now().strftime("%H:%M:%S")
         formatted_message = f"[{timestamp}] {message}{end}" if not message.startswith("[") else f"{message}{end}"
-        
-        self.status_textbox.insert("end", formatted_message)
-        self.status_textbox.see("end")
-        self.update_idletasks()
+        self.fila_log.put(formatted_message)
+        self.logger_arquivo.info(message.rstrip("\n"))
+
+    def _drenar_log(self):
+        """Insere de uma vez as mensagens enfileiradas e limita o tamanho do textbox"""
+        mensagens = []
+        while True:
+            try:
+                mensagens.append(self.fila_log.get_nowait())
+            except queue.Empty:
+                break
+        if mensagens:
+            self.status_textbox.insert("end", "".join(mensagens))
+            linhas = int(self.status_textbox.index("end-1c").split(".")[0])
+            if linhas > MAX_LINHAS_LOG:
+                self.status_textbox.delete("1.0", f"{linhas - MAX_LINHAS_LOG + 1}.0")
+            self.status_textbox.see("end")
+        self._atualizar_status_fila()
+        self.after(INTERVALO_LOG_MS, self._drenar_log)
+
+    def _atualizar_status_fila(self):
+        """Mostra a quantidade de execuções pendentes e há quanto tempo a mais antiga espera"""
+        pendentes, espera = self.fila_execucoes.situacao()
+        if pendentes:
+            texto = f"Fila: {pendentes} execução(ões) pendente(s), aguardando há {int(espera // 60)}min {int(espera % 60):02d}s"
+        else:
+            texto = "Fila vazia"
+        if self.fila_status_label.cget("text") != texto:
+            self.fila_status_label.configure(text=texto, text_color="orange" if pendentes else "gray")
 
     def update_button_states(self, is_running=False):
         """Atualiza o estado dos botões baseado no estado da automação"""
-        self.start_button.configure(state="disabled" if is_running else "normal")
+        # O botão de iniciar continua ativo durante a execução para enfileirar uma execução manual
+        self.start_button.configure(text="Enfileirar Execução" if is_running else "Iniciar Automação")
         self.stop_button.configure(state="normal" if is_running else "disabled")
         self.manage_button.configure(state="disabled" if is_running else "normal")
 
@@ -300,22 +436,29 @@ class App(ctk.CTk):
 
     def load_schedules_from_file(self):
         try:
-            if os.path.exists("agendamentos.json"):
-                with open("agendamentos.json", 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
+            return self.cache_agendamentos.carregar()
         except Exception as e:
             self.log(f"Erro ao carregar agendamentos: {e}")
             return []
 
+    def register_schedule_jobs(self, schedules):
+        """Registra as execuções agendadas e o pré-aquecimento dos navegadores antes de cada uma"""
+        tarefas = []
+        for time_str in schedules:
+            # O Agendador chama as tarefas na thread dele: o despacho é levado para a thread do Tk
+            tarefas.append((time_str, lambda: self.after(0, lambda: self.start_automation(origem="agendado"))))
+            if ANTECEDENCIA_PREAQUECIMENTO > 0:
+                horario = datetime.strptime(time_str, "%H:%M") - timedelta(seconds=ANTECEDENCIA_PREAQUECIMENTO)
+                tarefas.append((horario.strftime("%H:%M:%S"), self.start_prewarm))
+        self.agendador.definir_tarefas(tarefas)
+
     def update_schedules(self):
         schedules = self.load_schedules_from_file()
         
-        schedule.clear()
+        self.agendador.limpar()
         
         if schedules:
-            for time_str in schedules:
-                schedule.every().day.at(time_str).do(self.start_automation)
+            self.register_schedule_jobs(schedules)
             
             schedule_text = f"{len(schedules)} agendamento{'s' if len(schedules) > 1 else ''} ativo{'s' if len(schedules) > 1 else ''}: {', '.join(schedules)}"
             self.schedule_status_label.configure(text=schedule_text, text_color="lightgreen")
@@ -344,32 +487,59 @@ class App(ctk.CTk):
                 self.log("Nenhum agendamento configurado. Configure pelo menos um horário primeiro.")
                 return
                 
-            schedule.clear()
-            for time_str in schedules:
-                schedule.every().day.at(time_str).do(self.start_automation)
+            self.register_schedule_jobs(schedules)
             
             self.is_schedule_running = True
-            self.scheduler_thread = threading.Thread(target=self._scheduler_worker)
-            self.scheduler_thread.daemon = True
-            self.scheduler_thread.start()
+            self.agendador.iniciar()
             
             self.toggle_schedule_button.configure(text="Parar Agendador", fg_color="darkred", hover_color="red")
             self.log(f"Sistema de agendamento iniciado com {len(schedules)} horário(s).")
 
     def stop_scheduler(self):
         self.is_schedule_running = False
-        schedule.clear()
+        self.agendador.parar()
+        self.agendador.limpar()
         self.toggle_schedule_button.configure(text="Iniciar Agendador", fg_color=self.start_button.cget("fg_color"), hover_color=self.start_button.cget("hover_color"))
         self.log("Sistema de agendamento parado e agendamentos limpos.")
 
-    def start_automation(self):
-        """Inicia a execução da automação em uma thread separada"""
-        if self.automation_thread and self.automation_thread.is_alive():
-            self.log("A automação já está em execução.")
-            return
+    def start_automation(self, origem="manual"):
+        """
+        Enfileira uma execução da automação e a inicia se nenhuma estiver em andamento.
+        Gatilhos que chegam durante uma execução são combinados em uma única execução seguinte.
+
+        Args:
+            origem: "manual" ou "agendado" (identifica a execução no log)
+        """
+        nova = self.fila_execucoes.enfileirar(origem)
+        if self.em_execucao:
+            if nova:
+                self.log(f"A automação já está em execução. Execução {origem} adicionada à fila.")
+            elif origem == "manual":
+                self.log("A automação já está em execução. Gatilho manual combinado com a execução pendente, "
+                         "que passa a ser manual.")
+            else:
+                self.log(f"A automação já está em execução. Gatilho {origem} combinado com a execução pendente.")
+        self._despachar()
+
+    def _despachar(self):
+        """
+        Inicia a próxima execução da fila em uma thread separada, se não houver outra em andamento.
+        Deve ser chamado na thread da interface (atualiza os botões).
+        """
+        with self.despacho_lock:
+            if self.em_execucao:
+                return
+            execucao = self.fila_execucoes.retirar()
+            if execucao is None:
+                return
+            self.em_execucao = True
 
         self.log("="*50)
-        self.log("Iniciando a automação...")
+        if execucao["espera_s"] >= 1 or execucao["gatilhos"] > 1:
+            self.log(f"Iniciando a execução {execucao['origem']} após {execucao['espera_s']:.0f}s na fila "
+                     f"({execucao['gatilhos']} gatilho(s) combinado(s))...")
+        else:
+            self.log("Iniciando a automação...")
         self.update_button_states(is_running=True)
         
         self.stop_event = threading.Event()
@@ -377,16 +547,95 @@ class App(ctk.CTk):
         self.automation_thread.daemon = True
         self.automation_thread.start()
 
+    def start_prewarm(self):
+        """Abre e autentica os navegadores em segundo plano antes do próximo agendamento"""
+        if self.automation_thread and self.automation_thread.is_alive():
+            return
+        with self.preaquecimento_lock:
+            if (not self.preaquecimento_livre.is_set() or self.navegadores_preaquecidos is not None
+                    or self.navegadores_em_manutencao is not None):
+                return
+            self.preaquecimento_livre.clear()
+        self.log("Pré-aquecendo navegadores para o próximo agendamento...")
+        threading.Thread(target=self._prewarm_worker, daemon=True).start()
+
+    def take_prewarmed_browsers(self, stop_event=None, espera=ESPERA_PREAQUECIMENTO):
+        """
+        Entrega os navegadores pré-aquecidos (ou None) e deixa de mantê-los.
+        Se o pré-aquecimento ainda estiver fazendo login, ou uma manutenção estiver
+        em andamento, aguarda até espera segundos para assumir os navegadores em vez
+        de a execução abrir outro para a mesma conta. Esgotada a espera, devolve None
+        e o worker do pré-aquecimento encerra os navegadores quando terminar.
+        """
+        if not self.preaquecimento_livre.is_set() and espera > 0:
+            self.log("Aguardando o pré-aquecimento dos navegadores em andamento...")
+            limite = time.monotonic() + espera
+            while not self.preaquecimento_livre.wait(0.5):
+                if (stop_event and stop_event.is_set()) or time.monotonic() >= limite:
+                    self.log("O pré-aquecimento não terminou a tempo. A execução abrirá os próprios navegadores.")
+                    break
+        with self.preaquecimento_lock:
+            navegadores = self.navegadores_preaquecidos
+            self.navegadores_preaquecidos = None
+            self.navegadores_em_manutencao = None
+        return navegadores
+
+    def _prewarm_worker(self):
+        try:
+            navegadores = preaquecer_navegadores()
+        except Exception as e:
+            self.log(f"Erro ao pré-aquecer navegadores: {e}")
+            self.preaquecimento_livre.set()
+            return
+        with self.preaquecimento_lock:
+            self.navegadores_preaquecidos = navegadores
+            self.preaquecimento_livre.set()
+
+        # Mantém as sessões vivas até a execução assumir os navegadores ou o prazo esgotar
+        limite = time.monotonic() + ANTECEDENCIA_PREAQUECIMENTO + 10 * INTERVALO_MANUTENCAO
+        while time.monotonic() < limite:
+            time.sleep(INTERVALO_MANUTENCAO)
+            # Os navegadores saem da área compartilhada durante a manutenção, que pode
+            # refazer o login: a execução não espera por ela nem usa um driver ocupado
+            with self.preaquecimento_lock:
+                if self.navegadores_preaquecidos is not navegadores:
+                    return
+                self.navegadores_preaquecidos = None
+                self.navegadores_em_manutencao = navegadores
+                self.preaquecimento_livre.clear()
+            try:
+                manter_navegadores(navegadores)
+            finally:
+                with self.preaquecimento_lock:
+                    devolver = self.navegadores_em_manutencao is navegadores
+                    self.navegadores_em_manutencao = None
+                    if devolver:
+                        self.navegadores_preaquecidos = navegadores
+                    self.preaquecimento_livre.set()
+            if not devolver:
+                self.log("A execução começou durante a manutenção dos navegadores pré-aquecidos. Encerrando-os.")
+                encerrar_navegadores(navegadores)
+                return
+        with self.preaquecimento_lock:
+            if self.navegadores_preaquecidos is not navegadores:
+                return
+            self.navegadores_preaquecidos = None
+        self.log("Nenhuma execução usou os navegadores pré-aquecidos. Encerrando-os.")
+        encerrar_navegadores(navegadores)
+
     def stop_automation(self):
         """Envia sinal para parar a automação de forma segura"""
         if self.stop_event:
             self.log("Sinal de parada enviado. Aguardando finalização da tarefa atual...")
             self.stop_event.set()
+            descartadas = self.fila_execucoes.limpar()
+            if descartadas:
+                self.log(f"{descartadas} execução(ões) pendente(s) descartada(s) pela parada.")
             self.stop_button.configure(state="disabled")
 
     def _automation_worker(self):
         try:
-            automacao_main(self.stop_event)
+            automacao_main(self.stop_event, navegadores=self.take_prewarmed_browsers(self.stop_event))
             if self.stop_event.is_set():
                 self.log("Automação interrompida com sucesso.")
             else:
@@ -395,19 +644,17 @@ class App(ctk.CTk):
             self.log(f"ERRO CRÍTICO NA AUTOMAÇÃO:\n{e}")
         finally:
             self.log("="*50)
-            self.update_button_states(is_running=False)
-            if self.is_schedule_running:
-                self.log("Aguardando próximo agendamento...")
-
-    def _scheduler_worker(self):
-        while self.is_schedule_running:
-            try:
-                schedule.run_pending()
-                time.sleep(1)
-            except Exception as e:
-                self.log(f"Erro no agendador: {e}")
-                time.sleep(1)
-        self.log("Thread do agendador finalizada.")
+            # Esta thread não toca no Tk: os botões e o próximo despacho ficam com a thread da interface
+            self.after(0, self._finalizar_execucao)
+
+    def _finalizar_execucao(self):
+        """Executado na thread da interface ao fim de cada execução: libera os botões e despacha a próxima"""
+        self.update_button_states(is_running=False)
+        with self.despacho_lock:
+            self.em_execucao = False
+        self._despachar()
+        if not self.em_execucao and self.is_schedule_running:
+            self.log("Aguardando próximo agendamento...")
 
     def graceful_shutdown(self):
         self.log("Encerrando a aplicação...")
@@ -415,6 +662,9 @@ class App(ctk.CTk):
             self.stop_scheduler()
         if self.automation_thread and self.automation_thread.is_alive():
             self.stop_automation()
+        navegadores = self.take_prewarmed_browsers(espera=0)
+        if navegadores:
+            encerrar_navegadores(navegadores)
         self.destroy()
 
 if __name__ == "__main__":
@@ -434,10 +684,16 @@ if __name__ == "__main__":
         """Encerra a aplicação de forma segura"""
         if icon:
             icon.stop()
-        app.graceful_shutdown()
+        # Chamado na thread da bandeja: o encerramento mexe nos widgets e roda na thread do Tk
+        app.after(0, app.graceful_shutdown)
 
     def setup_tray():
         global icon
+        # Importados na thread da bandeja para não atrasar a abertura do painel
+        import pystray
+        from pystray import MenuItem as item
+        from PIL import Image
+
         try:
             image = Image.open("icon.png")
         except FileNotFoundError:
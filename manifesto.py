@@ -0,0 +1,179 @@
+"""
+Manifesto de extrações incrementais do relatório 455.
+Registra, para cada período, quando foi extraído, o hash e a quantidade de
+linhas do arquivo e se o período já é considerado final. Meses fechados só
+são extraídos novamente até a política de reextração considerá-los finais.
+
+Política para meses fechados (anteriores ao mês atual):
+- o período vira final quando dois downloads seguidos têm o mesmo conteúdo, ou
+- quando atinge MAX_REEXTRACOES_FECHADO downloads após o fechamento do mês.
+"""
+
+from datetime import datetime
+import hashlib
+import json
+import os
+import threading
+
+# Quantidade máxima de downloads de um mês depois que ele fechou
+MAX_REEXTRACOES_FECHADO = int(os.getenv("AUTO455_MAX_REEXTRACOES", "3"))
+
+# Extensões lidas como texto na contagem de linhas
+EXTENSOES_TEXTO = (".csv", ".txt", ".sswweb")
+
+
+def hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    """Calcula o SHA-256 do arquivo lendo em blocos"""
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def substituir_se_alterado(origem, destino):
+    """
+    Move o arquivo para o destino apenas se o conteúdo for diferente do que já está lá.
+    Com conteúdo idêntico a origem é descartada e o destino fica intocado (sem nova data
+    de modificação), para que o Drive não reenvie o arquivo.
+
+    Returns:
+        bool: True se o destino foi substituído
+    """
+    if (os.path.exists(destino) and os.path.getsize(destino) == os.path.getsize(origem)
+            and hash_arquivo(destino) == hash_arquivo(origem)):
+        os.remove(origem)
+        return False
+    # os.replace substitui a versão anterior em uma única operação
+    os.replace(origem, destino)
+    return True
+
+
+def contar_linhas(caminho):
+    """
+    Conta as linhas de dados do relatório (sem o cabeçalho) sem carregar o arquivo:
+    texto linha a linha, planilhas pela dimensão da aba e Parquet pelos metadados
+
+    Returns:
+        int: Quantidade de linhas, ou None se o formato não puder ser lido
+    """
+    try:
+        extensao = os.path.splitext(caminho)[1].lower()
+        if extensao in EXTENSOES_TEXTO:
+            with open(caminho, "rb") as arquivo:
+                linhas = sum(1 for linha in arquivo if linha.strip())
+        elif extensao == ".parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(caminho).metadata.num_rows
+        elif extensao == ".xls":
+            import xlrd
+            livro = xlrd.open_workbook(caminho, on_demand=True)
+            try:
+                linhas = livro.sheet_by_index(0).nrows
+            finally:
+                livro.release_resources()
+        else:
+            from openpyxl import load_workbook
+            livro = load_workbook(caminho, read_only=True)
+            try:
+                planilha = livro.worksheets[0]
+                linhas = planilha.max_row
+                if linhas is None:
+                    # Arquivo sem a dimensão gravada: conta percorrendo as linhas em modo leitura
+                    linhas = sum(1 for _ in planilha.iter_rows(values_only=True))
+            finally:
+                livro.close()
+        return max(linhas - 1, 0)
+    except Exception as e:
+        print(f"Não foi possível contar as linhas de '{os.path.basename(caminho)}': {e}")
+        return None
+
+
+def periodo_fechado(periodo, hoje):
+    """Indica se o mês do período já terminou em relação à data de referência"""
+    return (periodo["ano"], periodo["mes"]) < (hoje.year, hoje.month)
+
+
+class Manifesto:
+    """
+    Manifesto persistido em JSON com o histórico de extração de cada período.
+    Seguro para uso pelos jobs do modo paralelo.
+
+    Args:
+        caminho: Arquivo JSON do manifesto
+        max_reextracoes: Limite de downloads de um mês fechado
+    """
+
+    def __init__(self, caminho, max_reextracoes=MAX_REEXTRACOES_FECHADO):
+        self.caminho = caminho
+        self.max_reextracoes = max_reextracoes
+        self._trava = threading.Lock()
+        self.periodos = {}
+        try:
+            if os.path.exists(caminho):
+                with open(caminho, "r", encoding="utf-8") as f:
+                    self.periodos = json.load(f)
+        except Exception as e:
+            print(f"Erro ao carregar o manifesto, iniciando um novo: {e}")
+
+    def deve_extrair(self, periodo, hoje):
+        """
+        Decide se o período precisa ser extraído nesta execução
+
+        Returns:
+            bool: False apenas para meses fechados marcados como finais
+        """
+        registro = self.periodos.get(periodo["nome_arquivo"])
+        return not (registro and registro.get("final") and periodo_fechado(periodo, hoje))
+
+    def conteudo_inalterado(self, periodo, arquivo, sha256):
+        """
+        Indica se o arquivo tem o mesmo nome e o mesmo conteúdo do último registrado para o período
+
+        Args:
+            periodo: Dicionário gerado por auto_455.calcular_periodos
+            arquivo: Caminho do arquivo recém-baixado
+            sha256: Hash do arquivo (hash_arquivo)
+        """
+        with self._trava:
+            registro = self.periodos.get(periodo["nome_arquivo"])
+        return bool(registro) and (registro.get("arquivo"), registro.get("sha256")) == (
+            os.path.basename(arquivo), sha256)
+
+    def registrar(self, periodo, arquivo, hoje, sha256=None):
+        """
+        Registra o download de um período e aplica a política de reextração
+
+        Args:
+            periodo: Dicionário gerado por auto_455.calcular_periodos
+            arquivo: Caminho do arquivo final do mês
+            hoje: Data de referência da execução
+            sha256: Hash já calculado do arquivo (opcional)
+        """
+        sha256 = sha256 or hash_arquivo(arquivo)
+        linhas = contar_linhas(arquivo)
+        with self._trava:
+            anterior = self.periodos.get(periodo["nome_arquivo"], {})
+            fechado = periodo_fechado(periodo, hoje)
+            downloads_fechado = anterior.get("downloads_apos_fechamento", 0) + (1 if fechado else 0)
+            repetido = anterior.get("sha256") == sha256
+            final = fechado and (repetido or downloads_fechado >= self.max_reextracoes)
+            self.periodos[periodo["nome_arquivo"]] = {
+                "data_inicio": periodo["data_inicio"],
+                "data_fim": periodo["data_fim"],
+                "arquivo": os.path.basename(arquivo),
+                "extraido_em": datetime.now().isoformat(timespec="seconds"),
+                "sha256": sha256,
+                "linhas": linhas,
+                "downloads_apos_fechamento": downloads_fechado,
+                "final": final,
+            }
+            self._salvar()
+        if final:
+            print(f"Período {periodo['nome_arquivo']} marcado como final no manifesto.")
+
+    def _salvar(self):
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.periodos, f, indent=2, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
@@ -0,0 +1,224 @@
+"""
+Instrumentação das etapas da extração 455.
+Mede o tempo de cada etapa (login, formulário, captura do seq, geração do
+relatório, download, renomeação, pós-processamento) com marcações de período
+e tentativa, e grava as medições em dois formatos:
+- metricas_455.jsonl: uma linha JSON por medição, acumulada entre execuções
+- metricas_455.prom: texto no formato do Prometheus (textfile collector) com a última execução
+
+Uso:
+    coleta = iniciar_coleta()
+    with medir("login"):
+        ...
+    print(finalizar_coleta())
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import os
+import threading
+import time
+
+# Pasta onde os arquivos de métricas são gravados
+PASTA_METRICAS = os.getenv("AUTO455_PASTA_METRICAS", "metricas")
+
+# Ordem das etapas no resumo
+ORDEM_ETAPAS = ("navegador", "login", "formulario", "capturar_seq", "geracao", "download",
+                "renomear", "juntar_fatias", "pos_processamento", "publicacao", "sem_alteracao",
+                "recursos_navegador")
+
+_coleta_ativa = None
+_ultima_coleta = None
+
+
+class ColetorMetricas:
+    """
+    Acumula as medições de uma execução e as grava em disco.
+    Seguro para uso pelas threads do modo paralelo.
+
+    Args:
+        pasta: Pasta dos arquivos de métricas
+        execucao: Identificador da execução (padrão: data e hora de início)
+    """
+
+    def __init__(self, pasta=PASTA_METRICAS, execucao=None):
+        self.pasta = pasta
+        self.execucao = execucao or datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.inicio = time.perf_counter()
+        self.fim = None
+        self.medicoes = []
+        self._trava = threading.Lock()
+        os.makedirs(pasta, exist_ok=True)
+
+    def registrar(self, etapa, duracao, status="ok", **marcacoes):
+        """Registra uma medição e a acrescenta ao arquivo JSON lines"""
+        medicao = {
+            "execucao": self.execucao,
+            "momento": datetime.now().isoformat(timespec="milliseconds"),
+            "etapa": etapa,
+            "duracao_s": round(duracao, 3),
+            "status": status,
+        }
+        medicao.update({chave: valor for chave, valor in marcacoes.items() if valor is not None})
+        with self._trava:
+            self.medicoes.append(medicao)
+            with open(os.path.join(self.pasta, "metricas_455.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(medicao, ensure_ascii=False) + "\n")
+
+    def duracao_total(self):
+        """Duração da execução em segundos (até agora, se ainda não foi finalizada)"""
+        return (self.fim or time.perf_counter()) - self.inicio
+
+    def por_etapa(self):
+        """Medições agrupadas por etapa, na ordem de ORDEM_ETAPAS"""
+        etapas = {}
+        for medicao in self.medicoes:
+            etapas.setdefault(medicao["etapa"], []).append(medicao)
+        ordem = {etapa: indice for indice, etapa in enumerate(ORDEM_ETAPAS)}
+        return dict(sorted(etapas.items(), key=lambda item: ordem.get(item[0], len(ordem))))
+
+    def exportar_prometheus(self):
+        """Grava a última execução no formato texto do Prometheus"""
+        linhas = [
+            "# HELP auto455_etapa_duracao_segundos Duração de cada etapa da última execução.",
+            "# TYPE auto455_etapa_duracao_segundos gauge",
+        ]
+        for medicao in self.medicoes:
+            rotulos = ",".join(
+                f'{chave}="{medicao[chave]}"'
+                for chave in ("etapa", "periodo", "tentativa", "status")
+                if chave in medicao
+            )
+            linhas.append(f"auto455_etapa_duracao_segundos{{{rotulos}}} {medicao['duracao_s']}")
+        linhas += [
+            "# HELP auto455_execucao_duracao_segundos Duração total da última execução.",
+            "# TYPE auto455_execucao_duracao_segundos gauge",
+            f"auto455_execucao_duracao_segundos {self.duracao_total():.3f}",
+            "# HELP auto455_execucao_timestamp_segundos Momento do fim da última execução.",
+            "# TYPE auto455_execucao_timestamp_segundos gauge",
+            f"auto455_execucao_timestamp_segundos {time.time():.0f}",
+        ]
+        recursos = [medicao for medicao in self.medicoes if medicao["etapa"] == "recursos_navegador"]
+        if recursos:
+            linhas += [
+                "# HELP auto455_navegador_pico_memoria_bytes Pico de memória (RSS) de cada navegador da última execução.",
+                "# TYPE auto455_navegador_pico_memoria_bytes gauge",
+            ]
+            linhas += [f'auto455_navegador_pico_memoria_bytes{{navegador="{indice}"}} '
+                       f'{medicao["pico_rss_mb"] * 1024 * 1024:.0f}'
+                       for indice, medicao in enumerate(recursos, start=1)]
+            linhas += [
+                "# HELP auto455_navegador_pico_cpu_percentual Pico de CPU de cada navegador da última execução.",
+                "# TYPE auto455_navegador_pico_cpu_percentual gauge",
+            ]
+            linhas += [f'auto455_navegador_pico_cpu_percentual{{navegador="{indice}"}} {medicao["pico_cpu_pct"]}'
+                       for indice, medicao in enumerate(recursos, start=1)]
+            linhas += [
+                "# HELP auto455_navegador_orfaos Processos do navegador finalizados após o quit na última execução.",
+                "# TYPE auto455_navegador_orfaos gauge",
+                f"auto455_navegador_orfaos {sum(medicao['orfaos'] for medicao in recursos)}",
+            ]
+        caminho = os.path.join(self.pasta, "metricas_455.prom")
+        with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+            f.write("\n".join(linhas) + "\n")
+        os.replace(caminho + ".tmp", caminho)
+
+    def resumo(self):
+        """Texto com a contagem, o tempo total e o máximo de cada etapa"""
+        linhas = [f"Resumo da execução {self.execucao} ({self.duracao_total():.1f}s no total):"]
+        for etapa, medicoes in self.por_etapa().items():
+            duracoes = [m["duracao_s"] for m in medicoes]
+            falhas = sum(1 for m in medicoes if m["status"] != "ok")
+            linhas.append(
+                f"  {etapa:<18} {len(duracoes):>2}x  total {sum(duracoes):7.1f}s  "
+                f"máx {max(duracoes):6.1f}s" + (f"  falhas {falhas}" if falhas else "")
+            )
+            if etapa == "recursos_navegador":
+                linhas.append(
+                    f"  {'':<18} pico {max(m['pico_rss_mb'] for m in medicoes):.0f} MB  "
+                    f"CPU {max(m['pico_cpu_pct'] for m in medicoes):.0f}%  "
+                    f"órfãos {sum(m['orfaos'] for m in medicoes)}"
+                )
+        return "\n".join(linhas)
+
+
+def iniciar_coleta(pasta=None):
+    """Inicia a coleta de métricas de uma execução e a torna a coleta ativa"""
+    global _coleta_ativa
+    _coleta_ativa = ColetorMetricas(pasta or PASTA_METRICAS)
+    return _coleta_ativa
+
+
+def finalizar_coleta():
+    """
+    Encerra a coleta ativa e grava o arquivo do Prometheus
+
+    Returns:
+        str: Resumo por etapa da execução, ou None se não havia coleta ativa
+    """
+    global _coleta_ativa, _ultima_coleta
+    coleta, _coleta_ativa = _coleta_ativa, None
+    if coleta is None:
+        return None
+    coleta.fim = time.perf_counter()
+    _ultima_coleta = coleta
+    try:
+        coleta.exportar_prometheus()
+    except OSError as e:
+        print(f"Não foi possível gravar as métricas do Prometheus: {e}")
+    return coleta.resumo()
+
+
+def ultima_coleta():
+    """Retorna o ColetorMetricas da última execução finalizada (ou None)"""
+    return _ultima_coleta
+
+
+def ultima_duracao(etapa, **marcacoes):
+    """
+    Duração da última medição da etapa com as marcações informadas na coleta ativa
+
+    Returns:
+        float: Duração em segundos, ou None se não houver medição correspondente
+    """
+    coleta = _coleta_ativa
+    if coleta is None:
+        return None
+    with coleta._trava:
+        for medicao in reversed(coleta.medicoes):
+            if medicao["etapa"] == etapa and all(medicao.get(c) == v for c, v in marcacoes.items()):
+                return medicao["duracao_s"]
+    return None
+
+
+def registrar(etapa, duracao, status="ok", **marcacoes):
+    """Registra uma medição já calculada na coleta ativa (sem efeito se não houver coleta)"""
+    coleta = _coleta_ativa
+    if coleta is not None:
+        coleta.registrar(etapa, duracao, status, **marcacoes)
+
+
+@contextmanager
+def medir(etapa, **marcacoes):
+    """
+    Mede a duração do bloco e a registra na coleta ativa.
+    O bloco recebe um dicionário cujo "status" pode ser alterado para marcar
+    uma falha que não gerou exceção (ex.: download que não terminou).
+
+    Args:
+        etapa: Nome da etapa
+        **marcacoes: Marcações da medição (ex.: periodo, tentativa)
+    """
+    inicio = time.perf_counter()
+    medicao = {"status": "ok"}
+    try:
+        yield medicao
+    except InterruptedError:
+        medicao["status"] = "interrompido"
+        raise
+    except BaseException:
+        medicao["status"] = "erro"
+        raise
+    finally:
+        registrar(etapa, time.perf_counter() - inicio, medicao["status"], **marcacoes)
@@ -0,0 +1,123 @@
+"""
+Perfis de extração da automação 455 (várias contas, CNPJs ou filiais).
+Cada perfil tem suas próprias credenciais do SSW, pasta de saída e meses
+retroativos, além de manifesto, checkpoints e histórico de fatias próprios,
+gravados ao lado da pasta de saída. Os perfis são lidos de perfis.json:
+
+    [
+        {"nome": "matriz", "credenciais": "credenciais.env", "pasta": "D:\\DB_455\\matriz", "meses": 3},
+        {"nome": "filial_sp", "credenciais": "credenciais_sp.env", "pasta": "D:\\DB_455\\filial_sp"}
+    ]
+
+O arquivo de credenciais de cada perfil tem o formato do credenciais.env
+(SSW_EMPRESA, SSW_CNPJ, SSW_USUARIO e SSW_SENHA) e é lido sem alterar as
+variáveis de ambiente do processo, para que os perfis possam rodar ao mesmo tempo.
+"""
+
+import json
+import os
+
+ARQUIVO_PERFIS = "perfis.json"
+
+# Variáveis do arquivo de credenciais e o campo da tela de login (ssw0422) de cada uma
+CAMPOS_CREDENCIAIS = {"SSW_EMPRESA": "f1", "SSW_CNPJ": "f2", "SSW_USUARIO": "f3", "SSW_SENHA": "f4"}
+
+
+def credenciais_do_arquivo(caminho):
+    """
+    Lê um arquivo no formato do credenciais.env
+
+    Returns:
+        dict: Valores dos campos f1 a f4 da tela de login
+
+    Raises:
+        ValueError: Se o arquivo não existir ou faltar alguma das variáveis
+    """
+    from dotenv import dotenv_values
+
+    if not os.path.exists(caminho):
+        raise ValueError(f"arquivo de credenciais '{caminho}' não encontrado")
+    valores = dotenv_values(caminho)
+    faltantes = [variavel for variavel in CAMPOS_CREDENCIAIS if not valores.get(variavel)]
+    if faltantes:
+        raise ValueError(f"'{caminho}' não define {', '.join(faltantes)}")
+    return {campo: valores[variavel] for variavel, campo in CAMPOS_CREDENCIAIS.items()}
+
+
+def criar_perfil(nome, credenciais, pasta, meses=None):
+    """
+    Monta um perfil com os caminhos dos arquivos de controle derivados da pasta de saída
+
+    Args:
+        nome: Identificação do perfil (usada nos nomes dos arquivos de controle)
+        credenciais: Dicionário com os campos f1 a f4 da tela de login
+        pasta: Pasta de saída dos relatórios do perfil
+        meses: Meses retroativos extraídos (None = padrão da automação)
+
+    Returns:
+        dict: Perfil aceito por auto_455.main e auto_455.executar_perfis
+    """
+    base = os.path.dirname(pasta.rstrip("\\/"))
+    return {
+        "nome": nome,
+        "credenciais": credenciais,
+        "pasta": pasta,
+        "meses": meses,
+        "manifesto": os.path.join(base, f"manifesto_455_{nome}.json"),
+        "checkpoints": os.path.join(base, f"checkpoints_455_{nome}.json"),
+        "historico_fatias": os.path.join(base, f"historico_fatias_455_{nome}.json"),
+        "consolidado": os.path.join(pasta, "consolidado"),
+    }
+
+
+def carregar_perfis(caminho=ARQUIVO_PERFIS, nomes=None):
+    """
+    Lê e valida o arquivo de perfis. Caminhos relativos de credenciais são
+    resolvidos a partir da pasta do próprio arquivo de perfis.
+
+    Args:
+        caminho: Arquivo JSON com a lista de perfis
+        nomes: Restringe aos perfis com estes nomes (None = todos)
+
+    Returns:
+        list: Perfis montados por criar_perfil, na ordem do arquivo
+
+    Raises:
+        ValueError: Se o arquivo for inválido ou algum perfil pedido não existir
+    """
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            entradas = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"não foi possível ler os perfis de '{caminho}': {e}")
+    if not isinstance(entradas, list) or not entradas:
+        raise ValueError(f"'{caminho}' deve conter uma lista não vazia de perfis")
+
+    pasta_perfis = os.path.dirname(os.path.abspath(caminho))
+    perfis = []
+    for indice, entrada in enumerate(entradas, start=1):
+        faltantes = [campo for campo in ("nome", "credenciais", "pasta") if not entrada.get(campo)]
+        if faltantes:
+            raise ValueError(f"perfil {indice} de '{caminho}' sem {', '.join(faltantes)}")
+        meses = entrada.get("meses")
+        if meses is not None and (not isinstance(meses, int) or meses < 1):
+            raise ValueError(f"perfil '{entrada['nome']}': 'meses' deve ser um inteiro maior que zero")
+        arquivo_credenciais = os.path.join(pasta_perfis, entrada["credenciais"])
+        try:
+            credenciais = credenciais_do_arquivo(arquivo_credenciais)
+        except ValueError as e:
+            raise ValueError(f"perfil '{entrada['nome']}': {e}")
+        perfis.append(criar_perfil(entrada["nome"], credenciais, entrada["pasta"], meses))
+
+    for chave, descricao in (("nome", "o mesmo nome"), ("pasta", "a mesma pasta de saída")):
+        valores = [os.path.normcase(os.path.abspath(p[chave])) if chave == "pasta" else p[chave] for p in perfis]
+        repetidos = sorted({v for v in valores if valores.count(v) > 1})
+        if repetidos:
+            raise ValueError(f"perfis com {descricao} em '{caminho}': {', '.join(repetidos)}")
+
+    if nomes:
+        desconhecidos = [nome for nome in nomes if nome not in {p["nome"] for p in perfis}]
+        if desconhecidos:
+            raise ValueError(f"perfil(s) não encontrado(s) em '{caminho}': {', '.join(desconhecidos)}")
+        perfis = [p for p in perfis if p["nome"] in nomes]
+    return perfis
@@ -0,0 +1,111 @@
+"""
+Publicação assíncrona dos relatórios preparados em disco local.
+Os downloads, renomeações, junções de fatias e conversões acontecem em uma
+pasta local; uma thread publicadora copia cada arquivo pronto para a pasta
+compartilhada (sincronizada pelo Google Drive) com um nome temporário e o
+troca pelo nome final em uma única operação, repetindo a cópia em caso de
+falha. A extração segue para o próximo período sem esperar pela rede, e o
+cliente de sincronização nunca enxerga um arquivo pela metade.
+"""
+
+import os
+import queue
+import shutil
+import threading
+
+from checkpoint import repetir_etapa
+from metricas import medir
+
+# Tentativas de publicação de cada arquivo (a espera entre elas dobra a cada falha)
+TENTATIVAS_PUBLICACAO = int(os.getenv("AUTO455_TENTATIVAS_PUBLICACAO", "5"))
+
+
+def _mesmo_caminho(a, b):
+    return os.path.normcase(os.path.abspath(a)) == os.path.normcase(os.path.abspath(b))
+
+
+def publicar_arquivo(origem, pasta_destino):
+    """
+    Copia o arquivo para a pasta de destino sob um nome temporário e o troca pelo nome final
+
+    Returns:
+        str: Caminho do arquivo publicado
+    """
+    destino = os.path.join(pasta_destino, os.path.basename(origem))
+    if _mesmo_caminho(origem, destino):
+        return destino  # Já está publicado (ex.: checkpoint gravado antes da preparação local)
+    temporario = destino + ".tmp"
+    os.makedirs(pasta_destino, exist_ok=True)
+    shutil.copyfile(origem, temporario)
+    # os.replace substitui a versão anterior do arquivo em uma única operação
+    os.replace(temporario, destino)
+    return destino
+
+
+class Publicador:
+    """
+    Thread que publica, em ordem de chegada, os arquivos preparados localmente.
+
+    Args:
+        pasta_destino: Pasta compartilhada onde os arquivos são publicados
+        stop_event: Evento para controle de parada (interrompe as esperas entre tentativas)
+    """
+
+    def __init__(self, pasta_destino, stop_event=None):
+        self.pasta_destino = pasta_destino
+        self.stop_event = stop_event
+        self.falhas = []
+        self._fila = queue.Queue()
+        self._thread = threading.Thread(target=self._trabalhar, name="publicador", daemon=True)
+        self._thread.start()
+
+    def publicar(self, arquivos, ao_publicar=None, descricao=None):
+        """
+        Agenda a publicação de um grupo de arquivos e retorna imediatamente
+
+        Args:
+            arquivos: Caminhos locais dos arquivos do grupo
+            ao_publicar: Função chamada com a lista dos caminhos publicados, antes
+                de os arquivos locais serem removidos
+            descricao: Identificação do grupo no log e nas métricas (ex.: nome do período)
+        """
+        self._fila.put((list(arquivos), ao_publicar, descricao))
+
+    def encerrar(self):
+        """Aguarda a publicação de tudo o que foi agendado e encerra a thread"""
+        self._fila.put(None)
+        self._thread.join()
+
+    def _trabalhar(self):
+        while True:
+            item = self._fila.get()
+            if item is None:
+                return
+            arquivos, ao_publicar, descricao = item
+            try:
+                self._publicar_grupo(arquivos, ao_publicar, descricao)
+            except InterruptedError:
+                # Os arquivos continuam na pasta local e o checkpoint do período é retomado na próxima execução
+                print(f"Publicação de {descricao} interrompida. Os arquivos ficam na pasta local.")
+                self.falhas.append(descricao)
+            except Exception as e:
+                print(f"Erro ao publicar {descricao} na pasta compartilhada: {e}")
+                self.falhas.append(descricao)
+
+    def _publicar_grupo(self, arquivos, ao_publicar, descricao):
+        with medir("publicacao", periodo=descricao):
+            publicados = [
+                repetir_etapa(lambda: publicar_arquivo(arquivo, self.pasta_destino), "publicacao",
+                              self.stop_event, tentativas=TENTATIVAS_PUBLICACAO)
+                for arquivo in arquivos
+            ]
+            print(f"Publicado(s) na pasta compartilhada: {', '.join(os.path.basename(p) for p in publicados)}")
+            if ao_publicar:
+                ao_publicar(publicados)
+        for arquivo, publicado in zip(arquivos, publicados):
+            if _mesmo_caminho(arquivo, publicado):
+                continue
+            try:
+                os.remove(arquivo)
+            except OSError as e:
+                print(f"Não foi possível remover o arquivo local '{arquivo}': {e}")
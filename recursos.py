@@ -0,0 +1,149 @@
+"""
+Monitoramento de recursos dos navegadores da automação 455.
+Cada navegador aberto ganha uma thread que amostra a árvore de processos do
+msedgedriver (o driver, o Edge e os processos filhos do Edge) e guarda os
+picos de memória (RSS) e de CPU. Ao encerrar o navegador, os processos da
+árvore que sobreviverem ao driver.quit() são finalizados e contados como
+órfãos, e os picos entram nas métricas da execução (etapa "recursos_navegador").
+
+Requer o pacote psutil; sem ele o monitoramento fica desativado.
+"""
+
+import os
+import threading
+import time
+
+from metricas import registrar
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Liga o monitoramento (sem efeito se o psutil não estiver instalado)
+MONITORAR_RECURSOS = os.getenv("AUTO455_MONITOR_RECURSOS", "1") == "1"
+
+# Intervalo (s) entre as amostras da árvore de processos
+INTERVALO_AMOSTRAGEM = float(os.getenv("AUTO455_INTERVALO_RECURSOS", "2"))
+
+# Tempo (s) que os processos têm para terminar depois do quit antes de serem finalizados
+ESPERA_ENCERRAMENTO = 5
+
+_aviso_psutil = threading.Event()
+
+
+class MonitorRecursos:
+    """
+    Amostra a árvore de processos de um navegador até ele ser encerrado.
+
+    Args:
+        pid: Pid do msedgedriver (raiz da árvore)
+        intervalo: Segundos entre as amostras
+    """
+
+    def __init__(self, pid, intervalo=INTERVALO_AMOSTRAGEM):
+        self.raiz = psutil.Process(pid)
+        self.intervalo = intervalo
+        self.inicio = time.perf_counter()
+        self.pico_rss = 0
+        self.pico_cpu = 0.0
+        self.pico_processos = 0
+        # Os objetos Process são mantidos entre amostras: cpu_percent mede desde a chamada anterior
+        self._processos = {}
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._trabalhar, name="monitor_recursos", daemon=True)
+        self._thread.start()
+
+    def _arvore(self):
+        try:
+            return [self.raiz] + self.raiz.children(recursive=True)
+        except psutil.Error:
+            return []
+
+    def amostrar(self):
+        """Soma o RSS e a CPU da árvore de processos e atualiza os picos"""
+        rss = 0
+        cpu = 0.0
+        arvore = self._arvore()
+        for processo in arvore:
+            processo = self._processos.setdefault(processo.pid, processo)
+            try:
+                rss += processo.memory_info().rss
+                cpu += processo.cpu_percent(None)
+            except psutil.Error:
+                continue  # O processo terminou durante a amostra
+        self.pico_rss = max(self.pico_rss, rss)
+        self.pico_cpu = max(self.pico_cpu, cpu)
+        self.pico_processos = max(self.pico_processos, len(arvore))
+
+    def _trabalhar(self):
+        while not self._parar.wait(self.intervalo):
+            self.amostrar()
+
+    def encerrar(self, fechar):
+        """
+        Encerra o navegador, finaliza os processos que sobraram e registra os picos
+
+        Args:
+            fechar: Função que encerra o navegador (ex.: driver.quit)
+
+        Returns:
+            int: Quantidade de processos órfãos finalizados
+        """
+        self._parar.set()
+        self._thread.join()
+        self.amostrar()
+        arvore = self._arvore()
+        try:
+            fechar()
+        finally:
+            orfaos = _finalizar_sobreviventes(arvore)
+            registrar(
+                "recursos_navegador",
+                time.perf_counter() - self.inicio,
+                "orfaos" if orfaos else "ok",
+                pico_rss_mb=round(self.pico_rss / (1024 * 1024), 1),
+                pico_cpu_pct=round(self.pico_cpu, 1),
+                processos=self.pico_processos,
+                orfaos=len(orfaos),
+            )
+        return len(orfaos)
+
+
+def _finalizar_sobreviventes(processos):
+    """Aguarda os processos terminarem e finaliza os que continuarem vivos"""
+    _, vivos = psutil.wait_procs(processos, timeout=ESPERA_ENCERRAMENTO)
+    for processo in vivos:
+        try:
+            print(f"Processo órfão do navegador finalizado: {processo.name()} (pid {processo.pid}).")
+            processo.kill()
+        except psutil.Error:
+            pass
+    return vivos
+
+
+def monitorar(driver):
+    """
+    Inicia o monitoramento dos processos de um navegador recém-aberto
+
+    Args:
+        driver: Instância do WebDriver
+
+    Returns:
+        MonitorRecursos ou None: None se o monitoramento estiver desligado, sem
+        psutil ou se o processo do driver não for acessível
+    """
+    if not MONITORAR_RECURSOS:
+        return None
+    if psutil is None:
+        if not _aviso_psutil.is_set():
+            _aviso_psutil.set()
+            print("psutil não está instalado. Monitoramento de recursos do navegador desativado.")
+        return None
+    processo = getattr(getattr(driver, "service", None), "process", None)
+    if processo is None:
+        return None
+    try:
+        return MonitorRecursos(processo.pid)
+    except psutil.Error:
+        return None
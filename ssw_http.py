@@ -0,0 +1,446 @@
+"""
+Backend HTTP (sem navegador) para extração do relatório 455 do SSW.
+Executa as mesmas etapas do fluxo Selenium do auto_455 — login com os campos
+f1 a f4, envio do formulário da opção 455, leitura da tabela tblsr e download
+do arquivo — usando uma sessão HTTP com pool de conexões e cookies.
+
+As páginas são lidas com o html.parser da biblioteca padrão, sem depender de
+um navegador, o que reduz o consumo de memória de centenas de MB para poucos
+MB por extração.
+
+EXPERIMENTAL: os campos do formulário (ids 11 e 12 e os campos fixos f21 a f39)
+são os mesmos que o fluxo Selenium preenche, mas o endereço da opção 455
+(CAMINHO_OPCAO_455), o campo da confirmação (CONFIRMACAO_455) e a página da
+tabela retornada pelo envio seguem o servidor simulado do ssw_mock: no SSW real
+a opção é aberta digitando 455 no menu e a confirmação é a tecla "1". O backend
+só é usado quando escolhido explicitamente (AUTO455_BACKEND=http ou
+--backend http) e deve ser validado no SSW real antes de substituir o Selenium.
+
+Requer:
+- requests
+"""
+
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+import re
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from checkpoint import repetir_etapa
+from dom import seq_do_periodo
+from esperas import pausa
+from manifesto import substituir_se_alterado
+from metricas import medir
+
+# Endereço do SSW e caminhos das páginas usadas pela automação.
+# CAMINHO_OPCAO_455 segue o ssw_mock; ajuste-o com SSW_CAMINHO_455 para o SSW real
+URL_SSW = os.getenv("SSW_URL", "https://sistema.ssw.inf.br")
+CAMINHO_LOGIN = "/bin/ssw0422"
+CAMINHO_OPCAO_455 = os.getenv("SSW_CAMINHO_455", "/bin/ssw0455")
+
+# Campos fixos do formulário 455 (os mesmos digitados pelo fluxo Selenium)
+CAMPOS_FIXOS_455 = {"f21": "t", "f35": "e", "f37": "b", "f38": "g", "f39": "h"}
+
+# Campo preenchido quando a tecla "1" confirma o botão 40 (modelado no ssw_mock)
+CONFIRMACAO_455 = {"f40": "1"}
+
+# Tempo máximo (s) de cada requisição HTTP
+TIMEOUT_HTTP = 60
+
+
+class _LeitorFormulario(HTMLParser):
+    """Coleta a action e os campos (input/select) do primeiro formulário da página"""
+
+    def __init__(self):
+        super().__init__()
+        self.action = None
+        self.campos = []
+        self._dentro_do_formulario = False
+        self._select = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form" and self.action is None:
+            self.action = attrs.get("action", "")
+            self._dentro_do_formulario = True
+        elif not self._dentro_do_formulario:
+            return
+        elif tag == "input" and attrs.get("name"):
+            if attrs.get("type", "").lower() in ("checkbox", "radio") and "checked" not in attrs:
+                return
+            self.campos.append({"id": attrs.get("id"), "name": attrs["name"], "value": attrs.get("value", "")})
+        elif tag == "select" and attrs.get("name"):
+            self._select = {"id": attrs.get("id"), "name": attrs["name"], "value": None}
+            self.campos.append(self._select)
+        elif tag == "option" and self._select is not None:
+            if self._select["value"] is None or "selected" in attrs:
+                self._select["value"] = attrs.get("value", "")
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self._dentro_do_formulario = False
+        elif tag == "select":
+            self._select = None
+
+
+class _LeitorTabela(HTMLParser):
+    """
+    Lê as linhas de uma tabela pelo id.
+    Cada linha vira {"celulas": [textos], "pronto": bool, "link": url ou None},
+    onde "pronto" indica a presença do <u> de download usado pelo fluxo Selenium.
+    """
+
+    _URL_EM_SCRIPT = re.compile(r"""['"]([^'"]*/[^'"]+)['"]""")
+
+    def __init__(self, id_tabela):
+        super().__init__()
+        self.id_tabela = id_tabela
+        self.linhas = []
+        self._profundidade = 0
+        self._linha = None
+        self._celula = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "table":
+            if self._profundidade or attrs.get("id") == self.id_tabela:
+                self._profundidade += 1
+            return
+        if not self._profundidade:
+            return
+        if tag == "tr" and self._profundidade == 1:
+            self._linha = {"celulas": [], "pronto": False, "link": None}
+        elif tag in ("td", "th") and self._profundidade == 1 and self._linha is not None:
+            self._celula = []
+        elif self._linha is not None:
+            if tag == "u":
+                self._linha["pronto"] = True
+            link = attrs.get("href") or self._url_em_script(attrs.get("onclick"))
+            if link and not link.startswith("javascript:") and self._linha["link"] is None:
+                self._linha["link"] = link
+
+    def handle_endtag(self, tag):
+        if tag == "table" and self._profundidade:
+            self._profundidade -= 1
+        elif self._profundidade != 1:
+            return
+        elif tag in ("td", "th") and self._celula is not None:
+            self._linha["celulas"].append(" ".join("".join(self._celula).split()))
+            self._celula = None
+        elif tag == "tr" and self._linha is not None:
+            self.linhas.append(self._linha)
+            self._linha = None
+
+    def handle_data(self, data):
+        if self._celula is not None:
+            self._celula.append(data)
+
+    def _url_em_script(self, script):
+        if not script:
+            return None
+        encontrado = self._URL_EM_SCRIPT.search(script)
+        return encontrado.group(1) if encontrado else None
+
+
+def ler_formulario(html):
+    """
+    Extrai a action e os campos do formulário de uma página
+
+    Returns:
+        tuple: (action, lista de dicionários {"id", "name", "value"})
+    """
+    leitor = _LeitorFormulario()
+    leitor.feed(html)
+    return leitor.action, leitor.campos
+
+
+def ler_tabela(html, id_tabela="tblsr"):
+    """
+    Extrai as linhas de dados (sem o cabeçalho) de uma tabela pelo id
+
+    Returns:
+        list: Linhas no formato {"celulas": [...], "pronto": bool, "link": str ou None}
+    """
+    leitor = _LeitorTabela(id_tabela)
+    leitor.feed(html)
+    return leitor.linhas[1:]
+
+
+def _eh_tela_de_login(html):
+    """A página de login (ssw0422) é a única com campo de senha"""
+    return re.search(r"""type\s*=\s*["']?password""", html, re.IGNORECASE) is not None
+
+
+class SessaoSSW:
+    """
+    Sessão HTTP autenticada no SSW.
+    Mantém os cookies do login e um pool de conexões reaproveitado entre as
+    requisições de todos os meses da execução. Não guarda estado por
+    requisição, então uma mesma sessão pode atender meses em paralelo.
+    """
+
+    def __init__(self, url_base=None, credenciais=None, tamanho_pool=4):
+        self.url_base = (url_base or URL_SSW).rstrip("/") + "/"
+        self.credenciais = credenciais or {
+            "f1": os.getenv("SSW_EMPRESA"),
+            "f2": os.getenv("SSW_CNPJ"),
+            "f3": os.getenv("SSW_USUARIO"),
+            "f4": os.getenv("SSW_SENHA"),
+        }
+        # O seq é lido da tabela logo após o envio: os envios de uma mesma conta
+        # são serializados para o caso de o SSW não mostrar o período na tabela
+        self._trava_envio = threading.Lock()
+        # Um único novo login quando vários meses em paralelo percebem a expiração juntos
+        self._trava_login = threading.Lock()
+        self.http = requests.Session()
+        adaptador = HTTPAdapter(
+            pool_connections=tamanho_pool,
+            pool_maxsize=tamanho_pool,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                              allowed_methods=frozenset({"GET"})),
+        )
+        self.http.mount("http://", adaptador)
+        self.http.mount("https://", adaptador)
+
+    def _url(self, caminho):
+        return urljoin(self.url_base, caminho.lstrip("/"))
+
+    def _get(self, url, **kwargs):
+        resposta = self.http.get(url, timeout=TIMEOUT_HTTP, **kwargs)
+        resposta.raise_for_status()
+        return resposta
+
+    def _post(self, url, dados):
+        resposta = self.http.post(url, data=dados, timeout=TIMEOUT_HTTP)
+        resposta.raise_for_status()
+        return resposta
+
+    def login(self):
+        """Envia os campos f1 a f4 da página ssw0422 e guarda os cookies da sessão"""
+        url_login = self._url(CAMINHO_LOGIN)
+        action, campos = ler_formulario(self._get(url_login).text)
+        dados = {campo["name"]: campo["value"] for campo in campos}
+        dados.update(self.credenciais)
+        resposta = self._post(urljoin(url_login, action or ""), dados)
+        if _eh_tela_de_login(resposta.text):
+            raise PermissionError("Login no SSW recusado. Verifique o arquivo credenciais.env.")
+        print("Login HTTP no SSW realizado.")
+
+    def _get_autenticado(self, url):
+        """
+        GET de uma página que exige a sessão. Se o SSW devolver a tela de login
+        (sessão expirada), faz um novo login e repete a requisição uma vez.
+
+        Raises:
+            PermissionError: Se a página continuar na tela de login após o novo login
+        """
+        resposta = self._get(url)
+        if not _eh_tela_de_login(resposta.text):
+            return resposta
+        with self._trava_login:
+            # Outra thread pode ter refeito o login enquanto esta aguardava a trava
+            resposta = self._get(url)
+            if _eh_tela_de_login(resposta.text):
+                print("Sessão do SSW expirada. Realizando novo login.")
+                self.login()
+                resposta = self._get(url)
+        if _eh_tela_de_login(resposta.text):
+            raise PermissionError("O SSW continua na tela de login após um novo login. Sessão não restabelecida.")
+        return resposta
+
+    def _abrir_opcao_455(self):
+        return self._get_autenticado(self._url(CAMINHO_OPCAO_455))
+
+    def solicitar_relatorio(self, data_inicio, data_fim):
+        """
+        Envia o formulário da opção 455 para o período
+
+        Args:
+            data_inicio: Data inicial no formato DDMMYY
+            data_fim: Data final no formato DDMMYY
+
+        Returns:
+            tuple: (seq da requisição ou None, URL da tabela de requisições)
+        """
+        with self._trava_envio:
+            return self._enviar_formulario_455(data_inicio, data_fim)
+
+    def _enviar_formulario_455(self, data_inicio, data_fim):
+        resposta = self._abrir_opcao_455()
+        action, campos = ler_formulario(resposta.text)
+        dados = {}
+        for campo in campos:
+            if campo["id"] == "11":
+                dados[campo["name"]] = data_inicio
+            elif campo["id"] == "12":
+                dados[campo["name"]] = data_fim
+            else:
+                dados[campo["name"]] = campo["value"]
+        dados.update(CAMPOS_FIXOS_455)
+        dados.update(CONFIRMACAO_455)
+        resposta = self._post(urljoin(resposta.url, action or ""), dados)
+        seq = seq_do_periodo(ler_tabela(resposta.text), data_inicio, data_fim)
+        if not seq:
+            print("Não há linhas suficientes na tabela para capturar o seq.")
+            return None, resposta.url
+        print(f"Seq da requisição: {seq}")
+        return seq, resposta.url
+
+    def consultar_requisicoes(self, url_tabela):
+        """
+        Recarrega a tabela de requisições (equivalente ao botão de atualização).
+        A sessão expirada é renovada antes da leitura, para que a tela de login
+        não seja lida como uma tabela vazia.
+        """
+        return ler_tabela(self._get_autenticado(url_tabela).text)
+
+    def aguardar_relatorio(self, seq, url_tabela, stop_event, prazo, intervalos):
+        """
+        Consulta a tabela com intervalos crescentes até o relatório do seq ficar pronto
+
+        Args:
+            seq: Número de sequência da requisição
+            url_tabela: URL da tabela retornada por solicitar_relatorio
+            stop_event: Evento para controle de parada da automação
+            prazo: Tempo máximo em segundos
+            intervalos: Intervalos entre consultas (o último se repete)
+
+        Returns:
+            str: URL de download, ou None se o prazo esgotar
+
+        Raises:
+            InterruptedError: Se o sinal de parada for recebido durante a espera
+            PermissionError: Se a sessão expirar e o novo login for recusado
+        """
+        inicio = time.monotonic()
+        tentativa = 0
+        while True:
+            for linha in self.consultar_requisicoes(url_tabela):
+                if linha["celulas"] and linha["celulas"][0] == seq and linha["pronto"] and linha["link"]:
+                    print(f"Relatório pronto após {time.monotonic() - inicio:.0f}s.")
+                    return urljoin(url_tabela, linha["link"])
+            restante = prazo - (time.monotonic() - inicio)
+            if restante <= 0:
+                print(f"Relatório do seq {seq} não ficou pronto em {prazo}s.")
+                return None
+            pausa(min(intervalos[min(tentativa, len(intervalos) - 1)], restante), stop_event)
+            tentativa += 1
+
+    def baixar(self, url, pasta_destino, nome_base):
+        """
+        Baixa o arquivo em blocos e o grava como nome_base + extensão original
+
+        Returns:
+            str: Caminho do arquivo gravado
+        """
+        with self._get(url, stream=True) as resposta:
+            nome_original = re.findall(r'filename="?([^";]+)"?', resposta.headers.get("Content-Disposition", ""))
+            _, extensao = os.path.splitext(nome_original[0] if nome_original else url.split("?")[0])
+            destino = os.path.join(pasta_destino, nome_base + (extensao or ".csv"))
+            temporario = destino + ".part"
+            with open(temporario, "wb") as arquivo:
+                for bloco in resposta.iter_content(chunk_size=64 * 1024):
+                    arquivo.write(bloco)
+        if substituir_se_alterado(temporario, destino):
+            print(f"Arquivo salvo como '{os.path.basename(destino)}'.")
+        else:
+            print(f"Conteúdo idêntico ao de '{os.path.basename(destino)}'. O download foi descartado.")
+        return destino
+
+    def fechar(self):
+        self.http.close()
+
+
+def _retomar_requisicao(sessao, estado):
+    """
+    Confere se o seq gravado no checkpoint ainda aparece na tabela de requisições
+
+    Returns:
+        tuple: (seq, url_tabela) do checkpoint, ou (None, None) se não puder ser retomado
+    """
+    if not estado or not estado.get("seq"):
+        return None, None
+    try:
+        linhas = sessao.consultar_requisicoes(estado["url_tabela"])
+    except requests.RequestException:
+        linhas = []
+    if any(linha["celulas"] and linha["celulas"][0] == estado["seq"] for linha in linhas):
+        print(f"Retomando do checkpoint: acompanhando o seq {estado['seq']} já solicitado.")
+        return estado["seq"], estado["url_tabela"]
+    print(f"Seq {estado['seq']} do checkpoint não encontrado. Solicitando o relatório novamente.")
+    return None, None
+
+
+def extrair_periodo_http(sessao, periodo, pasta_destino, stop_event, prazo, intervalos, checkpoints=None):
+    """
+    Executa a extração de um mês pelo backend HTTP.
+    Com checkpoints, cada etapa concluída é gravada e um seq já solicitado por
+    uma execução interrompida volta a ser acompanhado.
+
+    Args:
+        sessao: SessaoSSW já autenticada
+        periodo: Dicionário gerado por auto_455.calcular_periodos
+        pasta_destino: Pasta final do arquivo do mês
+        stop_event: Evento para controle de parada da automação
+        prazo: Tempo máximo em segundos para o relatório ficar pronto
+        intervalos: Intervalos entre as consultas da tabela
+        checkpoints: Instância de checkpoint.Checkpoints (opcional)
+
+    Returns:
+        str: Caminho do arquivo gravado, ou None se não houve download
+    """
+    data_inicio_str = periodo["data_inicio"]
+    data_fim_str = periodo["data_fim"]
+    print(f"\n--- Iniciando extração HTTP para o período: {data_inicio_str} a {data_fim_str} ---")
+    marcacoes = {"periodo": periodo["nome_arquivo"], "backend": "http"}
+    arquivo = None
+
+    def avancar(etapa, **dados):
+        if checkpoints:
+            checkpoints.avancar(periodo, etapa, **dados)
+
+    enviado = {}
+
+    def solicitar():
+        # Um envio aceito (com a tabela na resposta) mas sem o seq não é repetido às cegas:
+        # o seq do período é procurado na tabela para não duplicar a geração no SSW
+        if enviado.get("url_tabela"):
+            linhas = sessao.consultar_requisicoes(enviado["url_tabela"])
+            seq = seq_do_periodo(linhas, data_inicio_str, data_fim_str, primeira_linha=False)
+            if seq:
+                print(f"O formulário já tinha sido enviado. Usando o seq {seq} do período na tabela.")
+                return seq, enviado["url_tabela"]
+            print("A requisição do período não aparece na tabela. Enviando o formulário novamente.")
+        seq, url_tabela = sessao.solicitar_relatorio(data_inicio_str, data_fim_str)
+        enviado["url_tabela"] = url_tabela
+        return (seq, url_tabela) if seq else None
+
+    seq, url_tabela = _retomar_requisicao(sessao, checkpoints.obter(periodo) if checkpoints else None)
+    if seq is None:
+        with medir("formulario", **marcacoes) as medicao:
+            seq, url_tabela = repetir_etapa(solicitar, "solicitacao", stop_event) or (None, None)
+            medicao["status"] = "ok" if seq else "falha"
+        if seq:
+            avancar("solicitado", seq=seq, url_tabela=url_tabela)
+    if seq:
+        with medir("geracao", **marcacoes) as medicao:
+            # Um estouro do prazo não é repetido: o seq continua no checkpoint para a próxima execução
+            url = repetir_etapa(lambda: sessao.aguardar_relatorio(seq, url_tabela, stop_event, prazo, intervalos),
+                                "geracao", stop_event, repetir_vazio=False)
+            medicao["status"] = "ok" if url else "falha"
+        if url:
+            avancar("pronto")
+            with medir("download", **marcacoes) as medicao:
+                arquivo = repetir_etapa(lambda: sessao.baixar(url, pasta_destino, periodo["nome_arquivo"]),
+                                        "download", stop_event)
+                medicao["status"] = "ok" if arquivo else "falha"
+            if arquivo:
+                # O download já grava com o nome final: não há etapa de renomeação separada
+                avancar("renomeado", arquivo=arquivo)
+    print(f"--- Finalizada extração HTTP para o período: {data_inicio_str} a {data_fim_str} ---")
+    return arquivo
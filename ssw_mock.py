@@ -0,0 +1,242 @@
+"""
+Servidor local que imita as páginas do SSW usadas pela automação.
+Serve o login ssw0422, o menu com o campo f3, o formulário da opção 455, a
+tabela de requisições tblsr e o download do arquivo, permitindo exercitar os
+backends Selenium e HTTP sem acessar o sistema real.
+
+Uso:
+    python ssw_mock.py --porta 8455 --atraso 5 --variacao 2
+    SSW_URL=http://127.0.0.1:8455 python auto_455.py
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import argparse
+import random
+import secrets
+import threading
+import time
+
+PAGINA_LOGIN = """<html><body>
+<form method="post" action="/bin/ssw0422">
+<input name="f1"><input name="f2"><input name="f3"><input name="f4" type="password">
+<a id="5" href="#" onclick="document.forms[0].submit(); return false;">Entrar</a>
+</form></body></html>"""
+
+PAGINA_MENU = """<html><body>
+<input name="f2" value="{empresa}" readonly>
+<input name="f3" oninput="if (this.value.indexOf('455') >= 0) {{ window.open('/bin/ssw0455', '_blank'); this.value = ''; }}">
+</body></html>"""
+
+PAGINA_455 = """<html><body>
+<form method="post" action="/bin/ssw0455">
+<input id="11" name="f11" value="010101"><input id="12" name="f12" value="010101">
+<input name="f21" value="x"><input name="f35" value="x"><input name="f37" value="x">
+<input name="f38" maxlength="1"><input name="f39" maxlength="1">
+<input type="hidden" name="f40" value="">
+<a id="40" href="#" onclick="aguardarConfirmacao(); return false;">Processar</a>
+</form>
+<script>
+function aguardarConfirmacao() {
+  document.addEventListener('keydown', function (e) {
+    if (e.key === '1') { document.forms[0].f40.value = '1'; document.forms[0].submit(); }
+  });
+}
+</script></body></html>"""
+
+PAGINA_REQUISICOES = """<html><body>
+<a id="2" href="#" onclick="location.reload(); return false;">Atualizar</a>
+<table id="tblsr"><tr><th>Seq</th><th>Período</th><th>Situação</th><th>Arquivo</th></tr>
+{linhas}</table></body></html>"""
+
+
+class EstadoSSW:
+    """
+    Estado compartilhado do servidor simulado: sessões e requisições de relatório
+
+    Args:
+        atraso_relatorio: Segundos até um relatório ficar pronto
+        linhas_por_dia: Linhas geradas no arquivo para cada dia do período
+        duracao_sessao: Segundos até a sessão expirar (None = nunca)
+        variacao_atraso: Variação máxima (±s) sorteada para o atraso de cada relatório
+        semente: Semente do sorteio da variação, para execuções repetíveis
+    """
+
+    def __init__(self, atraso_relatorio=5.0, linhas_por_dia=20, duracao_sessao=None,
+                 variacao_atraso=0.0, semente=None):
+        self.atraso_relatorio = atraso_relatorio
+        self.linhas_por_dia = linhas_por_dia
+        self.duracao_sessao = duracao_sessao
+        self.variacao_atraso = variacao_atraso
+        self._sorteio = random.Random(semente)
+        self.sessoes = {}
+        self.requisicoes = []
+        self._trava = threading.Lock()
+
+    def criar_sessao(self):
+        token = secrets.token_hex(8)
+        with self._trava:
+            self.sessoes[token] = time.monotonic()
+        return token
+
+    def sessao_valida(self, token):
+        with self._trava:
+            criada = self.sessoes.get(token)
+        if criada is None:
+            return False
+        return self.duracao_sessao is None or time.monotonic() - criada < self.duracao_sessao
+
+    def encerrar_sessoes(self):
+        """Invalida todos os cookies emitidos, como uma expiração no servidor"""
+        with self._trava:
+            self.sessoes.clear()
+
+    def criar_requisicao(self, data_inicio, data_fim):
+        with self._trava:
+            seq = str(1000 + len(self.requisicoes) + 1)
+            variacao = self._sorteio.uniform(-self.variacao_atraso, self.variacao_atraso)
+            self.requisicoes.insert(0, {
+                "seq": seq,
+                "inicio": data_inicio,
+                "fim": data_fim,
+                "pronto_em": time.monotonic() + max(0.0, self.atraso_relatorio + variacao),
+            })
+        return seq
+
+    def gerar_arquivo(self, seq):
+        requisicao = next((r for r in self.requisicoes if r["seq"] == seq), None)
+        if requisicao is None:
+            return None
+        linhas = ["CTRC;Emissao;Unidade;Situacao;Frete;Peso"]
+        dia_inicio = int(requisicao["inicio"][:2] or 1)
+        dia_fim = int(requisicao["fim"][:2] or 1)
+        mes_ano = requisicao["inicio"][2:]
+        for dia in range(dia_inicio, dia_fim + 1):
+            for n in range(self.linhas_por_dia):
+                linhas.append(f"{seq}{dia:02d}{n:04d};{dia:02d}/{mes_ano[:2]}/{mes_ano[2:]};MTZ;ENTREGUE;{100 + n},50;{10 + n},0")
+        return ("\r\n".join(linhas) + "\r\n").encode("latin-1")
+
+
+class _ManipuladorSSW(BaseHTTPRequestHandler):
+    estado = None
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _token(self):
+        for cookie in self.headers.get("Cookie", "").split(";"):
+            nome, _, valor = cookie.strip().partition("=")
+            if nome == "token":
+                return valor
+        return None
+
+    def _responder(self, html, status=200, cabecalhos=None):
+        corpo = html.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _redirecionar(self, destino):
+        self.send_response(303)
+        self.send_header("Location", destino)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _formulario(self):
+        tamanho = int(self.headers.get("Content-Length", 0))
+        dados = parse_qs(self.rfile.read(tamanho).decode("utf-8"))
+        return {nome: valores[0] for nome, valores in dados.items()}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/bin/ssw0422":
+            return self._responder(PAGINA_LOGIN)
+        if not self.estado.sessao_valida(self._token()):
+            return self._responder(PAGINA_LOGIN)
+        if url.path == "/bin/ssw0455":
+            return self._responder(PAGINA_455)
+        if url.path == "/bin/ssw1440":
+            return self._responder(PAGINA_REQUISICOES.format(linhas=self._linhas_requisicoes()))
+        if url.path == "/bin/download":
+            seq = parse_qs(url.query).get("seq", [""])[0]
+            conteudo = self.estado.gerar_arquivo(seq)
+            if conteudo is None:
+                return self._responder("Requisição não encontrada", status=404)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Disposition", f'attachment; filename="LDI{seq}.csv"')
+            self.send_header("Content-Length", str(len(conteudo)))
+            self.end_headers()
+            self.wfile.write(conteudo)
+            return
+        self._responder("Página não encontrada", status=404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        dados = self._formulario()
+        if url.path == "/bin/ssw0422":
+            if not all(dados.get(campo) for campo in ("f1", "f2", "f3", "f4")):
+                return self._responder(PAGINA_LOGIN)
+            token = self.estado.criar_sessao()
+            return self._responder(PAGINA_MENU.format(empresa=dados["f1"]),
+                                   cabecalhos={"Set-Cookie": f"token={token}; Path=/"})
+        if not self.estado.sessao_valida(self._token()):
+            return self._responder(PAGINA_LOGIN)
+        if url.path == "/bin/ssw0455" and dados.get("f40") == "1":
+            self.estado.criar_requisicao(dados.get("f11", ""), dados.get("f12", ""))
+            return self._redirecionar("/bin/ssw1440")
+        self._responder("Requisição inválida", status=400)
+
+    def _linhas_requisicoes(self):
+        agora = time.monotonic()
+        linhas = []
+        for requisicao in self.estado.requisicoes:
+            if agora >= requisicao["pronto_em"]:
+                situacao = "Concluído"
+                arquivo = f'<a href="/bin/download?seq={requisicao["seq"]}"><u>Baixar</u></a>'
+            else:
+                situacao, arquivo = "Processando", ""
+            linhas.append(f'<tr><td>{requisicao["seq"]}</td><td>{requisicao["inicio"]} a {requisicao["fim"]}</td>'
+                          f'<td>{situacao}</td><td>{arquivo}</td></tr>')
+        return "\n".join(linhas)
+
+
+def iniciar_servidor(porta=0, **configuracao):
+    """
+    Inicia o servidor simulado em uma thread de fundo
+
+    Args:
+        porta: Porta local (0 escolhe uma porta livre)
+        **configuracao: Parâmetros repassados para EstadoSSW
+
+    Returns:
+        tuple: (servidor, URL base) — use servidor.shutdown() para encerrar
+    """
+    manipulador = type("ManipuladorSSW", (_ManipuladorSSW,), {"estado": EstadoSSW(**configuracao)})
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), manipulador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que simula o SSW para a automação 455")
+    parser.add_argument("--porta", type=int, default=8455)
+    parser.add_argument("--atraso", type=float, default=5.0, help="segundos até o relatório ficar pronto")
+    parser.add_argument("--variacao", type=float, default=0.0, help="variação máxima (±s) do atraso de cada relatório")
+    parser.add_argument("--linhas-por-dia", type=int, default=20, help="linhas do arquivo para cada dia do período")
+    parser.add_argument("--duracao-sessao", type=float, default=None, help="segundos até a sessão expirar")
+    parser.add_argument("--semente", type=int, default=None, help="semente da variação do atraso")
+    args = parser.parse_args()
+    servidor, url = iniciar_servidor(args.porta, atraso_relatorio=args.atraso, variacao_atraso=args.variacao,
+                                     linhas_por_dia=args.linhas_por_dia, duracao_sessao=args.duracao_sessao,
+                                     semente=args.semente)
+    print(f"SSW simulado em {url} (Ctrl+C para encerrar)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.shutdown()
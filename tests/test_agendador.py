@@ -0,0 +1,73 @@
+"""
+Testes do agendador: próximo horário, cache dos agendamentos e disparo das tarefas pendentes.
+"""
+
+from datetime import datetime
+import os
+
+from agendador import Agendador, CacheAgendamentos, proximo_horario
+
+
+def test_proximo_horario_hoje_ou_amanha():
+    agora = datetime(2026, 10, 17, 8, 0)
+    assert proximo_horario("09:30", agora) == datetime(2026, 10, 17, 9, 30)
+    assert proximo_horario("07:59", agora) == datetime(2026, 10, 18, 7, 59)
+    # O próprio instante já passou: o próximo é o do dia seguinte
+    assert proximo_horario("08:00", agora) == datetime(2026, 10, 18, 8, 0)
+    assert proximo_horario("08:00:30", agora) == datetime(2026, 10, 17, 8, 0, 30)
+
+
+def test_proximo_horario_na_virada_do_dia_do_mes_e_do_ano():
+    assert proximo_horario("00:00", datetime(2026, 10, 17, 23, 59, 59)) == datetime(2026, 10, 18)
+    assert proximo_horario("06:00", datetime(2026, 10, 31, 22, 0)) == datetime(2026, 11, 1, 6, 0)
+    assert proximo_horario("06:00", datetime(2026, 2, 28, 7, 0)) == datetime(2026, 3, 1, 6, 0)
+    assert proximo_horario("06:00", datetime(2028, 2, 28, 7, 0)) == datetime(2028, 2, 29, 6, 0)
+    assert proximo_horario("06:00", datetime(2026, 12, 31, 7, 0)) == datetime(2027, 1, 1, 6, 0)
+
+
+def test_executar_pendentes_dispara_e_reagenda():
+    disparos = []
+    agendador = Agendador()
+    agendador.definir_tarefas([("06:00", lambda: disparos.append("06:00")),
+                               ("23:30", lambda: disparos.append("23:30"))],
+                              agora=datetime(2026, 10, 17, 5, 0))
+    assert agendador.proximo_disparo() == datetime(2026, 10, 17, 6, 0)
+
+    assert agendador.executar_pendentes(datetime(2026, 10, 17, 5, 59)) == 0
+    assert agendador.executar_pendentes(datetime(2026, 10, 17, 6, 0)) == 1
+    assert agendador.proximo_disparo() == datetime(2026, 10, 17, 23, 30)
+
+    # Máquina hibernada durante a noite: o horário perdido dispara uma vez ao acordar
+    assert agendador.executar_pendentes(datetime(2026, 10, 18, 7, 0)) == 2
+    assert disparos == ["06:00", "06:00", "23:30"]
+    assert agendador.proximo_disparo() == datetime(2026, 10, 18, 23, 30)
+
+
+def test_erro_em_uma_tarefa_nao_impede_as_outras():
+    disparos = []
+
+    def falhar():
+        raise RuntimeError("falhou")
+
+    agendador = Agendador()
+    agendador.definir_tarefas([("06:00", falhar), ("06:01", lambda: disparos.append(1))],
+                              agora=datetime(2026, 10, 17, 5, 0))
+    assert agendador.executar_pendentes(datetime(2026, 10, 17, 7, 0)) == 2
+    assert disparos == [1]
+
+
+def test_cache_relido_so_quando_o_arquivo_muda(tmp_path):
+    caminho = str(tmp_path / "agendamentos.json")
+    cache = CacheAgendamentos(caminho)
+    assert cache.carregar() == []
+
+    cache.salvar(["06:00", "18:00"])
+    assert CacheAgendamentos(caminho).carregar() == ["06:00", "18:00"]
+
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write('["07:00"]')
+    os.utime(caminho, ns=(1, 1))  # data de modificação diferente da gravada no cache
+    assert cache.carregar() == ["07:00"]
+
+    os.remove(caminho)
+    assert cache.carregar() == []
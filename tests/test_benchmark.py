@@ -0,0 +1,24 @@
+"""
+Teste de fumaça do benchmark: uma rodada completa contra o SSW simulado, sem navegador
+e sem depender da localidade pt_BR do sistema.
+"""
+
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_benchmark_uma_rodada(tmp_path):
+    saida = tmp_path / "resultado.json"
+    ambiente = dict(os.environ, LC_ALL="C", LANG="C")
+    processo = subprocess.run(
+        [sys.executable, "benchmark.py", "--rodadas", "1", "--atraso", "0.3", "--intervalos", "0.1",
+         "--saida", str(saida)],
+        cwd=RAIZ, env=ambiente, capture_output=True, text=True, timeout=120,
+    )
+    assert processo.returncode == 0, processo.stderr
+    assert "TOTAL" in processo.stdout
+    assert "resolução da etapa geracao: primeiro intervalo de 0.1s" in processo.stdout
+    assert saida.exists()
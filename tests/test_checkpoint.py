@@ -0,0 +1,107 @@
+"""
+Testes dos checkpoints das extrações: ordem das etapas, expiração e repetição de etapas.
+"""
+
+from datetime import datetime, timedelta
+import json
+
+import pytest
+
+import checkpoint
+from checkpoint import Checkpoints, repetir_etapa
+
+PERIODO = {"data_inicio": "010926", "data_fim": "300926", "nome_arquivo": "SET2026"}
+
+
+@pytest.fixture
+def checkpoints(tmp_path):
+    return Checkpoints(str(tmp_path / "checkpoints.json"))
+
+
+def test_etapas_avancam_e_mantem_os_dados_anteriores(checkpoints, tmp_path):
+    arquivo = tmp_path / "baixado.csv"
+    arquivo.write_text("h\n")
+    checkpoints.avancar(PERIODO, "solicitado", seq="1001", url_tabela="http://ssw/tabela")
+    checkpoints.avancar(PERIODO, "pronto")
+    checkpoints.avancar(PERIODO, "baixado", arquivo=str(arquivo))
+
+    estado = checkpoints.obter(PERIODO)
+    assert (estado["etapa"], estado["seq"], estado["arquivo"]) == ("baixado", "1001", str(arquivo))
+    assert checkpoints.arquivo_final(PERIODO) is None
+
+    checkpoints.avancar(PERIODO, "renomeado", arquivo=str(arquivo))
+    assert checkpoints.arquivo_final(PERIODO) == str(arquivo)
+
+
+def test_nova_solicitacao_descarta_o_estado_anterior(checkpoints, tmp_path):
+    arquivo = tmp_path / "baixado.csv"
+    arquivo.write_text("h\n")
+    checkpoints.avancar(PERIODO, "solicitado", seq="1001", url_tabela="http://ssw/tabela")
+    checkpoints.avancar(PERIODO, "baixado", arquivo=str(arquivo))
+    checkpoints.avancar(PERIODO, "solicitado", seq="1002", url_tabela="http://ssw/tabela")
+
+    estado = checkpoints.obter(PERIODO)
+    assert (estado["etapa"], estado["seq"]) == ("solicitado", "1002")
+    assert "arquivo" not in estado
+
+
+def test_etapa_desconhecida_e_recusada(checkpoints):
+    with pytest.raises(ValueError):
+        checkpoints.avancar(PERIODO, "concluido")
+
+
+def test_checkpoint_expirado_e_ignorado(checkpoints, monkeypatch):
+    checkpoints.avancar(PERIODO, "solicitado", seq="1001", url_tabela="http://ssw/tabela")
+    monkeypatch.setattr(checkpoint, "PRAZO_CHECKPOINT", 3600)
+    assert checkpoints.obter(PERIODO)
+
+    antigo = (datetime.now() - timedelta(seconds=3601)).isoformat(timespec="seconds")
+    checkpoints.periodos[PERIODO["nome_arquivo"]]["solicitado_em"] = antigo
+    assert checkpoints.obter(PERIODO) is None
+
+
+def test_checkpoint_de_outras_datas_e_ignorado(checkpoints):
+    checkpoints.avancar(PERIODO, "solicitado", seq="1001", url_tabela="http://ssw/tabela")
+    assert checkpoints.obter(dict(PERIODO, data_fim="150926")) is None
+
+
+def test_arquivo_apagado_invalida_o_checkpoint(checkpoints, tmp_path):
+    checkpoints.avancar(PERIODO, "baixado", arquivo=str(tmp_path / "sumiu.csv"))
+    assert checkpoints.obter(PERIODO) is None
+
+
+def test_persistido_e_concluido(tmp_path):
+    caminho = str(tmp_path / "checkpoints.json")
+    Checkpoints(caminho).avancar(PERIODO, "solicitado", seq="1001", url_tabela="http://ssw/tabela")
+    recarregado = Checkpoints(caminho)
+    assert recarregado.obter(PERIODO)["seq"] == "1001"
+
+    recarregado.concluir(PERIODO)
+    with open(caminho, encoding="utf-8") as f:
+        assert json.load(f) == {}
+
+
+def test_repetir_etapa(monkeypatch):
+    esperas = []
+    monkeypatch.setattr(checkpoint, "pausa", lambda segundos, stop_event: esperas.append(segundos))
+    resultados = iter([None, RuntimeError("falhou"), "ok"])
+
+    def etapa():
+        resultado = next(resultados)
+        if isinstance(resultado, Exception):
+            raise resultado
+        return resultado
+
+    assert repetir_etapa(etapa, "teste", None, tentativas=3, espera_inicial=1) == "ok"
+    assert esperas == [1, 2]
+
+
+def test_repetir_etapa_propaga_a_ultima_excecao(monkeypatch):
+    monkeypatch.setattr(checkpoint, "pausa", lambda segundos, stop_event: None)
+
+    def etapa():
+        raise RuntimeError("sempre")
+
+    with pytest.raises(RuntimeError):
+        repetir_etapa(etapa, "teste", None, tentativas=2)
+    assert repetir_etapa(lambda: None, "teste", None, tentativas=2, repetir_vazio=False) is None
@@ -0,0 +1,84 @@
+"""
+Testes da base consolidada: substituição da partição do mês, deduplicação
+pela chave do documento e estatísticas do índice.
+"""
+
+from datetime import datetime
+import json
+import os
+
+import pandas as pd
+
+from consolidado import ARQUIVO_INDICE, atualizar_particao, carregar_indice, ler_consolidado
+
+SETEMBRO = {"mes": 9, "ano": 2026}
+OUTUBRO = {"mes": 10, "ano": 2026}
+
+
+def _parquet(pasta, nome, dados):
+    caminho = str(pasta / nome)
+    pd.DataFrame(dados).to_parquet(caminho, index=False)
+    return caminho
+
+
+def test_duplicadas_removidas_mantendo_a_ultima(tmp_path):
+    pasta = str(tmp_path / "consolidado")
+    arquivo = _parquet(tmp_path, "SET2026.parquet", {
+        "Série CTRC": ["A", "A", "B", "A"],
+        "CTRC": ["1", "2", "1", "1"],
+        "Emissão": pd.to_datetime(["2026-09-03", "2026-09-01", "2026-09-20", "2026-09-05"]),
+        "Situação": ["emitido", "emitido", "emitido", "entregue"],
+    })
+    destino = atualizar_particao(pasta, SETEMBRO, arquivo)
+    assert destino == os.path.join(pasta, "periodo=2026-09", "dados.parquet")
+
+    dados = pd.read_parquet(destino)
+    assert list(zip(dados["Série CTRC"], dados["CTRC"], dados["Situação"])) == [
+        ("A", "2", "emitido"), ("B", "1", "emitido"), ("A", "1", "entregue")]
+
+    estatisticas = carregar_indice(pasta)["2026-09"]
+    assert (estatisticas["linhas"], estatisticas["duplicadas_removidas"]) == (3, 1)
+    assert estatisticas["arquivo"] == os.path.join("periodo=2026-09", "dados.parquet")
+    # A data da linha descartada (03/09) não conta, mas a mínima continua a de 01/09
+    assert (estatisticas["coluna_data"], estatisticas["data_min"], estatisticas["data_max"]) == (
+        "Emissão", "2026-09-01T00:00:00", "2026-09-20T00:00:00")
+
+
+def test_novo_download_substitui_apenas_a_propria_particao(tmp_path):
+    pasta = str(tmp_path / "consolidado")
+    atualizar_particao(pasta, SETEMBRO, _parquet(tmp_path, "SET2026.parquet", {
+        "Chave CT-e": ["s1", "s2"], "Emissão": pd.to_datetime(["2026-09-01", "2026-09-30"])}))
+    atualizar_particao(pasta, OUTUBRO, _parquet(tmp_path, "OUT2026.parquet", {
+        "Chave CT-e": ["o1", "o2", "o3"], "Emissão": pd.to_datetime(["2026-10-01", "2026-10-02", "2026-10-03"])}))
+    atualizar_particao(pasta, OUTUBRO, _parquet(tmp_path, "OUT2026.parquet", {
+        "Chave CT-e": ["o1", "o4"], "Emissão": pd.to_datetime(["2026-10-01", "2026-10-16"])}))
+
+    indice = carregar_indice(pasta)
+    assert list(indice) == ["2026-09", "2026-10"]
+    assert indice["2026-09"]["linhas"] == 2
+    assert (indice["2026-10"]["linhas"], indice["2026-10"]["data_max"]) == (2, "2026-10-16T00:00:00")
+    assert sorted(ler_consolidado(pasta)["Chave CT-e"]) == ["o1", "o4", "s1", "s2"]
+
+    # O índice permite ler só as partições do intervalo
+    recorte = ler_consolidado(pasta, inicio=datetime(2026, 10, 10), colunas=["Chave CT-e"])
+    assert list(recorte.columns) == ["Chave CT-e"]
+    assert list(recorte["Chave CT-e"]) == ["o4"]
+    assert len([n for n in os.listdir(pasta) if n != ARQUIVO_INDICE]) == 2
+
+
+def test_sem_chave_nem_data_grava_sem_deduplicar(tmp_path):
+    pasta = str(tmp_path / "consolidado")
+    arquivo = _parquet(tmp_path, "SET2026.parquet", {"Observação": ["x", "x"]})
+    assert atualizar_particao(pasta, SETEMBRO, arquivo)
+    with open(os.path.join(pasta, ARQUIVO_INDICE), encoding="utf-8") as f:
+        estatisticas = json.load(f)["2026-09"]
+    assert (estatisticas["linhas"], estatisticas["duplicadas_removidas"]) == (2, 0)
+    assert (estatisticas["coluna_data"], estatisticas["data_min"], estatisticas["data_max"]) == (None, None, None)
+
+
+def test_arquivo_invalido_nao_altera_o_indice(tmp_path):
+    pasta = str(tmp_path / "consolidado")
+    atualizar_particao(pasta, SETEMBRO, _parquet(tmp_path, "SET2026.parquet", {"CTRC": ["1"]}))
+    (tmp_path / "OUT2026.parquet").write_bytes(b"corrompido")
+    assert atualizar_particao(pasta, OUTUBRO, str(tmp_path / "OUT2026.parquet")) is None
+    assert list(carregar_indice(pasta)) == ["2026-09"]
@@ -0,0 +1,41 @@
+"""
+Testes da conversão dos relatórios 455 para Parquet tipado.
+"""
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from conversao import _converter_numeros, converter_para_parquet, tipo_da_coluna
+
+
+def test_numeros_no_formato_brasileiro():
+    valores = pd.Series(["1.234", "1.234,56", "1234.56", "12.345.678", "-1.234", "10,5", "7", None])
+    convertidos = _converter_numeros(valores).tolist()
+    assert convertidos[:7] == [1234.0, 1234.56, 1234.56, 12345678.0, -1234.0, 10.5, 7.0]
+    assert pd.isna(convertidos[7])
+
+
+def test_numeros_de_planilha_mantem_o_ponto_decimal():
+    valores = pd.Series(["1.234", "1.234,56", "1234.56"])
+    assert _converter_numeros(valores, ponto_milhar=False).tolist() == [1.234, 1234.56, 1234.56]
+
+
+def test_tipo_da_coluna_pelo_nome_normalizado():
+    assert tipo_da_coluna("Peso Real") == "numero"
+    assert tipo_da_coluna("Data de Emissão") == "data"
+    assert tipo_da_coluna("Unidade Destino") == "categoria"
+
+
+def test_csv_convertido_com_tipos(tmp_path):
+    caminho = tmp_path / "AGO2026.csv"
+    caminho.write_text("CTRC;Emissao;Unidade;Frete;Peso\r\n"
+                       "0001;01/08/2026;MTZ;1.234,56;1.234\r\n"
+                       "0002;02/08/2026;FIL;99,90;12\r\n", encoding="latin-1")
+
+    destino = converter_para_parquet(str(caminho))
+
+    tabela = pq.read_table(destino).to_pandas()
+    assert tabela["CTRC"].tolist() == ["0001", "0002"]
+    assert tabela["Frete"].tolist() == [1234.56, 99.9]
+    assert tabela["Peso"].tolist() == [1234.0, 12.0]
+    assert tabela["Emissao"].iloc[0] == pd.Timestamp(2026, 8, 1)
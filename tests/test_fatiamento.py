@@ -0,0 +1,100 @@
+"""
+Testes do fatiamento adaptativo: limites das fatias, tamanho de fatia pelo
+histórico e junção dos arquivos das fatias.
+"""
+
+from datetime import datetime
+import json
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+import fatiamento
+from fatiamento import DIAS_MAXIMOS, DIAS_MINIMOS, HistoricoFatias, fatiar, juntar_partes
+
+
+def test_fatias_consecutivas_cobrem_o_intervalo():
+    fatias = fatiar(datetime(2026, 1, 1), datetime(2026, 1, 31), 10)
+    assert fatias == [(datetime(2026, 1, 1), datetime(2026, 1, 10)),
+                      (datetime(2026, 1, 11), datetime(2026, 1, 20)),
+                      (datetime(2026, 1, 21), datetime(2026, 1, 30)),
+                      (datetime(2026, 1, 31), datetime(2026, 1, 31))]
+
+
+def test_fatias_nos_limites():
+    um_dia = datetime(2026, 2, 28)
+    assert fatiar(um_dia, um_dia, 7) == [(um_dia, um_dia)]
+    assert fatiar(datetime(2026, 2, 1), um_dia, DIAS_MAXIMOS) == [(datetime(2026, 2, 1), um_dia)]
+    assert len(fatiar(datetime(2026, 2, 1), um_dia, DIAS_MINIMOS)) == 28
+    # Fatia atravessando a virada do mês e do ano
+    assert fatiar(datetime(2025, 12, 30), datetime(2026, 1, 2), 3) == [
+        (datetime(2025, 12, 30), datetime(2026, 1, 1)), (datetime(2026, 1, 2), datetime(2026, 1, 2))]
+    assert fatiar(datetime(2026, 1, 2), datetime(2026, 1, 1), 5) == []
+
+
+def test_sem_historico_usa_o_maximo(tmp_path):
+    historico = HistoricoFatias(str(tmp_path / "historico.json"))
+    assert historico.dias_por_fatia(alvo_segundos=60, alvo_bytes=1000) == DIAS_MAXIMOS
+
+
+def test_media_movel_define_o_tamanho_da_fatia(tmp_path, monkeypatch):
+    monkeypatch.setattr(fatiamento, "PESO_OBSERVACAO", 0.5)
+    caminho = str(tmp_path / "historico.json")
+    historico = HistoricoFatias(caminho)
+    historico.registrar(10, segundos_geracao=100, tamanho_arquivo=1000)
+    historico.registrar(10, segundos_geracao=300, tamanho_arquivo=1000)
+    assert historico.dados["segundos_por_dia"] == pytest.approx(20)
+    assert historico.dados["bytes_por_dia"] == pytest.approx(100)
+    assert historico.dados["observacoes"] == 2
+
+    # O limite mais restritivo vence: 200 s / 20 s por dia = 10 dias; 5000 bytes / 100 = 50 dias
+    assert historico.dias_por_fatia(alvo_segundos=200, alvo_bytes=5000) == 10
+    assert historico.dias_por_fatia(alvo_segundos=2000, alvo_bytes=500) == 5
+    assert historico.dias_por_fatia(alvo_segundos=1, alvo_bytes=1) == DIAS_MINIMOS
+
+    # Geração de tempo desconhecido só atualiza o tamanho por dia
+    historico.registrar(10, segundos_geracao=None, tamanho_arquivo=3000)
+    assert historico.dados["segundos_por_dia"] == pytest.approx(20)
+    assert historico.dados["bytes_por_dia"] == pytest.approx(200)
+
+    with open(caminho, encoding="utf-8") as f:
+        assert json.load(f) == historico.dados
+    assert HistoricoFatias(caminho).dias_por_fatia(alvo_segundos=200, alvo_bytes=5000) == 10
+
+
+def test_historico_corrompido_recomeca(tmp_path):
+    caminho = tmp_path / "historico.json"
+    caminho.write_text("{")
+    assert HistoricoFatias(str(caminho)).dados == {}
+
+
+def test_juntar_texto_mantem_so_o_primeiro_cabecalho(tmp_path):
+    partes = []
+    for nome, conteudo in (("p1.csv", b"ctrc;peso\r\n1;1\r\n2;2"), ("p2.csv", b"ctrc;peso\r\n"),
+                           ("p3.csv", b"ctrc;peso\r\n3;3\r\n")):
+        (tmp_path / nome).write_bytes(conteudo)
+        partes.append(str(tmp_path / nome))
+
+    destino = juntar_partes(partes, str(tmp_path / "JAN2026.csv"))
+    # A primeira parte termina sem quebra de linha: a junção acrescenta uma
+    assert open(destino, "rb").read() == b"ctrc;peso\r\n1;1\r\n2;2\r\n3;3\r\n"
+    assert not any((tmp_path / nome).exists() for nome in ("p1.csv", "p2.csv", "p3.csv"))
+
+
+def test_juntar_planilhas_grava_xlsx_com_os_tipos(tmp_path):
+    partes = []
+    for indice, linhas in enumerate(([(1, datetime(2026, 1, 5), 1.5)], [(2, datetime(2026, 1, 20), 2.5)])):
+        livro = Workbook()
+        livro.active.append(("ctrc", "emissao", "peso"))
+        for linha in linhas:
+            livro.active.append(linha)
+        caminho = str(tmp_path / f"parte{indice}.xlsx")
+        livro.save(caminho)
+        partes.append(caminho)
+
+    destino = juntar_partes(partes, str(tmp_path / "JAN2026.xls"))
+    assert destino == str(tmp_path / "JAN2026.xlsx")
+    livro = load_workbook(destino, read_only=True)
+    assert list(livro.active.iter_rows(values_only=True)) == [
+        ("ctrc", "emissao", "peso"), (1, datetime(2026, 1, 5), 1.5), (2, datetime(2026, 1, 20), 2.5)]
+    livro.close()
@@ -0,0 +1,37 @@
+"""
+Testes da fila de execuções: combinação dos gatilhos e precedência do manual.
+"""
+
+from fila_execucoes import FilaExecucoes
+
+
+def test_gatilhos_durante_a_execucao_viram_uma_unica_execucao():
+    fila = FilaExecucoes()
+    assert fila.enfileirar("agendado") is True
+    assert fila.enfileirar("agendado") is False
+    assert fila.enfileirar("agendado") is False
+    assert fila.situacao()[0] == 1
+
+    execucao = fila.retirar()
+    assert (execucao["origem"], execucao["gatilhos"]) == ("agendado", 3)
+    assert execucao["espera_s"] >= 0
+    assert fila.retirar() is None
+    assert fila.situacao() == (0, None)
+
+
+def test_gatilho_manual_tem_precedencia_sobre_o_agendado_pendente():
+    fila = FilaExecucoes()
+    fila.enfileirar("agendado")
+    fila.enfileirar("manual")
+    fila.enfileirar("agendado")
+
+    execucao = fila.retirar()
+    assert (execucao["origem"], execucao["gatilhos"]) == ("manual", 3)
+
+
+def test_limpar_descarta_a_pendente():
+    fila = FilaExecucoes()
+    assert fila.limpar() == 0
+    fila.enfileirar("manual")
+    assert fila.limpar() == 1
+    assert fila.retirar() is None
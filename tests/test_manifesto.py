@@ -0,0 +1,106 @@
+"""
+Testes do manifesto de extrações: política de reextração de meses fechados,
+conteúdo inalterado e contagem de linhas.
+"""
+
+from datetime import datetime
+
+import pandas as pd
+
+from manifesto import Manifesto, contar_linhas, hash_arquivo, periodo_fechado, substituir_se_alterado
+
+HOJE = datetime(2026, 10, 17)
+
+
+def _periodo(mes, ano=2026):
+    return {"mes": mes, "ano": ano, "data_inicio": f"01{mes:02d}{ano % 100}",
+            "data_fim": f"28{mes:02d}{ano % 100}", "nome_arquivo": f"M{mes:02d}{ano}"}
+
+
+def _arquivo(pasta, nome, conteudo):
+    caminho = pasta / nome
+    caminho.write_text(conteudo, encoding="latin-1")
+    return str(caminho)
+
+
+def test_periodo_fechado():
+    assert periodo_fechado(_periodo(9), HOJE)
+    assert periodo_fechado(_periodo(12, 2025), HOJE)
+    assert not periodo_fechado(_periodo(10), HOJE)
+
+
+def test_mes_atual_nunca_fica_final(tmp_path):
+    manifesto = Manifesto(str(tmp_path / "manifesto.json"))
+    arquivo = _arquivo(tmp_path, "OUT2026.csv", "h\n1\n")
+    for _ in range(5):
+        manifesto.registrar(_periodo(10), arquivo, HOJE)
+    registro = manifesto.periodos["M102026"]
+    assert not registro["final"]
+    assert registro["downloads_apos_fechamento"] == 0
+    assert manifesto.deve_extrair(_periodo(10), HOJE)
+
+
+def test_mes_fechado_fica_final_com_dois_downloads_iguais(tmp_path):
+    manifesto = Manifesto(str(tmp_path / "manifesto.json"))
+    arquivo = _arquivo(tmp_path, "SET2026.csv", "h\n1\n")
+    manifesto.registrar(_periodo(9), arquivo, HOJE)
+    assert not manifesto.periodos["M092026"]["final"]
+    manifesto.registrar(_periodo(9), arquivo, HOJE)
+    assert manifesto.periodos["M092026"]["final"]
+    assert not manifesto.deve_extrair(_periodo(9), HOJE)
+
+
+def test_mes_fechado_fica_final_no_limite_de_reextracoes(tmp_path):
+    manifesto = Manifesto(str(tmp_path / "manifesto.json"), max_reextracoes=3)
+    for versao in range(1, 4):
+        arquivo = _arquivo(tmp_path, "SET2026.csv", f"h\n{versao}\n")
+        manifesto.registrar(_periodo(9), arquivo, HOJE)
+        assert manifesto.periodos["M092026"]["final"] == (versao == 3)
+
+
+def test_download_igual_ao_do_mes_ainda_aberto_nao_finaliza(tmp_path):
+    manifesto = Manifesto(str(tmp_path / "manifesto.json"))
+    arquivo = _arquivo(tmp_path, "SET2026.csv", "h\n1\n")
+    manifesto.registrar(_periodo(9), arquivo, datetime(2026, 9, 30))
+    # Primeiro download depois do fechamento: igual ao último do mês aberto, o que já basta
+    manifesto.registrar(_periodo(9), arquivo, HOJE)
+    assert manifesto.periodos["M092026"]["final"]
+
+
+def test_manifesto_persistido_e_recarregado(tmp_path):
+    caminho = str(tmp_path / "manifesto.json")
+    arquivo = _arquivo(tmp_path, "SET2026.csv", "h\n1\n2\n")
+    Manifesto(caminho).registrar(_periodo(9), arquivo, HOJE)
+    registro = Manifesto(caminho).periodos["M092026"]
+    assert (registro["arquivo"], registro["linhas"]) == ("SET2026.csv", 2)
+    assert registro["sha256"] == hash_arquivo(arquivo)
+
+
+def test_conteudo_inalterado(tmp_path):
+    manifesto = Manifesto(str(tmp_path / "manifesto.json"))
+    arquivo = _arquivo(tmp_path, "SET2026.csv", "h\n1\n")
+    sha256 = hash_arquivo(arquivo)
+    assert not manifesto.conteudo_inalterado(_periodo(9), arquivo, sha256)
+    manifesto.registrar(_periodo(9), arquivo, HOJE, sha256)
+    assert manifesto.conteudo_inalterado(_periodo(9), arquivo, sha256)
+    assert not manifesto.conteudo_inalterado(_periodo(9), arquivo, "outro")
+    assert not manifesto.conteudo_inalterado(_periodo(9), str(tmp_path / "SET2026.xlsx"), sha256)
+
+
+def test_substituir_se_alterado(tmp_path):
+    destino = _arquivo(tmp_path, "SET2026.csv", "h\n1\n")
+    assert not substituir_se_alterado(_arquivo(tmp_path, "novo.csv", "h\n1\n"), destino)
+    assert not (tmp_path / "novo.csv").exists()
+    assert substituir_se_alterado(_arquivo(tmp_path, "novo.csv", "h\n2\n"), destino)
+    assert open(destino, encoding="latin-1").read() == "h\n2\n"
+
+
+def test_contar_linhas_sem_carregar_o_arquivo(tmp_path):
+    dados = pd.DataFrame({"ctrc": ["1", "2", "3"], "peso": [1.0, 2.0, 3.0]})
+    dados.to_excel(tmp_path / "SET2026.xlsx", index=False)
+    dados.to_parquet(tmp_path / "SET2026.parquet")
+    texto = _arquivo(tmp_path, "SET2026.csv", "ctrc;peso\n1;1\n\n2;2\n")
+    assert contar_linhas(str(tmp_path / "SET2026.xlsx")) == 3
+    assert contar_linhas(str(tmp_path / "SET2026.parquet")) == 3
+    assert contar_linhas(texto) == 2
+    assert contar_linhas(str(tmp_path / "inexistente.xlsx")) is None
@@ -0,0 +1,83 @@
+"""
+Testes dos perfis de extração: leitura e validação do perfis.json e das credenciais de cada perfil.
+"""
+
+import json
+import os
+
+import pytest
+
+from perfis import carregar_perfis, criar_perfil
+
+CREDENCIAIS = "SSW_EMPRESA=emp\nSSW_CNPJ=123\nSSW_USUARIO=usuario\nSSW_SENHA=senha\n"
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    (tmp_path / "credenciais.env").write_text(CREDENCIAIS)
+    (tmp_path / "credenciais_sp.env").write_text(CREDENCIAIS.replace("123", "456"))
+    return tmp_path
+
+
+def _perfis(pasta, entradas):
+    caminho = pasta / "perfis.json"
+    caminho.write_text(json.dumps(entradas), encoding="utf-8")
+    return str(caminho)
+
+
+def test_perfis_carregados_na_ordem_do_arquivo(pasta):
+    caminho = _perfis(pasta, [
+        {"nome": "matriz", "credenciais": "credenciais.env", "pasta": str(pasta / "saida" / "matriz"), "meses": 3},
+        {"nome": "filial_sp", "credenciais": "credenciais_sp.env", "pasta": str(pasta / "saida" / "filial_sp")},
+    ])
+    matriz, filial = carregar_perfis(caminho)
+    assert (matriz["nome"], matriz["meses"], filial["meses"]) == ("matriz", 3, None)
+    assert matriz["credenciais"] == {"f1": "emp", "f2": "123", "f3": "usuario", "f4": "senha"}
+    assert filial["credenciais"]["f2"] == "456"
+    # Arquivos de controle separados por perfil, ao lado da pasta de saída
+    assert matriz["manifesto"] == str(pasta / "saida" / "manifesto_455_matriz.json")
+    assert filial["checkpoints"] == str(pasta / "saida" / "checkpoints_455_filial_sp.json")
+    assert matriz["consolidado"] == str(pasta / "saida" / "matriz" / "consolidado")
+
+    assert [p["nome"] for p in carregar_perfis(caminho, nomes=["filial_sp"])] == ["filial_sp"]
+
+
+def test_credenciais_relativas_a_pasta_do_arquivo_de_perfis(pasta, monkeypatch):
+    caminho = _perfis(pasta, [{"nome": "matriz", "credenciais": "credenciais.env", "pasta": "saida"}])
+    monkeypatch.chdir(os.path.dirname(str(pasta)))
+    assert carregar_perfis(caminho)[0]["credenciais"]["f3"] == "usuario"
+
+
+@pytest.mark.parametrize("entradas, mensagem", [
+    ([], "lista não vazia"),
+    ({"nome": "matriz"}, "lista não vazia"),
+    ([{"nome": "matriz", "credenciais": "credenciais.env"}], "sem pasta"),
+    ([{"nome": "matriz", "credenciais": "credenciais.env", "pasta": "a", "meses": 0}], "'meses'"),
+    ([{"nome": "matriz", "credenciais": "inexistente.env", "pasta": "a"}], "não encontrado"),
+    ([{"nome": "matriz", "credenciais": "credenciais.env", "pasta": "a"},
+      {"nome": "matriz", "credenciais": "credenciais_sp.env", "pasta": "b"}], "mesmo nome"),
+    ([{"nome": "matriz", "credenciais": "credenciais.env", "pasta": "a"},
+      {"nome": "filial", "credenciais": "credenciais_sp.env", "pasta": "a/"}], "mesma pasta"),
+])
+def test_perfis_invalidos_sao_recusados(pasta, entradas, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        carregar_perfis(_perfis(pasta, entradas))
+
+
+def test_credenciais_incompletas_e_perfil_desconhecido(pasta):
+    (pasta / "incompleto.env").write_text("SSW_EMPRESA=emp\nSSW_CNPJ=123\n")
+    with pytest.raises(ValueError, match="SSW_USUARIO, SSW_SENHA"):
+        carregar_perfis(_perfis(pasta, [{"nome": "matriz", "credenciais": "incompleto.env", "pasta": "a"}]))
+
+    caminho = _perfis(pasta, [{"nome": "matriz", "credenciais": "credenciais.env", "pasta": "a"}])
+    with pytest.raises(ValueError, match="filial"):
+        carregar_perfis(caminho, nomes=["filial"])
+
+    (pasta / "perfis.json").write_text("[")
+    with pytest.raises(ValueError, match="não foi possível ler"):
+        carregar_perfis(str(pasta / "perfis.json"))
+
+
+def test_criar_perfil_sem_arquivo():
+    perfil = criar_perfil("matriz", {"f1": "emp"}, os.path.join("saida", "matriz") + os.sep)
+    assert perfil["historico_fatias"] == os.path.join("saida", "historico_fatias_455_matriz.json")
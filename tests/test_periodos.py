@@ -0,0 +1,22 @@
+"""
+Testes dos períodos de extração: nomes dos arquivos independentes da localidade do sistema.
+"""
+
+from datetime import datetime
+import locale
+
+import auto_455
+
+
+def test_nomes_dos_meses_em_portugues_sem_localidade_pt_br():
+    locale.setlocale(locale.LC_TIME, "C")
+    nomes = [p["nome_arquivo"] for p in auto_455.calcular_periodos(datetime(2026, 12, 15), 12)]
+    assert nomes == ["DEZ2026", "NOV2026", "OUT2026", "SET2026", "AGO2026", "JUL2026",
+                     "JUN2026", "MAI2026", "ABR2026", "MAR2026", "FEV2026", "JAN2026"]
+
+
+def test_periodo_parcial_leva_os_dias_no_nome():
+    periodos = auto_455.periodos_do_intervalo(datetime(2026, 1, 20), datetime(2026, 2, 5))
+    assert [p["nome_arquivo"] for p in periodos] == ["FEV2026_01-05", "JAN2026_20-31"]
+    assert (periodos[1]["data_inicio"], periodos[1]["data_fim"]) == ("200126", "310126")
+    assert not periodos[0]["mes_completo"]
@@ -0,0 +1,173 @@
+"""
+Testes de ponta a ponta do backend HTTP contra o servidor simulado do ssw_mock.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+
+import pytest
+
+import ssw_mock
+from checkpoint import Checkpoints
+from ssw_http import SessaoSSW, _retomar_requisicao, extrair_periodo_http
+
+CREDENCIAIS = {"f1": "EMP", "f2": "12345678000199", "f3": "usuario", "f4": "senha"}
+
+# Intervalos curtos para que os testes não esperem os tempos reais do SSW
+PRAZO = 10
+INTERVALOS = (0.1,)
+
+
+def _periodo(data_inicio, data_fim, nome_arquivo):
+    return {"data_inicio": data_inicio, "data_fim": data_fim, "nome_arquivo": nome_arquivo}
+
+
+@pytest.fixture
+def servidor():
+    """Inicia o SSW simulado com relatórios que ficam prontos rapidamente"""
+    instancias = []
+
+    def iniciar(**configuracao):
+        configuracao.setdefault("atraso_relatorio", 0.2)
+        configuracao.setdefault("linhas_por_dia", 2)
+        srv, url = ssw_mock.iniciar_servidor(**configuracao)
+        instancias.append(srv)
+        return url
+
+    def estado(url):
+        """Estado compartilhado (sessões e requisições) do servidor iniciado na URL"""
+        return next(srv.RequestHandlerClass.estado for srv in instancias
+                    if url.endswith(f":{srv.server_address[1]}"))
+
+    iniciar.estado = estado
+
+    yield iniciar
+    for srv in instancias:
+        srv.shutdown()
+        srv.server_close()
+
+
+def _sessao(url, credenciais=CREDENCIAIS):
+    sessao = SessaoSSW(url, credenciais=dict(credenciais))
+    sessao.login()
+    return sessao
+
+
+def test_login_recusado(servidor):
+    url = servidor()
+    sessao = SessaoSSW(url, credenciais=dict(CREDENCIAIS, f4=""))
+    with pytest.raises(PermissionError):
+        sessao.login()
+
+
+def test_tabela_vazia(servidor):
+    url = servidor()
+    sessao = _sessao(url)
+    url_tabela = url + "/bin/ssw1440"
+    assert sessao.consultar_requisicoes(url_tabela) == []
+    assert sessao.aguardar_relatorio("1001", url_tabela, None, prazo=0.3, intervalos=INTERVALOS) is None
+
+
+def test_checkpoint_com_seq_ausente_nao_e_retomado(servidor):
+    url = servidor()
+    sessao = _sessao(url)
+    estado = {"seq": "1001", "url_tabela": url + "/bin/ssw1440"}
+    assert _retomar_requisicao(sessao, estado) == (None, None)
+
+
+def test_extracao_com_download(servidor, tmp_path):
+    url = servidor()
+    sessao = _sessao(url)
+    checkpoints = Checkpoints(str(tmp_path / "checkpoints.json"))
+    periodo = _periodo("010826", "030826", "08.26")
+
+    arquivo = extrair_periodo_http(sessao, periodo, str(tmp_path), None, PRAZO, INTERVALOS, checkpoints)
+
+    assert arquivo == os.path.join(str(tmp_path), "08.26.csv")
+    linhas = open(arquivo, encoding="latin-1").read().splitlines()
+    assert linhas[0].startswith("CTRC;")
+    assert len(linhas) == 1 + 3 * 2  # cabeçalho + 3 dias com 2 linhas cada
+    assert checkpoints.obter(periodo)["etapa"] == "renomeado"
+
+
+def test_relatorio_que_nao_fica_pronto(servidor, tmp_path):
+    url = servidor(atraso_relatorio=60)
+    sessao = _sessao(url)
+    periodo = _periodo("010826", "020826", "08.26")
+
+    assert extrair_periodo_http(sessao, periodo, str(tmp_path), None, 0.3, INTERVALOS) is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_novo_login_apos_expirar_a_sessao(servidor, tmp_path):
+    url = servidor(duracao_sessao=1.5)
+    sessao = _sessao(url)
+    time.sleep(1.6)
+    periodo = _periodo("010826", "010826", "08.26")
+
+    assert extrair_periodo_http(sessao, periodo, str(tmp_path), None, PRAZO, INTERVALOS)
+
+
+def test_sessao_invalidada_durante_a_consulta_refaz_o_login(servidor, tmp_path):
+    url = servidor(atraso_relatorio=1.0)
+    sessao = _sessao(url)
+    periodo = _periodo("010826", "010826", "08.26")
+    threading.Timer(0.4, servidor.estado(url).encerrar_sessoes).start()
+
+    inicio = time.monotonic()
+    arquivo = extrair_periodo_http(sessao, periodo, str(tmp_path), None, PRAZO, INTERVALOS)
+
+    assert arquivo and open(arquivo, encoding="latin-1").read().startswith("CTRC;")
+    assert time.monotonic() - inicio < 3
+    assert len(servidor.estado(url).sessoes) == 1  # o novo login criou a única sessão válida
+
+
+def test_sessao_invalidada_com_novo_login_recusado(servidor):
+    url = servidor(atraso_relatorio=60)
+    sessao = _sessao(url)
+    seq, url_tabela = sessao.solicitar_relatorio("010826", "010826")
+    servidor.estado(url).encerrar_sessoes()
+    sessao.credenciais["f4"] = ""
+
+    inicio = time.monotonic()
+    with pytest.raises(PermissionError):
+        sessao.aguardar_relatorio(seq, url_tabela, None, PRAZO, INTERVALOS)
+    assert time.monotonic() - inicio < 1  # falha na hora, sem consultar até o prazo
+
+
+def test_falha_depois_do_envio_nao_duplica_a_requisicao(servidor, tmp_path, monkeypatch):
+    import checkpoint
+    import ssw_http
+
+    url = servidor()
+    sessao = _sessao(url)
+    periodo = _periodo("010826", "020826", "08.26")
+    seq_do_periodo = ssw_http.seq_do_periodo
+    chamadas = []
+
+    def seq_falha_na_primeira(*args, **kwargs):
+        chamadas.append(1)
+        return None if len(chamadas) == 1 else seq_do_periodo(*args, **kwargs)
+
+    monkeypatch.setattr(ssw_http, "seq_do_periodo", seq_falha_na_primeira)
+    monkeypatch.setattr(checkpoint, "pausa", lambda *args: None)
+
+    assert extrair_periodo_http(sessao, periodo, str(tmp_path), None, PRAZO, INTERVALOS)
+    assert len(servidor.estado(url).requisicoes) == 1
+
+
+def test_meses_em_paralelo_recebem_o_proprio_relatorio(servidor, tmp_path):
+    url = servidor()
+    sessao = _sessao(url)
+    periodos = [_periodo(f"01{mes:02d}26", f"02{mes:02d}26", f"{mes:02d}.26") for mes in range(1, 5)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        arquivos = list(executor.map(
+            lambda periodo: extrair_periodo_http(sessao, periodo, str(tmp_path), None, PRAZO, INTERVALOS),
+            periodos))
+
+    for periodo, arquivo in zip(periodos, arquivos):
+        emissao = open(arquivo, encoding="latin-1").read().splitlines()[1].split(";")[1]
+        assert emissao.endswith(f"/{periodo['nome_arquivo'][:2]}/26")